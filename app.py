@@ -2,10 +2,12 @@ import streamlit as st
 import cv2
 import numpy as np
 import pandas as pd
+import os
 import time
 import requests
 from datetime import datetime
 from virtual_core import VirtualEvacuationSystem
+from src.site_bundle import SITE_BUNDLE_PATH
 
 # === 1. 페이지 설정 ===
 st.set_page_config(
@@ -101,42 +103,17 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # === 3. 시스템 초기화 (좌표 스케일링 로직 추가) ===
+TARGET_WIDTH = 1100
+ATLAS_PATH = "route_atlas.bin"  # atlas.py로 미리 만들어 둔 경로 아틀라스 (없으면 실시간 계산)
+
 @st.cache_resource
 def get_system():
     try:
-        sys = VirtualEvacuationSystem("background.png")
-        
-        orig_h, orig_w = sys.original_map.shape[:2]
-        TARGET_WIDTH = 1100
-        
-        # 리사이징이 필요한 경우 비율 조정
-        if orig_w != TARGET_WIDTH:
-            scale = TARGET_WIDTH / orig_w
-            new_h = int(orig_h * scale)
-            
-            sys.original_map = cv2.resize(sys.original_map, (TARGET_WIDTH, new_h))
-            sys.w, sys.h = TARGET_WIDTH, new_h
-            
-            if hasattr(sys, 'static_obstacle_mask'):
-                 sys.static_obstacle_mask = cv2.resize(sys.static_obstacle_mask, (TARGET_WIDTH, new_h))
-            
-            # 그리드맵 재생성
-            GridMapClass = type(sys.grid_map)
-            sys.grid_map = GridMapClass(TARGET_WIDTH, new_h, sys.grid_size)
-            
-            # 내부 좌표(LED, 출구) 스케일링
-            if hasattr(sys, 'led_nodes'):
-                new_leds = {}
-                for k, (x, y) in sys.led_nodes.items():
-                    new_leds[k] = (int(x * scale), int(y * scale))
-                sys.led_nodes = new_leds
-            
-            if hasattr(sys, 'exits'):
-                new_exits = {}
-                for k, (x, y) in sys.exits.items():
-                    new_exits[k] = (int(x * scale), int(y * scale))
-                sys.exits = new_exits
-                
+        # get_coords.py로 만든 사이트 번들이 있으면 같은 좌표 + 미리 만든 그리드 사용
+        bundle = SITE_BUNDLE_PATH if os.path.exists(SITE_BUNDLE_PATH) else None
+        sys = VirtualEvacuationSystem("background.png", target_width=TARGET_WIDTH, bundle=bundle)
+        if os.path.exists(ATLAS_PATH):
+            sys.load_atlas(ATLAS_PATH)
         return sys
     except Exception as e:
         st.error(f"시스템 초기화 오류: {e}")
@@ -144,16 +121,6 @@ def get_system():
 
 system = get_system()
 
-# 화재 구역 좌표 보정 함수 (해상도 비율에 맞춤)
-def get_scaled_fire_zones(sys_width, sys_height):
-    w, h = sys_width, sys_height
-    return {
-        "A구역 (좌측 통로)": (int(w * 0.22), int(h * 0.66)),
-        "B구역 (중앙 홀)":   (int(w * 0.50), int(h * 0.66)),
-        "C구역 (우측 통로)": (int(w * 0.77), int(h * 0.66)),
-        "D구역 (상단 통로)": (int(w * 0.50), int(h * 0.25))
-    }
-
 # === 4. HUD 그리기 함수 ===
 def draw_hud(img, is_emergency, mode="VIRTUAL"):
     # 고화질 렌더링을 위해 2배 확대
@@ -320,7 +287,7 @@ with st.sidebar:
     # 1. 고정 프리셋
     fire_zones = {}
     if system:
-        fire_zones = get_scaled_fire_zones(system.w, system.h)
+        fire_zones = system.fire_zones()
     
     active_fires = [] # (x, y, radius) 튜플 리스트
     
@@ -376,8 +343,8 @@ if monitoring_mode == "가상 시뮬레이션":
     fire_text = f"{len(active_fires)} 개소" if is_emergency else "화재없음"
     
     if system:
-        _, display_directions = system.process(active_fires)
-        raw_img, _ = system.process(active_fires)
+        # 표와 이미지를 같은 계획에서 (아틀라스 시나리오면 계산 없이 바로)
+        raw_img, display_directions = system.process(active_fires)
         hud_img = draw_hud(raw_img, is_emergency, mode="VIRTUAL")
         final_img = cv2.cvtColor(hud_img, cv2.COLOR_BGR2RGB)
         
@@ -11,6 +11,35 @@ const char* password = "YOUR_WIFI_PASSWORD";
 // 예: http://192.168.0.10:5000/direction/0  <- 끝에 숫자는 도트 ID
 String serverUrl = "http://192.168.0.5:5000/direction/0"; 
 
+// 마지막으로 받은 응답의 ETag (방향이 그대로면 서버가 304만 보내고 본문 생략)
+String lastEtag = "";
+const char* headerKeys[] = {"ETag"};
+
+// long-poll: 마지막으로 받은 방향 버전 이후 바뀔 때까지 서버가 응답을 붙잡고 있음
+// (최대 LONG_POLL_SEC초, 그동안 안 바뀌면 304) -> 바뀌는 즉시 반영, 평소에는 요청이 거의 없음
+long lastVersion = -1;
+const int LONG_POLL_SEC = 25;
+const int RETRY_DELAY_MS = 500;
+
+// ETag "n<id>-<epoch>-<버전>"에서 마지막 '-' 뒤의 버전 읽기 (형식이 다르면 -1)
+long versionFromEtag(const String& etag) {
+  int dash = etag.lastIndexOf('-');
+  if (dash < 0) {
+    return -1;
+  }
+  String digits = etag.substring(dash + 1);
+  digits.replace("\"", "");
+  if (digits.length() == 0) {
+    return -1;
+  }
+  for (unsigned int i = 0; i < digits.length(); i++) {
+    if (!isDigit(digits[i])) {
+      return -1;
+    }
+  }
+  return digits.toInt();
+}
+
 void setup() {
   Serial.begin(115200);
   WiFi.begin(ssid, password);
@@ -27,10 +56,22 @@ void loop() {
     WiFiClient client;
     HTTPClient http;
 
-    http.begin(client, serverUrl);
+    bool longPoll = lastVersion >= 0;
+    String url = serverUrl;
+    if (longPoll) {
+      url += "?since=" + String(lastVersion) + "&timeout=" + String(LONG_POLL_SEC);
+    }
+    http.setTimeout((LONG_POLL_SEC + 5) * 1000);
+    http.begin(client, url);
+    http.collectHeaders(headerKeys, 1);
+    if (lastEtag.length() > 0) {
+      http.addHeader("If-None-Match", lastEtag);
+    }
     int httpCode = http.GET();
 
-    if (httpCode > 0) {
+    // 304 Not Modified: 방향 그대로 (파싱/갱신 생략)
+    if (httpCode == HTTP_CODE_OK) {
+      lastEtag = http.header("ETag");
       String payload = http.getString();
       // Serial.println(payload); // 디버깅용
 
@@ -39,16 +80,35 @@ void loop() {
       deserializeJson(doc, payload);
       
       const char* dir = doc["direction"]; // "UP", "DOWN", "LEFT", "RIGHT", "STOP"
+      lastVersion = doc["version"] | -1L;
       
       Serial.print("Direction: ");
       Serial.println(dir);
 
       // 여기에 도트 매트릭스 제어 코드 추가
       updateDotMatrix(dir);
+    } else if (httpCode == HTTP_CODE_NOT_MODIFIED) {
+      // 방향 그대로: ETag에서 버전을 되살려 다음 요청부터 long-poll
+      lastVersion = versionFromEtag(http.header("ETag"));
+      if (lastVersion < 0) {
+        lastEtag = "";
+      }
+    } else {
+      // 연결 실패 등: 현재 상태부터 다시 받기 (ETag도 버려야 바로 304만 받는 일이 없음)
+      lastVersion = -1;
+      lastEtag = "";
     }
     http.end();
+
+    // 서버가 응답을 붙잡고 있지 않았던 경우(오류, long-poll 아닌 요청의 304,
+    // 버전을 모르는 상태)에는 바로 다시 보내지 않음
+    bool failed = httpCode != HTTP_CODE_OK && httpCode != HTTP_CODE_NOT_MODIFIED;
+    if (failed || lastVersion < 0 || (!longPoll && httpCode == HTTP_CODE_NOT_MODIFIED)) {
+      delay(RETRY_DELAY_MS);
+    }
+  } else {
+    delay(RETRY_DELAY_MS);
   }
-  delay(500); // 0.5초마다 갱신
 }
 
 void updateDotMatrix(const char* dir) {
@@ -0,0 +1,106 @@
+#include <ESP8266WiFi.h> // ESP32인 경우 <WiFi.h> 사용
+#include <WiFiUdp.h>
+
+// UDP 방송 수신용 스케치 (src/broadcast.py의 DirectionBroadcaster)
+// HTTP 요청/JSON 파싱 없이 패킷 하나에서 내 노드 ID 자리의 1바이트만 읽음
+
+// 와이파이 설정
+const char* ssid = "YOUR_WIFI_SSID";
+const char* password = "YOUR_WIFI_PASSWORD";
+
+// 이 도트의 ID (서버의 /direction/<id>와 같은 번호)
+const int NODE_ID = 0;
+
+// 멀티캐스트 그룹 / 포트 (broadcast.py의 MULTICAST_GROUP, BROADCAST_PORT)
+// 서버 쪽 main.py의 BROADCAST_ADDRESS를 이 그룹으로 설정해야 방송이 켜짐 (기본은 꺼짐)
+IPAddress multicastGroup(239, 255, 42, 99);
+const uint16_t BROADCAST_PORT = 5005;
+
+// 패킷: "EVDR"(4) | 포맷 버전(1) | seq(4) | 플래그(1) | 노드 수(2) | 방향 코드(노드 수) (little-endian)
+const int HEADER_SIZE = 12;
+const uint8_t FORMAT_VERSION = 1;
+const uint8_t UNKNOWN_CODE = 0xFF;
+// 서버는 UDP 페이로드 1472바이트(노드 ID 0~1459)까지만 보냄 (broadcast.py MAX_PAYLOAD)
+const int MAX_PAYLOAD = 1472;
+
+// navigator.py의 DIRECTIONS 순서와 같아야 함
+const char* DIRECTIONS[] = {"STOP", "UP", "UP-RIGHT", "RIGHT", "DOWN-RIGHT",
+                            "DOWN", "DOWN-LEFT", "LEFT", "UP-LEFT", "BLOCKED"};
+const uint8_t DIRECTION_COUNT = 10;
+
+WiFiUDP udp;
+uint8_t packet[MAX_PAYLOAD];
+bool hasSeq = false;
+uint32_t lastSeq = 0;
+bool hasStaleSeq = false;
+uint32_t staleSeq = 0;
+
+void setup() {
+  Serial.begin(115200);
+  WiFi.begin(ssid, password);
+
+  while (WiFi.status() != WL_CONNECTED) {
+    delay(500);
+    Serial.print(".");
+  }
+  Serial.println("\nWiFi Connected!");
+
+  // 브로드캐스트로 보내는 경우에는 udp.begin(BROADCAST_PORT)
+  udp.beginMulticast(WiFi.localIP(), multicastGroup, BROADCAST_PORT);
+}
+
+uint32_t readU32(const uint8_t* p) {
+  return (uint32_t)p[0] | ((uint32_t)p[1] << 8) | ((uint32_t)p[2] << 16) | ((uint32_t)p[3] << 24);
+}
+
+void loop() {
+  int size = udp.parsePacket();
+  if (size <= 0) {
+    delay(1);
+    return;
+  }
+  int len = udp.read(packet, sizeof(packet));
+  if (len < HEADER_SIZE || memcmp(packet, "EVDR", 4) != 0 || packet[4] != FORMAT_VERSION) {
+    return;
+  }
+  uint32_t seq = readU32(packet + 5);
+  bool fire = packet[9] & 0x01;
+  uint16_t count = packet[10] | (packet[11] << 8);
+
+  // 같은 seq(1초마다 재전송)는 건너뜀, 옛 seq는 재전송으로 한 번 더 올 때만 (서버 재시작)
+  if (hasSeq && seq == lastSeq) {
+    return;
+  }
+  int32_t diff = (int32_t)(seq - lastSeq);
+  if (hasSeq && diff < 0 && !(hasStaleSeq && seq == staleSeq)) {
+    hasStaleSeq = true;
+    staleSeq = seq;
+    return;
+  }
+  hasSeq = true;
+  lastSeq = seq;
+  hasStaleSeq = false;
+
+  uint8_t code = UNKNOWN_CODE;
+  if (NODE_ID < count && HEADER_SIZE + NODE_ID < len) {
+    code = packet[HEADER_SIZE + NODE_ID];
+  }
+  const char* dir = code < DIRECTION_COUNT ? DIRECTIONS[code] : "STOP";
+
+  Serial.print("Direction: ");
+  Serial.print(dir);
+  Serial.println(fire ? " (FIRE)" : "");
+
+  // 여기에 도트 매트릭스 제어 코드 추가
+  updateDotMatrix(dir);
+}
+
+void updateDotMatrix(const char* dir) {
+  // 매트릭스에 화살표 그리는 로직 구현
+  if (strcmp(dir, "UP") == 0) {
+    // 위쪽 화살표 표시
+  } else if (strcmp(dir, "RIGHT") == 0) {
+    // 오른쪽 화살표 표시
+  }
+  // ...
+}
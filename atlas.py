@@ -0,0 +1,179 @@
+"""
+화재 시나리오 경로 아틀라스
+- 프리셋 화재 구역의 모든 조합(단일/복합 화재)을 미리 계산해 하나의 파일로 저장
+- 실행 중에는 파일을 메모리 매핑해서 시나리오 키로 방향표(와 그릴 경로)를 바로 조회
+- 아틀라스에 없는 시나리오는 VirtualEvacuationSystem이 실시간으로 계산
+
+빌드:  python atlas.py [맵 이미지] [출력 파일] [대시보드 폭]
+"""
+import json
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import combinations
+
+import numpy as np
+from virtual_core import VirtualEvacuationSystem, normalize_fires
+try:
+    from navigator import DIRECTIONS, DIRECTION_CODES
+    from site_bundle import SITE_BUNDLE_PATH
+except ImportError:
+    from src.navigator import DIRECTIONS, DIRECTION_CODES
+    from src.site_bundle import SITE_BUNDLE_PATH
+
+MAGIC = b"EVATLAS2"
+# 헤더: 매직(8) + 메타 JSON 길이(4) + 시나리오 수(4) + 최대 화재 수(4) + 노드 수(4) + 경로 점 수(4)
+# 본문: 시나리오 키 | 방향 코드 표 | 경로 시작 위치(시나리오 x 노드 + 1) | 경로 점 (x, y)
+HEADER = struct.Struct("<8sIIIII")
+ZONE_RADIUS = 70  # app.py 구역 토글과 같은 반지름
+
+def enumerate_scenarios(zones, radius=ZONE_RADIUS, max_fires=None):
+    """구역 좌표 목록에서 화재 없음 + 모든 구역 조합 시나리오 생성"""
+    points = [tuple(p) + (radius,) for p in zones]
+    max_fires = max_fires or len(points)
+    scenarios = [()]
+    for k in range(1, max_fires + 1):
+        scenarios.extend(combinations(points, k))
+    return scenarios
+
+# === 빌드 (프로세스 풀) ===
+_worker_system = None
+
+def _init_worker(map_image_path, target_width, bundle):
+    global _worker_system
+    # 시나리오마다 한 번만 계산하므로 결과 캐시는 쓰지 않음
+    _worker_system = VirtualEvacuationSystem(map_image_path, target_width=target_width,
+                                             cache_entries=0, bundle=bundle)
+
+def _solve(fires):
+    # 방향표 + 경로만 저장하므로 이미지는 그리지 않음
+    plan = _worker_system.compute(list(fires))
+    return dict(plan.directions), dict(plan.paths)
+
+def build_atlas(map_image_path, out_path, target_width=None, radius=ZONE_RADIUS,
+                max_fires=None, workers=None, bundle=None):
+    """
+    프리셋 구역 조합을 프로세스 풀로 계산해 아틀라스 파일로 저장
+    (bundle: 사이트 번들 경로, 대시보드와 같은 번들을 써야 노드가 맞음)
+    """
+    system = VirtualEvacuationSystem(map_image_path, target_width=target_width, bundle=bundle)
+    scenarios = enumerate_scenarios(system.fire_zones().values(), radius, max_fires)
+    keys = [normalize_fires(s) for s in scenarios]
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(map_image_path, target_width, bundle)) as pool:
+        results = list(pool.map(_solve, keys, chunksize=4))
+    tables = [directions for directions, _ in results]
+
+    nodes = sorted(system.led_nodes.keys())
+    width = max((len(k) for k in keys), default=0)
+    key_arr = np.full((len(keys), max(width, 1), 3), -1, dtype=np.int32)
+    for row, key in enumerate(keys):
+        if key:
+            key_arr[row, :len(key)] = key
+    table = np.array([[DIRECTION_CODES[t[name]] for name in nodes] for t in tables],
+                     dtype=np.uint8).reshape(len(keys), len(nodes))
+    # 경로: (시나리오, 노드) 순서로 이어 붙이고 시작 위치만 따로 저장
+    paths = [paths[name] for _, paths in results for name in nodes]
+    offsets = np.zeros(len(paths) + 1, dtype=np.uint32)
+    offsets[1:] = np.cumsum([len(p) for p in paths])
+    points = np.array([pt for p in paths for pt in p], dtype=np.int32).reshape(-1, 2)
+
+    meta = json.dumps({
+        "nodes": nodes,
+        "width": system.w,
+        "height": system.h,
+        "grid_size": system.grid_size,
+    }, ensure_ascii=False).encode("utf-8")
+    with open(out_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(meta), len(keys), key_arr.shape[1], len(nodes), len(points)))
+        f.write(meta)
+        f.write(key_arr.tobytes())
+        f.write(table.tobytes())
+        f.write(offsets.tobytes())
+        f.write(points.tobytes())
+    return len(keys)
+
+# === 실행 중 조회 ===
+class RouteAtlas:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, meta_len, n_scen, width, n_nodes, n_points = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Not a route atlas file (or an old format, rebuild it): {path}")
+            self.meta = json.loads(f.read(meta_len).decode("utf-8"))
+
+        offset = HEADER.size + meta_len
+        self.width = width
+        self.keys = np.memmap(path, dtype=np.int32, mode="r", offset=offset,
+                              shape=(n_scen, width, 3))
+        offset += self.keys.nbytes
+        self.table = np.memmap(path, dtype=np.uint8, mode="r", offset=offset,
+                               shape=(n_scen, n_nodes))
+        offset += self.table.nbytes
+        self.offsets = np.memmap(path, dtype=np.uint32, mode="r", offset=offset,
+                                 shape=(n_scen * n_nodes + 1,))
+        offset += self.offsets.nbytes
+        # 경로 점이 하나도 없으면 memmap을 만들 수 없으므로 빈 배열
+        self.points = (np.memmap(path, dtype=np.int32, mode="r", offset=offset,
+                                 shape=(n_points, 2)) if n_points else np.zeros((0, 2), np.int32))
+        self.nodes = self.meta["nodes"]
+
+        # 시나리오 키(패딩된 int32 바이트) -> 행 번호
+        self._index = {self.keys[row].tobytes(): row for row in range(n_scen)}
+        self.hits = 0
+        self.misses = 0
+
+    def matches(self, system):
+        """아틀라스가 같은 맵 해상도/그리드/노드로 만들어졌는지 확인"""
+        return (self.meta["width"] == system.w and self.meta["height"] == system.h
+                and self.meta["grid_size"] == system.grid_size
+                and self.nodes == sorted(system.led_nodes.keys()))
+
+    def _key_bytes(self, fire_data):
+        key = normalize_fires(fire_data)
+        if len(key) > self.width:
+            return None
+        buf = np.full((self.width, 3), -1, dtype=np.int32)
+        if key:
+            buf[:len(key)] = key
+        return buf.tobytes()
+
+    def _row(self, fire_data):
+        key = self._key_bytes(fire_data)
+        row = self._index.get(key) if key is not None else None
+        if row is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return row
+
+    def lookup(self, fire_data):
+        """시나리오가 있으면 {노드 이름: 방향}, 없으면 None"""
+        row = self._row(fire_data)
+        if row is None:
+            return None
+        return {name: DIRECTIONS[code] for name, code in zip(self.nodes, self.table[row])}
+
+    def lookup_plan(self, fire_data):
+        """시나리오가 있으면 ({노드 이름: 방향}, {노드 이름: [(x, y), ...]}), 없으면 None"""
+        row = self._row(fire_data)
+        if row is None:
+            return None
+        directions = {name: DIRECTIONS[code] for name, code in zip(self.nodes, self.table[row])}
+        paths = {}
+        for k, name in enumerate(self.nodes):
+            cell = row * len(self.nodes) + k
+            start, end = int(self.offsets[cell]), int(self.offsets[cell + 1])
+            paths[name] = [(int(x), int(y)) for x, y in self.points[start:end]]
+        return directions, paths
+
+if __name__ == "__main__":
+    map_path = sys.argv[1] if len(sys.argv) > 1 else "background.png"
+    out_path = sys.argv[2] if len(sys.argv) > 2 else "route_atlas.bin"
+    target_width = int(sys.argv[3]) if len(sys.argv) > 3 else 1100
+    # app.py와 같은 규칙: 사이트 번들이 있으면 그 좌표로 계산
+    bundle = SITE_BUNDLE_PATH if os.path.exists(SITE_BUNDLE_PATH) else None
+    count = build_atlas(map_path, out_path, target_width=target_width, bundle=bundle)
+    print(f">>> {count}개 시나리오 저장 완료: {out_path}")
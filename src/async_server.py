@@ -0,0 +1,304 @@
+"""
+asyncio 기반 서버 (표준 라이브러리만 사용)
+EvacuationServer(Flask)와 같은 API를 이벤트 루프 하나로 처리합니다.
+- GET /status, /direction/<id>: ETag/304, ?since=<버전>&timeout=<초> long-poll
+  (since가 현재 버전과 다르거나 If-None-Match가 현재 ETag와 다르면 바로 응답)
+- GET /events: Server-Sent Events (?node=<id>, Last-Event-ID)
+- 대기 중인 연결은 스레드 없이 코루틴 하나씩이라 LED 노드 수백 개 + 대시보드도 가벼움
+- update_data()는 비전 루프 스레드에서 호출: 스냅샷은 호출한 스레드에서 만들고
+  이벤트 루프에는 call_soon_threadsafe로 "바뀌었다"는 신호만 넘김
+"""
+import asyncio
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    from snapshot import LONG_POLL_MAX, LONG_POLL_TIMEOUT, SSE_HEARTBEAT, SnapshotStore
+except ImportError:
+    from src.snapshot import LONG_POLL_MAX, LONG_POLL_TIMEOUT, SSE_HEARTBEAT, SnapshotStore
+
+# keep-alive 연결에서 다음 요청을 기다리는 시간(초), 요청 헤더 최대 크기
+IDLE_TIMEOUT = 75.0
+MAX_HEADER_BYTES = 8192
+
+REASONS = {200: "OK", 204: "No Content", 304: "Not Modified", 400: "Bad Request",
+           404: "Not Found", 405: "Method Not Allowed"}
+
+def _query_value(query, name, cast):
+    """werkzeug request.args.get(name, type=cast)처럼 없거나 잘못된 값은 None"""
+    values = query.get(name)
+    if not values:
+        return None
+    try:
+        return cast(values[0])
+    except ValueError:
+        return None
+
+def _etag_matches(header, etag):
+    """If-None-Match 헤더에 etag가 있는지 ("*", 여러 개, W/ 접두어 허용)"""
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+def _client_stale(header, etag):
+    """If-None-Match를 보냈는데 현재 ETag가 아니면 (재시작 전 ETag 등) long-poll 없이 바로 응답"""
+    return bool(header) and not _etag_matches(header, etag)
+
+
+class AsyncEvacuationServer:
+    """
+    EvacuationServer와 같은 인터페이스 (start / update_data / status_data / store)
+    start()는 이벤트 루프를 데몬 스레드에서 돌리고, stop()으로 종료합니다.
+    (포트를 열지 못하면 start()가 그 예외를 그대로 발생시킴)
+    """
+    def __init__(self, port=5000, host="0.0.0.0"):
+        self.port = port
+        self.host = host
+        self.store = SnapshotStore()
+
+        self.loop = None
+        self._server = None
+        self._changed = None   # 다음 publish 때 set되는 asyncio.Event
+        self._ready = threading.Event()
+        self._start_error = None  # 포트 바인드 실패 등 (start()에서 다시 발생)
+        self.thread = threading.Thread(target=self._run_server, name="async-server")
+        self.thread.daemon = True
+
+    @property
+    def status_data(self):
+        """현재 상태 사본 {"fire_detected", "directions"}"""
+        return self.store.current.as_dict()
+
+    def start(self):
+        self.thread.start()
+        self._ready.wait()
+        if self._start_error is not None:
+            self.thread.join()
+            raise self._start_error
+
+    def stop(self):
+        # start() 직후라 run_forever() 전이어도 예약해 두면 시작하자마자 멈춤
+        if self.loop is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+
+    def update_data(self, fire_detected, directions):
+        """
+        메인 스레드에서 최신 정보를 이 함수로 밀어넣습니다.
+        내용이 바뀐 경우에만 버전이 올라가고 대기 중인 연결을 깨웁니다.
+        """
+        snap = self.store.publish(fire_detected, directions)
+        if snap is not None and self.loop is not None and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self._notify)
+        return snap
+
+    # --- 이벤트 루프 ---
+
+    def _run_server(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self._changed = asyncio.Event()
+        try:
+            self._server = self.loop.run_until_complete(
+                asyncio.start_server(self._handle, self.host, self.port, backlog=1024))
+        except BaseException as e:
+            self._start_error = e
+            self.loop.close()
+            return
+        finally:
+            self._ready.set()
+        print(f">>> Async Web Server started on port {self.port}")
+        try:
+            self.loop.run_forever()
+        finally:
+            self._server.close()
+            tasks = asyncio.all_tasks(self.loop)
+            for task in tasks:
+                task.cancel()
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            self.loop.close()
+
+    def _notify(self):
+        # 지금 기다리는 쪽을 모두 깨우고, 다음 변경용 Event로 교체
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def _wait_for(self, predicate, timeout):
+        """predicate(스냅샷)가 참이 되거나 timeout(초)까지 대기 후 최신 스냅샷 반환"""
+        deadline = time.monotonic() + timeout
+        while True:
+            changed = self._changed
+            snap = self.store.current
+            remaining = deadline - time.monotonic()
+            if predicate(snap) or remaining <= 0:
+                return snap
+            try:
+                await asyncio.wait_for(changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return self.store.current
+
+    # --- HTTP ---
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), IDLE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                        asyncio.TimeoutError):
+                    break
+                if len(head) > MAX_HEADER_BYTES:
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self._send(writer, 400, close=True)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = (connection != "close" if version == "HTTP/1.1"
+                              else connection == "keep-alive")
+                if not await self._route(writer, method, target, headers, keep_alive):
+                    break
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, writer, method, target, headers, keep_alive):
+        """요청 하나 처리 (연결을 계속 쓸 수 있으면 True)"""
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        parts = url.path.strip("/").split("/")
+
+        if method == "OPTIONS":
+            await self._send(writer, 204, keep_alive=keep_alive, extra={
+                "Access-Control-Allow-Methods": "GET, OPTIONS",
+                "Access-Control-Allow-Headers": headers.get("access-control-request-headers", "*"),
+            })
+            return True
+        if method not in ("GET", "HEAD"):
+            # 요청 본문은 읽지 않으므로 연결을 닫음
+            await self._send(writer, 405, close=True)
+            return False
+
+        since = _query_value(query, "since", int)
+        if_none_match = headers.get("if-none-match")
+        if parts == ["status"]:
+            if since is None or _client_stale(if_none_match, self.store.current.status_etag):
+                snap = self.store.current
+            else:
+                snap = await self._wait_for(lambda s: s.version != since, self._poll_timeout(query))
+                if snap.version == since:
+                    await self._send(writer, 304, etag=snap.status_etag, keep_alive=keep_alive)
+                    return True
+            await self._respond(writer, method, headers, snap.status_body, snap.status_etag,
+                                keep_alive)
+            return True
+
+        if len(parts) == 2 and parts[0] == "direction" and parts[1].isdigit():
+            dot_id = int(parts[1])
+            if since is None or _client_stale(if_none_match, self.store.current.node(dot_id)[1]):
+                snap = self.store.current
+            else:
+                snap = await self._wait_for(lambda s: s.node_version(dot_id) != since,
+                                            self._poll_timeout(query))
+                if snap.node_version(dot_id) == since:
+                    await self._send(writer, 304, etag=snap.node(dot_id)[1], keep_alive=keep_alive)
+                    return True
+            body, etag = snap.node(dot_id)
+            await self._respond(writer, method, headers, body, etag, keep_alive)
+            return True
+
+        if parts == ["events"] and method == "GET":
+            node = _query_value(query, "node", int)
+            last_id = self.store.parse_event_id(headers.get("last-event-id"))
+            await self._event_stream(writer, node, last_id)
+            return False
+
+        await self._send(writer, 404, keep_alive=keep_alive)
+        return True
+
+    def _poll_timeout(self, query):
+        timeout = _query_value(query, "timeout", float)
+        if timeout is None:
+            timeout = LONG_POLL_TIMEOUT
+        return min(max(timeout, 0.0), LONG_POLL_MAX)
+
+    async def _respond(self, writer, method, headers, body, etag, keep_alive):
+        """미리 만든 바이트 응답 (If-None-Match가 같으면 304)"""
+        if _etag_matches(headers.get("if-none-match"), etag):
+            await self._send(writer, 304, etag=etag, keep_alive=keep_alive)
+        else:
+            await self._send(writer, 200, body=body, etag=etag, keep_alive=keep_alive,
+                             head_only=(method == "HEAD"))
+
+    async def _send(self, writer, status, body=b"", etag=None, keep_alive=False, close=False,
+                    head_only=False, extra=None):
+        lines = [f"HTTP/1.1 {status} {REASONS[status]}",
+                 "Access-Control-Allow-Origin: *",
+                 "Cache-Control: no-cache",
+                 f"Connection: {'keep-alive' if keep_alive and not close else 'close'}"]
+        if etag is not None:
+            lines.append(f"ETag: {etag}")
+        if status == 200:
+            lines.append("Content-Type: application/json")
+        if status not in (204, 304):
+            lines.append(f"Content-Length: {len(body)}")
+        for name, value in (extra or {}).items():
+            lines.append(f"{name}: {value}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if status not in (204, 304) and not head_only:
+            writer.write(body)
+        await writer.drain()
+
+    async def _event_stream(self, writer, node, last_id):
+        """
+        SSE 스트림: 접속 즉시 현재 상태 1건(Last-Event-ID와 같으면 생략) 후
+        바뀔 때만 이벤트, SSE_HEARTBEAT초 동안 변화가 없으면 하트비트
+        (last_id: 이 프로세스의 버전, 재시작 전 id는 parse_event_id에서 None이 되어 현재 상태부터)
+        (연결이 끊기면 drain()에서 예외로 끝남)
+        """
+        if node is None:
+            version_of = lambda snap: snap.version
+            event_of = lambda snap: snap.status_event
+        else:
+            version_of = lambda snap: snap.node_version(node)
+            event_of = lambda snap: snap.node_event(node)
+
+        writer.write(b"HTTP/1.1 200 OK\r\n"
+                     b"Content-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\n"
+                     b"Access-Control-Allow-Origin: *\r\n"
+                     b"Connection: close\r\n\r\n"
+                     b"retry: 1000\n\n")
+        await writer.drain()
+        sent = last_id
+        while True:
+            if sent is None:
+                snap = self.store.current
+            else:
+                snap = await self._wait_for(lambda s: version_of(s) != sent, SSE_HEARTBEAT)
+            if sent is not None and version_of(snap) == sent:
+                writer.write(b": heartbeat\n\n")
+            else:
+                sent = version_of(snap)
+                writer.write(event_of(snap))
+            await writer.drain()
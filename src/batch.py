@@ -0,0 +1,91 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+try:
+    from detector import Detector
+except ImportError:
+    from src.detector import Detector
+
+class BatchDetector:
+    """
+    여러 카메라(소스) 프레임을 한 번에 받아 스레드 풀에서 병렬로 불 감지
+    - 소스마다 Detector 인스턴스를 따로 둠 (재사용 버퍼가 섞이지 않도록)
+      불 색상 LUT(16MB)는 한 번만 만들어 모든 Detector가 공유
+    - OpenCV 연산은 GIL을 놓으므로 스레드만으로 코어 수만큼 병렬 처리됨
+    - 풀 스레드 x OpenCV 내부 스레드로 코어가 초과 할당되지 않도록
+      풀이 2개 이상이면 OpenCV 내부 스레드 수를 opencv_threads로 낮춤 (close()에서 복원)
+    """
+    def __init__(self, sources, max_workers=None, opencv_threads=1):
+        self.sources = list(sources)
+        self.max_workers = max_workers or min(len(self.sources), os.cpu_count() or 1)
+
+        self.detectors = {}
+        shared = None
+        for source in self.sources:
+            det = Detector()
+            if shared is None:
+                det._get_fire_lut()
+                shared = det
+            else:
+                det._fire_lut = shared._fire_lut
+                det._fire_lut_key = shared._fire_lut_key
+            self.detectors[source] = det
+
+        self._prev_threads = None
+        if self.max_workers > 1 and opencv_threads is not None:
+            self._prev_threads = cv2.getNumThreads()
+            cv2.setNumThreads(opencv_threads)
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                           thread_name_prefix="batch-detect")
+
+    def _detect_one(self, source, frame, timestamp):
+        t0 = time.perf_counter()
+        fire_boxes, mask = self.detectors[source].detect_fire(frame)
+        return {"source": source, "timestamp": timestamp, "fire_boxes": fire_boxes,
+                "mask": mask, "elapsed": time.perf_counter() - t0}
+
+    def detect(self, frames):
+        """
+        :param frames: {소스: 프레임} 또는 {소스: (프레임, 캡처 시각)}
+        :return: {소스: {"source", "timestamp", "fire_boxes", "mask", "elapsed"}}
+                 (프레임이 None인 소스는 결과에서 빠짐)
+        """
+        futures = {}
+        for source, item in frames.items():
+            if isinstance(item, tuple):
+                frame, timestamp = item
+            else:
+                frame, timestamp = item, time.time()
+            if frame is None:
+                continue
+            futures[source] = self.executor.submit(self._detect_one, source, frame, timestamp)
+        return {source: f.result() for source, f in futures.items()}
+
+    def detect_cameras(self, cameras):
+        """
+        {소스: Camera}에서 각각 최신 프레임을 읽어 바로 감지 (읽기와 감지 모두 병렬)
+        결과의 timestamp는 카메라가 프레임을 받은 시각
+        """
+        def read_and_detect(source, cam):
+            ret, frame, timestamp, _ = cam.get_frame_info()
+            if not ret:
+                return None
+            return self._detect_one(source, frame, timestamp)
+
+        futures = {source: self.executor.submit(read_and_detect, source, cam)
+                   for source, cam in cameras.items()}
+        results = {}
+        for source, f in futures.items():
+            result = f.result()
+            if result is not None:
+                results[source] = result
+        return results
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+        if self._prev_threads is not None:
+            cv2.setNumThreads(self._prev_threads)
+            self._prev_threads = None
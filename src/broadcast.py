@@ -0,0 +1,215 @@
+"""
+LED 노드용 방향표 UDP 방송 (멀티캐스트 / 브로드캐스트)
+패킷 하나에 모든 노드의 방향이 들어 있으므로 노드 수와 관계없이 변경 1번 = 패킷 1개
+
+패킷 (little-endian):
+  매직 b"EVDR"(4) | 포맷 버전(1) | seq(4, uint32) | 플래그(1, bit0 = 화재) | 노드 수 N(2, uint16)
+  | 방향 코드 N바이트 (노드 ID 순서, navigator.DIRECTION_CODES, 모르는 노드는 0xFF)
+- seq는 내용이 바뀔 때만 1 증가 (주기적으로 다시 보내는 패킷은 같은 seq)
+- 노드 ID는 0 이상 MAX_NODES 미만: 패킷이 이더넷 MTU(UDP 페이로드 1472바이트)를 넘지 않아
+  IP 단편화 없이 한 번에 가고, ESP 스케치의 수신 버퍼에도 들어감
+
+python broadcast.py [그룹/주소] [포트] 로 실행하면 기준 수신기가 받은 내용을 출력합니다.
+"""
+import ipaddress
+import numbers
+import socket
+import struct
+import sys
+import threading
+import time
+
+try:
+    from navigator import DIRECTIONS, DIRECTION_CODES
+except ImportError:
+    from src.navigator import DIRECTIONS, DIRECTION_CODES
+
+MAGIC = b"EVDR"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBIBH")
+FLAG_FIRE = 0x01
+UNKNOWN_CODE = 0xFF
+# UDP 페이로드 최대 1472바이트 (MTU 1500 - IP/UDP 헤더 28) - 헤더 12바이트
+MAX_PAYLOAD = 1472
+MAX_NODES = MAX_PAYLOAD - HEADER.size
+
+# 기본 멀티캐스트 그룹 (사설 범위) / 포트
+MULTICAST_GROUP = "239.255.42.99"
+BROADCAST_PORT = 5005
+
+def encode_packet(seq, fire_detected, directions):
+    """
+    :param directions: {노드 ID(int): 방향 문자열}
+    :raises ValueError: 노드 ID가 정수가 아니거나 0 <= ID < MAX_NODES 범위를 벗어난 경우
+    """
+    for dot_id in directions:
+        if not isinstance(dot_id, numbers.Integral) or not 0 <= dot_id < MAX_NODES:
+            raise ValueError(f"invalid node id {dot_id!r} for a direction packet "
+                             f"(must be an integer, 0 <= id < {MAX_NODES})")
+    count = int(max(directions)) + 1 if directions else 0
+    codes = bytearray([UNKNOWN_CODE]) * count
+    for dot_id, direction in directions.items():
+        codes[int(dot_id)] = DIRECTION_CODES.get(direction, UNKNOWN_CODE)
+    flags = FLAG_FIRE if fire_detected else 0
+    return HEADER.pack(MAGIC, FORMAT_VERSION, seq & 0xFFFFFFFF, flags, count) + bytes(codes)
+
+def decode_packet(data):
+    """
+    :return: {"seq", "fire_detected", "directions": {노드 ID: 방향 문자열}}
+             (형식이 맞지 않으면 None, 모르는 코드는 "STOP")
+    """
+    if len(data) < HEADER.size:
+        return None
+    magic, version, seq, flags, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION or len(data) < HEADER.size + count:
+        return None
+    codes = data[HEADER.size:HEADER.size + count]
+    directions = {dot_id: DIRECTIONS[code] if code < len(DIRECTIONS) else "STOP"
+                  for dot_id, code in enumerate(codes) if code != UNKNOWN_CODE}
+    return {"seq": seq, "fire_detected": bool(flags & FLAG_FIRE), "directions": directions}
+
+def seq_newer(seq, last):
+    """uint32 seq 비교 (한 바퀴 돌아도 동작)"""
+    return last is None or 0 < ((seq - last) & 0xFFFFFFFF) < 0x80000000
+
+def _is_multicast(address):
+    try:
+        return ipaddress.ip_address(address).is_multicast
+    except ValueError:
+        return False
+
+
+class DirectionBroadcaster:
+    """
+    방향표가 바뀌면 즉시 한 번, 그리고 refresh_interval초마다 최신 패킷을 다시 방송
+    (패킷 손실이나 늦게 켜진 노드도 다음 주기에는 맞춰짐)
+    update_data()는 EvacuationServer와 같은 형태라 서버 옆에서 그대로 호출하면 됩니다.
+    """
+    def __init__(self, address=MULTICAST_GROUP, port=BROADCAST_PORT, refresh_interval=1.0, ttl=1):
+        self.address = address
+        self.port = port
+        self.refresh_interval = refresh_interval
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        if _is_multicast(address):
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+        else:
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+
+        self.seq = 0
+        self.sent = 0
+        self._state = None     # (화재 여부, 방향표) - 바뀐 경우에만 seq 증가
+        self._packet = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.thread = threading.Thread(target=self._refresh_loop, name="direction-broadcast")
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+
+    def close(self):
+        self._stop.set()
+        if self.thread.is_alive():
+            self.thread.join(timeout=2)
+        self.sock.close()
+
+    def update_data(self, fire_detected, directions):
+        """
+        :return: 바뀌어서 방송했으면 새 seq, 그대로이거나 패킷에 담을 수 없는 표면 None
+                 (잘못된 노드 ID는 경고만 출력, 이전 패킷은 계속 재전송)
+        """
+        state = (bool(fire_detected), dict(directions))
+        with self._lock:
+            if state == self._state:
+                return None
+            try:
+                packet = encode_packet((self.seq + 1) & 0xFFFFFFFF, *state)
+            except ValueError as e:
+                print(f"[WARN] 방향 방송 건너뜀: {e}")
+                return None
+            self.seq = (self.seq + 1) & 0xFFFFFFFF
+            self._state = state
+            self._packet = packet
+            seq = self.seq
+        self._send(packet)
+        return seq
+
+    def _send(self, packet):
+        try:
+            self.sock.sendto(packet, (self.address, self.port))
+            self.sent += 1
+        except OSError as e:
+            # 네트워크가 잠시 없어도 비전 루프는 계속 (다음 주기에 다시 보냄)
+            print(f"[WARN] 방향 방송 실패: {e}")
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            with self._lock:
+                packet = self._packet
+            if packet is not None:
+                self._send(packet)
+
+
+class DirectionReceiver:
+    """
+    기준 수신기 (로컬 테스트용, ESP 노드와 같은 규칙)
+    같은 seq(주기적 재전송)나 이전 seq는 건너뛰고 새 내용만 돌려줍니다.
+    이전 seq가 재전송으로 한 번 더 오면 방송 쪽이 다시 시작된 것으로 보고 받아들입니다.
+    """
+    def __init__(self, address=MULTICAST_GROUP, port=BROADCAST_PORT, interface="0.0.0.0"):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("", port))
+        if _is_multicast(address):
+            mreq = socket.inet_aton(address) + socket.inet_aton(interface)
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+        self.last_seq = None
+        self._stale_seq = None
+
+    def receive(self, timeout=None):
+        """
+        :return: 새 패킷 내용 (decode_packet 형식), timeout이면 None
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # 재전송 패킷을 건너뛰는 동안에도 전체 timeout은 지킴
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.sock.settimeout(remaining)
+            else:
+                self.sock.settimeout(None)
+            try:
+                data, _ = self.sock.recvfrom(65535)
+            except socket.timeout:
+                return None
+            packet = decode_packet(data)
+            if packet is None or packet["seq"] == self.last_seq:
+                continue
+            if not seq_newer(packet["seq"], self.last_seq) and packet["seq"] != self._stale_seq:
+                self._stale_seq = packet["seq"]  # 순서가 뒤바뀐 옛 패킷일 수도 있으니 한 번은 무시
+                continue
+            self.last_seq = packet["seq"]
+            self._stale_seq = None
+            return packet
+
+    def close(self):
+        self.sock.close()
+
+
+if __name__ == "__main__":
+    address = sys.argv[1] if len(sys.argv) > 1 else MULTICAST_GROUP
+    port = int(sys.argv[2]) if len(sys.argv) > 2 else BROADCAST_PORT
+    receiver = DirectionReceiver(address, port)
+    print(f"Listening on {address}:{port} ...")
+    try:
+        while True:
+            packet = receiver.receive()
+            fire = "FIRE" if packet["fire_detected"] else "OK"
+            print(f"#{packet['seq']} [{fire}] {packet['directions']}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        receiver.close()
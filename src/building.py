@@ -0,0 +1,153 @@
+import heapq
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+def _bfs(blocked, rows, cols, sources):
+    """구역 하나 안에서 여러 출발점 BFS (flat index 거리 리스트, -1 = 도달 불가)"""
+    n = rows * cols
+    dist = [-1] * n
+    queue = deque()
+    for i in sources:
+        if not blocked[i] and dist[i] < 0:
+            dist[i] = 0
+            queue.append(i)
+    while queue:
+        i = queue.popleft()
+        d = dist[i] + 1
+        x = i % cols
+        for j in (i - 1 if x > 0 else -1, i + 1 if x < cols - 1 else -1,
+                  i - cols, i + cols):
+            if 0 <= j < n and dist[j] < 0 and not blocked[j]:
+                dist[j] = d
+                queue.append(j)
+    return dist
+
+def zone_transfer(grid, exits, portals):
+    """
+    구역 하나의 전달 테이블 계산 (다른 구역과 무관하므로 병렬 실행 가능)
+    :param grid: 구역 GridMap의 장애물 그리드
+    :param exits: 구역 안의 탈출구 셀 [(gx, gy), ...]
+    :param portals: 계단/통로 셀 [(gx, gy), ...]
+    :return: (portal -> 가장 가까운 탈출구 거리, portal -> {portal: 거리})
+    """
+    rows, cols = grid.shape
+    blocked = grid.ravel().tolist()
+
+    exit_dist = {}
+    if exits:
+        dist = _bfs(blocked, rows, cols, [gy * cols + gx for gx, gy in exits])
+        for gx, gy in portals:
+            d = dist[gy * cols + gx]
+            if d >= 0:
+                exit_dist[(gx, gy)] = d
+
+    portal_dist = {}
+    for p in portals:
+        dist = _bfs(blocked, rows, cols, [p[1] * cols + p[0]])
+        portal_dist[p] = {q: dist[q[1] * cols + q[0]] for q in portals
+                          if q != p and dist[q[1] * cols + q[0]] >= 0}
+    return exit_dist, portal_dist
+
+
+class BuildingGraph:
+    """
+    여러 GridMap(카메라/층 단위 구역)을 계단·통로(portal) 셀로 이어 붙인 건물 그래프
+    - 구역마다 portal 간 거리 / portal -> 탈출구 거리(전달 테이블)만 계산해 두고
+    - portal 그래프 위에서 건물 전체 대피 거리를 한 번에 구한 뒤
+    - 각 구역의 portal 셀에 그 거리를 출발점(seed)으로 넣어 구역 거리장을 만듭니다.
+    한 층에 불이 나면 그 구역의 전달 테이블만 다시 계산합니다.
+    (seed는 planner가 "field" / "incremental"인 GridMap에서만 반영됩니다.)
+    """
+    def __init__(self, max_workers=None, executor=None):
+        self.zones = {}       # 구역 이름 -> GridMap
+        self.portals = {}     # 구역 이름 -> [(gx, gy), ...]
+        self.links = []       # ((구역, 셀), (구역, 셀), 비용)
+
+        self._snapshots = {}  # 구역 이름 -> (그리드, 탈출구, portal) 마지막 반영 상태
+        self._transfer = {}   # 구역 이름 -> zone_transfer 결과
+        self.global_dist = {} # (구역, 셀) -> 건물 밖까지 거리
+        self.last_replanned_zones = []
+
+        # 구역 재계산용 작업 풀 (ProcessPoolExecutor를 넘겨도 됨)
+        self.executor = executor or ThreadPoolExecutor(max_workers=max_workers)
+
+    def add_zone(self, name, grid_map):
+        self.zones[name] = grid_map
+        self.portals.setdefault(name, [])
+
+    def add_portal(self, zone_a, pos_a, zone_b, pos_b, cost=1):
+        """두 구역의 픽셀 좌표를 계단/통로로 연결 (cost: 이동 비용, 셀 단위)"""
+        cell_a = self.zones[zone_a]._to_grid(*pos_a)
+        cell_b = self.zones[zone_b]._to_grid(*pos_b)
+        for name, cell in ((zone_a, cell_a), (zone_b, cell_b)):
+            if cell not in self.portals[name]:
+                self.portals[name].append(cell)
+        self.links.append(((zone_a, cell_a), (zone_b, cell_b), cost))
+
+    def update(self):
+        """바뀐 구역만 (병렬로) 다시 계산하고 건물 전체 거리를 갱신"""
+        dirty = []
+        for name, gm in self.zones.items():
+            snap = self._snapshots.get(name)
+            exits = tuple(gm.exits)
+            portals = tuple(self.portals[name])
+            if (snap is None or snap[1] != exits or snap[2] != portals
+                    or not np.array_equal(snap[0], gm.grid)):
+                self._snapshots[name] = (gm.grid.copy(), exits, portals)
+                dirty.append(name)
+
+        if dirty:
+            args = [self._snapshots[name] for name in dirty]
+            results = self.executor.map(zone_transfer, *zip(*args))
+            for name, result in zip(dirty, results):
+                self._transfer[name] = result
+            self._solve_global()
+        self.last_replanned_zones = dirty
+
+        # 건물 전체 거리를 각 구역 portal 셀의 seed로 반영 (값이 같으면 거리장 유지)
+        for name, gm in self.zones.items():
+            gm.set_seeds({cell: self.global_dist[(name, cell)]
+                          for cell in self.portals[name] if (name, cell) in self.global_dist})
+
+    def _solve_global(self):
+        """portal 그래프 위 Dijkstra: 각 portal에서 건물 밖까지의 최단 거리"""
+        graph = {}
+        for name, (_, portal_dist) in self._transfer.items():
+            for p, nbrs in portal_dist.items():
+                edges = graph.setdefault((name, p), {})
+                for q, d in nbrs.items():
+                    edges[(name, q)] = d
+        for a, b, cost in self.links:
+            graph.setdefault(a, {})[b] = cost
+            graph.setdefault(b, {})[a] = cost
+
+        dist = {}
+        open_list = []
+        for name, (exit_dist, _) in self._transfer.items():
+            for p, d in exit_dist.items():
+                dist[(name, p)] = d
+                open_list.append((d, name, p))
+        heapq.heapify(open_list)
+
+        while open_list:
+            d, name, p = heapq.heappop(open_list)
+            if d != dist[(name, p)]:
+                continue
+            for node, w in graph.get((name, p), {}).items():
+                nd = d + w
+                if node not in dist or nd < dist[node]:
+                    dist[node] = nd
+                    heapq.heappush(open_list, (nd, node[0], node[1]))
+        self.global_dist = dist
+
+    def get_shortest_path(self, zone, x, y):
+        """구역 안 경로 (탈출구 또는 다음 구역으로 가는 계단/통로 셀까지)"""
+        return self.zones[zone].get_shortest_path(x, y)
+
+    def get_distance(self, zone, x, y):
+        """건물 밖까지 남은 칸 수 (-1 = 도달 불가)"""
+        return self.zones[zone].get_distance(x, y)
+
+    def close(self):
+        self.executor.shutdown(wait=False)
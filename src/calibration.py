@@ -0,0 +1,98 @@
+import os
+import cv2
+import numpy as np
+
+# 보드 보정 결과 저장 위치 (src/calibration.npz)
+CALIBRATION_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "calibration.npz")
+
+class Calibration:
+    """
+    카메라 화면 -> 맵 평면(width x height) 보정
+    - 보드 모서리는 calibrate()에서 한 번만 찾고 호모그래피를 파일로 저장
+    - 출력 픽셀마다 원본 좌표를 미리 계산한 remap 테이블(고정소수점)을 만들어 두고
+      매 프레임은 cv2.remap 한 번으로 원근 보정 + 640x480 리사이즈를 같이 처리
+    - 입력 해상도가 바뀌면 그 해상도용 테이블을 한 번 더 만들어 캐시
+    """
+    def __init__(self, width=640, height=480):
+        self.width = width
+        self.height = height
+        self.corners = None        # 원본 프레임 기준 (tl, tr, br, bl)
+        self.source_size = None    # 보정할 때의 원본 프레임 (width, height)
+        self.homography = None     # 원본 -> 맵 평면 3x3
+        self._maps = {}            # 입력 (width, height) -> (map1, map2)
+
+    @property
+    def calibrated(self):
+        return self.homography is not None
+
+    def calibrate(self, frame, detector):
+        """보드 모서리를 찾아 보정 (실패하면 기존 보정 유지하고 False)"""
+        corners, _ = detector.detect_corners(frame)
+        if corners is None:
+            return False
+        self.set_corners(corners, (frame.shape[1], frame.shape[0]))
+        return True
+
+    def set_corners(self, corners, source_size):
+        dst = np.array([[0, 0], [self.width - 1, 0], [self.width - 1, self.height - 1],
+                        [0, self.height - 1]], dtype=np.float32)
+        self.corners = np.asarray(corners, dtype=np.float32).reshape(4, 2)
+        self.source_size = (int(source_size[0]), int(source_size[1]))
+        self.homography = cv2.getPerspectiveTransform(self.corners, dst)
+        self._maps = {}
+
+    def board_fraction(self):
+        """
+        원본 프레임에서 보드가 차지하는 (가로, 세로) 비율 (보정 전이면 None)
+        원근 때문에 짧아진 쪽 변 기준 (그 변도 출력 해상도 이상으로 디코딩되도록)
+        """
+        if not self.calibrated:
+            return None
+        tl, tr, br, bl = self.corners
+        width = min(np.linalg.norm(tr - tl), np.linalg.norm(br - bl))
+        height = min(np.linalg.norm(bl - tl), np.linalg.norm(br - tr))
+        return (min(1.0, float(width) / self.source_size[0]),
+                min(1.0, float(height) / self.source_size[1]))
+
+    def _build_maps(self, size):
+        """출력 픽셀 -> 원본 좌표 테이블 (입력 해상도가 보정 때와 다르면 배율 반영)"""
+        sx = size[0] / float(self.source_size[0])
+        sy = size[1] / float(self.source_size[1])
+        inv = np.diag([sx, sy, 1.0]) @ np.linalg.inv(self.homography)
+
+        xs, ys = np.meshgrid(np.arange(self.width, dtype=np.float64),
+                             np.arange(self.height, dtype=np.float64))
+        pts = np.stack([xs, ys, np.ones_like(xs)], axis=-1) @ inv.T
+        map_x = (pts[..., 0] / pts[..., 2]).astype(np.float32)
+        map_y = (pts[..., 1] / pts[..., 2]).astype(np.float32)
+        # 고정소수점(CV_16SC2) 테이블이 float 테이블보다 remap이 빠름
+        return cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+
+    def apply(self, frame):
+        """보정 + 리사이즈된 맵 평면 이미지 (보정 전이면 단순 리사이즈)"""
+        h, w = frame.shape[:2]
+        if not self.calibrated:
+            if (w, h) != (self.width, self.height):
+                frame = cv2.resize(frame, (self.width, self.height))
+            return frame
+
+        maps = self._maps.get((w, h))
+        if maps is None:
+            maps = self._maps[(w, h)] = self._build_maps((w, h))
+        return cv2.remap(frame, maps[0], maps[1], cv2.INTER_LINEAR)
+
+    def save(self, path=CALIBRATION_PATH):
+        np.savez(path, homography=self.homography, corners=self.corners,
+                 source_size=np.array(self.source_size),
+                 output_size=np.array([self.width, self.height]))
+
+    @classmethod
+    def load(cls, path=CALIBRATION_PATH):
+        """저장된 보정 불러오기 (파일이 없으면 보정 안 된 상태)"""
+        if not os.path.exists(path):
+            return None
+        data = np.load(path)
+        width, height = data["output_size"].tolist()
+        calib = cls(width, height)
+        calib.set_corners(data["corners"], data["source_size"].tolist())
+        return calib
@@ -1,16 +1,321 @@
 import cv2
+import numpy as np
+import re
+import struct
+import threading
+import time
+import urllib.request
+
+class LatestFrameReader:
+    """
+    백그라운드 스레드에서 계속 프레임을 읽어 '가장 최근 프레임 1장'만 보관합니다.
+    처리 루프가 느려져도 OpenCV/MJPEG 내부 버퍼에 옛 프레임이 쌓이지 않습니다.
+    처리하지 못하고 덮어쓴 프레임 수는 dropped로 셉니다.
+    """
+    def __init__(self, cap):
+        self.cap = cap
+        self._cond = threading.Condition()
+        self._frame = None
+        self._timestamp = 0.0
+        self._seq = 0            # 읽은 프레임 번호 (1부터)
+        self._consumed_seq = 0   # 마지막으로 내보낸 프레임 번호
+        self._running = False
+        self._ended = False
+
+        self.frames_read = 0
+        self.frames_dropped = 0
+
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+
+    def start(self):
+        self._running = True
+        self.thread.start()
+
+    def _run(self):
+        while self._running:
+            ret, frame = self.cap.read()
+            now = time.time()
+            with self._cond:
+                if not ret:
+                    self._ended = True
+                    self._cond.notify_all()
+                    return
+                # 아직 안 가져간 프레임을 덮어쓰면 드롭으로 기록
+                if self._seq > self._consumed_seq:
+                    self.frames_dropped += 1
+                self._frame = frame
+                self._timestamp = now
+                self._seq += 1
+                self.frames_read += 1
+                self._cond.notify_all()
+
+    def read(self, timeout=5.0):
+        """
+        아직 내보내지 않은 가장 최근 프레임을 반환 (없으면 새 프레임까지 대기)
+        :return: (ret, frame, timestamp, seq)
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > self._consumed_seq or self._ended,
+                                timeout=timeout)
+            if self._seq <= self._consumed_seq:
+                return False, None, 0.0, self._seq
+            self._consumed_seq = self._seq
+            return True, self._frame, self._timestamp, self._seq
+
+    def stats(self):
+        with self._cond:
+            return {"read": self.frames_read, "dropped": self.frames_dropped,
+                    "latest_seq": self._seq, "age": time.time() - self._timestamp if self._seq else None}
+
+    def stop(self):
+        self._running = False
+        if self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+
+
+# JPEG DCT 축소 디코딩 (1/8, 1/4, 1/2 순으로 시도)
+_REDUCED_FLAGS = ((8, cv2.IMREAD_REDUCED_COLOR_8),
+                  (4, cv2.IMREAD_REDUCED_COLOR_4),
+                  (2, cv2.IMREAD_REDUCED_COLOR_2))
+
+_CONTENT_LENGTH = re.compile(rb"content-length\s*:\s*(\d+)", re.IGNORECASE)
+MAX_PART_BYTES = 16 * 1024 * 1024   # 이보다 큰 Content-Length는 믿지 않음
+MAX_HEADER_BYTES = 4096             # 파트 헤더를 기다리며 보관하는 최대 크기
+
+def _jpeg_size(data):
+    """JPEG 헤더의 SOF 마커에서 (width, height)를 읽음 (디코딩 없이)"""
+    i = 2
+    n = len(data)
+    while i + 9 < n:
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+            i += 1 if marker == 0xFF else 2
+            continue
+        seg_len = struct.unpack(">H", data[i + 2:i + 4])[0]
+        # SOF0~SOF15 (DHT=C4, JPG=C8, DAC=CC 제외)
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            h, w = struct.unpack(">HH", data[i + 5:i + 9])
+            return w, h
+        i += 2 + seg_len
+    return None
+
+class MJPEGStreamReader:
+    """
+    MJPEG-over-HTTP 스트림(mjpg-streamer 등)을 직접 읽는 리더
+    - multipart 스트림에서 JPEG만 잘라 가장 최근 1장만 보관
+      파트 헤더에 Content-Length가 있으면 그 길이만큼 그대로 읽고
+      (JPEG 안의 썸네일이나 우연히 나온 FFD9에서 잘리지 않도록), 없을 때만 SOI~EOI 마커로 자름
+    - 디코딩은 read() 때만 하므로 버려지는 프레임은 디코딩하지 않음
+    - JPEG DCT 1/2, 1/4, 1/8 축소 디코딩으로 작업 해상도(size)에 바로 맞춤
+    - 보정(원근 변환)을 쓰는 경우 set_decode_region()으로 보드가 차지하는 비율을 알려주면
+      보드 영역이 size 이상으로 남는 가장 작은 배율로만 디코딩하고 리사이즈하지 않음
+      (리샘플링은 보정 remap 한 번으로 끝나도록)
+    LatestFrameReader와 같은 read() / stats() / stop() 인터페이스를 가집니다.
+    """
+    def __init__(self, url, size, timeout=5.0, chunk_size=16384):
+        self.url = url
+        self.size = size  # (width, height)
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+
+        self._cond = threading.Condition()
+        self._jpeg = None
+        self._timestamp = 0.0
+        self._seq = 0
+        self._consumed_seq = 0
+        self._running = False
+        self._ended = False
+        self._stream = None
+        self._decode_flag = None  # 크기를 읽을 수 있었던 첫 프레임을 보고 결정
+        self._region = None       # (가로 비율, 세로 비율) - None이면 전체 프레임을 size로 리사이즈
+
+        self.frames_read = 0
+        self.frames_dropped = 0   # 디코딩하지 않고 버린 프레임
+        self.frames_decoded = 0
+        self.frames_corrupt = 0   # 디코딩에 실패해서 건너뛴 프레임
+
+        self.thread = threading.Thread(target=self._run)
+        self.thread.daemon = True
+
+    def start(self):
+        # 접속 실패는 호출한 쪽에서 바로 알 수 있도록 여기서 연결
+        self._stream = urllib.request.urlopen(self.url, timeout=self.timeout)
+        self._running = True
+        self.thread.start()
+
+    def _run(self):
+        buf = bytearray()
+        try:
+            while self._running:
+                chunk = self._stream.read1(self.chunk_size)
+                if not chunk:
+                    break
+                buf += chunk
+                for jpeg in self._split_frames(buf):
+                    self._publish(jpeg)
+        except OSError as e:
+            print(f"[WARN] MJPEG 스트림 읽기 중단: {e}")
+        with self._cond:
+            self._ended = True
+            self._cond.notify_all()
+
+    @staticmethod
+    def _split_frames(buf):
+        """
+        buf(bytearray)에서 완성된 JPEG을 모두 꺼내 반환하고, 쓴 만큼 buf에서 지움
+        (아직 다 오지 않은 파트는 buf에 남겨 다음 청크와 이어 붙임)
+        """
+        frames = []
+        while True:
+            start = buf.find(b"\xff\xd8")
+            header_end = buf.find(b"\r\n\r\n", 0, start if start >= 0 else len(buf))
+            if header_end >= 0:
+                # JPEG 앞에 파트 헤더가 있음: Content-Length가 있으면 그 길이만큼
+                body = header_end + 4
+                match = _CONTENT_LENGTH.search(buf, 0, header_end)
+                length = int(match.group(1)) if match else None
+                if length is not None and 0 < length <= MAX_PART_BYTES:
+                    if len(buf) < body + length:
+                        break
+                    jpeg = bytes(buf[body:body + length])
+                    if jpeg.startswith(b"\xff\xd8") and jpeg.rstrip(b"\r\n\x00").endswith(b"\xff\xd9"):
+                        frames.append(jpeg)
+                        del buf[:body + length]
+                        continue
+                # 길이가 없거나 맞지 않으면 헤더만 버리고 마커로 자름
+                del buf[:body]
+                continue
+            if start < 0:
+                # 헤더가 청크 경계에 걸친 경우 대비해 끝부분만 보관
+                if len(buf) > MAX_HEADER_BYTES:
+                    del buf[:-MAX_HEADER_BYTES]
+                break
+            end = buf.find(b"\xff\xd9", start + 2)
+            if end < 0:
+                del buf[:start]
+                break
+            frames.append(bytes(buf[start:end + 2]))
+            del buf[:end + 2]
+        return frames
+
+    def _publish(self, jpeg):
+        with self._cond:
+            if self._seq > self._consumed_seq:
+                self.frames_dropped += 1
+            self._jpeg = jpeg
+            self._timestamp = time.time()
+            self._seq += 1
+            self.frames_read += 1
+            self._cond.notify_all()
+
+    def set_decode_region(self, fraction):
+        """
+        :param fraction: (가로, 세로) 원본 프레임 중 size 해상도로 펼칠 영역의 비율 (보정된 보드 크기)
+                         None이면 전체 프레임을 size로 리사이즈 (기본)
+        """
+        self._region = None if fraction is None else (float(fraction[0]), float(fraction[1]))
+        self._decode_flag = None  # 다음 프레임에서 배율 다시 선택
+
+    def _choose_flag(self, jpeg):
+        """
+        작업 해상도보다 작아지지 않는 가장 큰 축소 비율 선택 (헤더에서 크기를 못 읽으면 None)
+        영역이 지정되어 있으면 그 영역이 작업 해상도보다 작아지지 않는 비율
+        """
+        dims = _jpeg_size(jpeg)
+        if dims is None:
+            return None
+        w, h = dims
+        if self._region is not None:
+            w, h = w * self._region[0], h * self._region[1]
+        tw, th = self.size
+        for factor, flag in _REDUCED_FLAGS:
+            if w / factor >= tw and h / factor >= th:
+                return flag
+        return cv2.IMREAD_COLOR
+
+    def decode(self, jpeg):
+        """작업 해상도로 디코딩 (깨진 JPEG이면 None)"""
+        flag = self._decode_flag
+        if flag is None:
+            # 크기를 읽은 프레임에서만 고정 (못 읽으면 이번 프레임만 원본 크기로 디코딩)
+            flag = self._decode_flag = self._choose_flag(jpeg)
+            if flag is None:
+                flag = cv2.IMREAD_COLOR
+        frame = cv2.imdecode(np.frombuffer(jpeg, dtype=np.uint8), flag)
+        if frame is None:
+            return None
+        if self._region is None and (frame.shape[1], frame.shape[0]) != tuple(self.size):
+            frame = cv2.resize(frame, tuple(self.size), interpolation=cv2.INTER_AREA)
+        self.frames_decoded += 1
+        return frame
+
+    def read(self, timeout=5.0):
+        """
+        가장 최근 프레임을 작업 해상도로 디코딩해서 반환
+        깨진 JPEG은 건너뛰고 다음 프레임을 기다림 (ret=False는 스트림 종료 또는 timeout초 동안 프레임 없음)
+        :return: (ret, frame, timestamp, seq)
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._seq > self._consumed_seq or self._ended,
+                                    timeout=max(0.0, deadline - time.monotonic()))
+                if self._seq <= self._consumed_seq:
+                    return False, None, 0.0, self._seq
+                self._consumed_seq = self._seq
+                jpeg, ts, seq = self._jpeg, self._timestamp, self._seq
+            # 디코딩은 락 밖에서 (수신 스레드를 막지 않도록)
+            frame = self.decode(jpeg)
+            if frame is not None:
+                return True, frame, ts, seq
+            self.frames_corrupt += 1
+
+    def stats(self):
+        with self._cond:
+            return {"read": self.frames_read, "dropped": self.frames_dropped,
+                    "decoded": self.frames_decoded, "corrupt": self.frames_corrupt,
+                    "latest_seq": self._seq,
+                    "age": time.time() - self._timestamp if self._seq else None}
+
+    def stop(self):
+        self._running = False
+        if self._stream is not None:
+            self._stream.close()
+        if self.thread.is_alive():
+            self.thread.join(timeout=1.0)
+
 
 class Camera:
-    def __init__(self, source=1):
+    def __init__(self, source=1, threaded=False, mjpeg_size=None):
         """
         카메라를 초기화합니다.
         :param source: 카메라 인덱스(0) 또는 스트림 URL(문자열).
+        :param threaded: True면 백그라운드 스레드가 계속 읽고 get_frame은 항상 최신 프레임을 반환
+        :param mjpeg_size: (width, height) 지정 시 URL을 MJPEG 전용 리더로 읽고
+                           그 해상도로 축소 디코딩 (항상 최신 프레임, threaded 불필요)
         """
+        self.cap = None
+        self.reader = None
+
+        # MJPEG 전용 리더 (cv2.VideoCapture 사용 안 함)
+        if isinstance(source, str) and mjpeg_size is not None:
+            print(f"[INFO] MJPEG 스트림 접속 시도: {source}")
+            self.reader = MJPEGStreamReader(source, mjpeg_size)
+            try:
+                self.reader.start()
+            except OSError as e:
+                raise ValueError("Could not open video source ({}): {}".format(source, e))
+            return
+
         # source가 문자열(URL)인 경우: 웹 스트리밍 주소로 간주
         if isinstance(source, str):
             print(f"[INFO] 네트워크 스트림 접속 시도: {source}")
             self.cap = cv2.VideoCapture(source)
-        
+
         # source가 숫자(Int)인 경우: 로컬 USB 카메라로 간주
         else:
             # 1) Windows에서 MSMF 대신 DSHOW 백엔드 먼저 시도 (로컬 카메라용)
@@ -25,10 +330,31 @@ class Camera:
         if not self.cap.isOpened():
             raise ValueError("Could not open video source ({})".format(source))
 
+        if threaded:
+            self.reader = LatestFrameReader(self.cap)
+            self.reader.start()
+
+    def set_decode_region(self, fraction):
+        """MJPEG 리더면 보정 영역 기준 축소 디코딩 설정 (그 외에는 아무것도 안 함)"""
+        if isinstance(self.reader, MJPEGStreamReader):
+            self.reader.set_decode_region(fraction)
+
     def get_frame(self):
+        if self.reader is not None:
+            ret, frame, _, _ = self.reader.read()
+            return ret, frame
         ret, frame = self.cap.read()
         return ret, frame
 
+    def get_frame_info(self):
+        """(ret, frame, 캡처 시각, 프레임 번호) 반환 - 프레임 지연/드롭 확인용"""
+        if self.reader is not None:
+            return self.reader.read()
+        ret, frame = self.cap.read()
+        return ret, frame, time.time(), None
+
     def release(self):
+        if self.reader is not None:
+            self.reader.stop()
         if self.cap is not None:
-            self.cap.release()
\ No newline at end of file
+            self.cap.release()
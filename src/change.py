@@ -0,0 +1,174 @@
+import cv2
+import numpy as np
+
+class TileChangeDetector:
+    """
+    고정 카메라용 타일 단위 변화 감지기
+    - 프레임을 tile_size x tile_size 타일로 나누고 기준 프레임과의 차이를 비교
+    - 어느 채널이든 차이가 diff_thresh를 넘는 값이 min_pixels개 이상인 타일만 '변경'
+    - 변경된 타일만 기준 프레임을 갱신 (느린 조명 변화는 누적되다가 한 번에 반영됨)
+    """
+    def __init__(self, tile_size=32, diff_thresh=20, min_pixels=4):
+        self.tile_size = tile_size
+        self.diff_thresh = diff_thresh
+        self.min_pixels = min_pixels
+
+        self.reference = None
+        self.tiles_y = 0
+        self.tiles_x = 0
+        self._ys = None       # 적분 영상에서 읽을 타일 경계 (행/열 인덱스)
+        self._xs = None
+        self.last_changed = 0
+
+    def reset(self):
+        self.reference = None
+
+    def update(self, frame):
+        """
+        :return: (tiles_y, tiles_x) bool 배열 (첫 프레임/해상도 변경 시 전부 True)
+        """
+        h, w = frame.shape[:2]
+        T = self.tile_size
+        if self.reference is None or self.reference.shape != frame.shape:
+            self.tiles_y = (h + T - 1) // T
+            self.tiles_x = (w + T - 1) // T
+            self._ys = np.minimum(np.arange(self.tiles_y + 1) * T, h)
+            self._xs = np.minimum(np.arange(self.tiles_x + 1) * T, w) * 3
+            self.reference = frame.copy()
+            changed = np.ones((self.tiles_y, self.tiles_x), dtype=bool)
+            self.last_changed = changed.size
+            return changed
+
+        # 채널별 차이 -> 변화 값(1) -> 적분 영상으로 타일별 개수 (채널을 가로로 펼쳐서 계산)
+        diff = cv2.absdiff(frame, self.reference)
+        _, moved = cv2.threshold(diff, self.diff_thresh, 1, cv2.THRESH_BINARY)
+        s = cv2.integral(moved.reshape(h, w * 3))
+        corners = s[np.ix_(self._ys, self._xs)]
+        counts = corners[1:, 1:] - corners[:-1, 1:] - corners[1:, :-1] + corners[:-1, :-1]
+        changed = counts >= self.min_pixels
+
+        self.last_changed = int(changed.sum())
+        if self.last_changed:
+            for y0, y1, x0, x1 in self.changed_rects(changed, w, h):
+                self.reference[y0:y1, x0:x1] = frame[y0:y1, x0:x1]
+        return changed
+
+    def changed_rects(self, changed, width, height):
+        """변경 타일을 행 단위 연속 구간으로 묶은 픽셀 영역 [(y0, y1, x0, x1), ...]"""
+        T = self.tile_size
+        rects = []
+        for ty, row in enumerate(changed):
+            cols = np.flatnonzero(row)
+            if cols.size == 0:
+                continue
+            # 연속된 타일 구간의 시작/끝
+            breaks = np.flatnonzero(np.diff(cols) > 1)
+            starts = np.concatenate(([cols[0]], cols[breaks + 1]))
+            ends = np.concatenate((cols[breaks], [cols[-1]]))
+            y0, y1 = ty * T, min((ty + 1) * T, height)
+            for a, b in zip(starts, ends):
+                rects.append((y0, y1, int(a) * T, min((int(b) + 1) * T, width)))
+        return rects
+
+
+class ChangeDrivenDetector:
+    """
+    Detector 앞단에서 바뀐 타일만 다시 분류하는 래퍼 (Detector와 같은 호출 방식)
+    - 불/벽 색상 판정 결과를 타일별로 캐시하고, 변경된 타일만 다시 판정
+    - 아무 타일도 안 바뀌었으면 지난 결과(박스, 마스크)를 그대로 반환
+    - 잡음 제거/윤곽선은 색상 판정 결과가 실제로 달라졌을 때만 전체 마스크에서 한 번 실행
+    - diff_thresh보다 작게 변한 픽셀(불꽃 밝기가 FIRE_BRIGHT_THRESH나 HSV 경계를 살짝 넘는 경우 등)은
+      변화로 잡히지 않으므로, 매 프레임 타일 한 줄씩 돌아가며 강제로 다시 판정
+      -> 어떤 픽셀의 판정도 최대 refresh_frames 프레임 늦게 반영됨 (기본 30프레임, 30fps에서 약 1초)
+    같은 프레임 객체로 detect_fire / detect_walls_in_map을 부르면 변화 비교는 한 번만 합니다.
+    """
+    def __init__(self, detector, tile_size=32, diff_thresh=20, min_pixels=4, refresh_frames=30):
+        self.detector = detector
+        self.changes = TileChangeDetector(tile_size, diff_thresh, min_pixels)
+        self.refresh_frames = refresh_frames
+        self._frame = None
+        self._frame_count = 0
+
+        # 레이어별: 아직 반영 안 된 변경 타일, 색상 마스크 캐시, 결과 캐시, 임계값 키
+        self._layers = {
+            "fire": {"pending": None, "color": None, "result": None, "key": None},
+            "walls": {"pending": None, "color": None, "result": None, "key": None},
+        }
+        self.reclassified_tiles = {"fire": 0, "walls": 0}
+
+    def update(self, frame):
+        """새 프레임의 변경 타일을 계산해 각 레이어에 쌓아 둠"""
+        if frame is self._frame:
+            return
+        self._frame = frame
+        changed = self.changes.update(frame)
+        self._frame_count += 1
+        if self.refresh_frames:
+            # 타일 행마다 refresh_frames 프레임에 한 번씩 강제 재판정 (변화 감지 임계값 아래 변화 대비)
+            phase = self._frame_count % self.refresh_frames
+            rows = np.arange(self.changes.tiles_y) * self.refresh_frames // self.changes.tiles_y
+            changed = changed | (rows == phase)[:, None]
+        for layer in self._layers.values():
+            if layer["pending"] is None or layer["pending"].shape != changed.shape:
+                layer["pending"] = changed.copy()
+                layer["color"] = None
+            else:
+                layer["pending"] |= changed
+
+    def _fire_key(self):
+        d = self.detector
+        return (d.FIRE_BRIGHT_THRESH, d.FIRE_RB_DIFF, tuple(d.FIRE_RED_RANGES), d.use_fire_lut)
+
+    def _refresh(self, name, frame, key, classify):
+        """레이어의 변경 타일만 다시 분류. 판정 결과가 달라졌으면 True"""
+        self.update(frame)
+        layer = self._layers[name]
+        h, w = frame.shape[:2]
+        if layer["color"] is None or layer["key"] != key:
+            layer["color"] = np.zeros((h, w), dtype=np.uint8)
+            layer["pending"][:] = True
+            layer["key"] = key
+            layer["result"] = None
+
+        pending = layer["pending"]
+        count = int(pending.sum())
+        self.reclassified_tiles[name] = count
+        if count == 0 and layer["result"] is not None:
+            return False
+
+        color = layer["color"]
+        dirty = layer["result"] is None
+        if count == pending.size:
+            new = classify(frame)
+            dirty = dirty or not np.array_equal(color, new)
+            color[:] = new
+        else:
+            for y0, y1, x0, x1 in self.changes.changed_rects(pending, w, h):
+                new = classify(np.ascontiguousarray(frame[y0:y1, x0:x1]))
+                if not dirty and not np.array_equal(color[y0:y1, x0:x1], new):
+                    dirty = True
+                color[y0:y1, x0:x1] = new
+        pending[:] = False
+        return dirty
+
+    def detect_fire(self, frame):
+        """Detector.detect_fire와 같은 (fire_boxes, mask) 반환"""
+        d = self.detector
+        layer = self._layers["fire"]
+        if self._refresh("fire", frame, self._fire_key(),
+                         lambda img: d._classify_fire(img, reuse=False)):
+            layer["result"] = d._fire_boxes(layer["color"])
+        return layer["result"]
+
+    def detect_walls_in_map(self, frame):
+        """Detector.detect_walls_in_map과 같은 벽 마스크 반환"""
+        d = self.detector
+        layer = self._layers["walls"]
+        if self._refresh("walls", frame, d.WALL_THRESH, d.wall_color_mask):
+            layer["result"] = d._clean_walls(layer["color"])
+        return layer["result"]
+
+    def stats(self):
+        return {"changed_tiles": self.changes.last_changed,
+                "total_tiles": self.changes.tiles_y * self.changes.tiles_x,
+                "reclassified": dict(self.reclassified_tiles)}
@@ -8,6 +8,23 @@ class Detector:
         self.MIN_WALL_AREA = 500     # 잡음 제거를 위한 최소 벽 면적
         self.MIN_FIRE_AREA = 10      # 최소 불 영역 크기
 
+        # 불 색상 판정 임계값 (바꾸면 다음 detect_fire에서 LUT가 다시 만들어짐)
+        self.FIRE_BRIGHT_THRESH = 230   # 불꽃: R 밝기 기준
+        self.FIRE_RB_DIFF = 30          # 불꽃: R - B 차이 기준
+        self.FIRE_RED_RANGES = (        # 빨간 양초 본체 HSV 범위
+            ((0, 100, 100), (10, 255, 255)),
+            ((170, 100, 100), (180, 255, 255)),
+        )
+        self.use_fire_lut = True        # False면 기존 채널 분리/HSV 방식으로 판정
+
+        self._warp_key = None           # warp_perspective 변환 행렬 캐시
+        self._warp_matrix = None
+
+        # BGR 전체(2^24색) -> 불 여부 룩업 테이블과 재사용 버퍼
+        self._fire_lut = None
+        self._fire_lut_key = None
+        self._lut_buffers = {}   # (h, w) -> (BGR0 버퍼, 마스크 버퍼), 4번째 바이트는 항상 0
+
     def detect_corners(self, frame):
         """
         [최적화됨] HSV + 침식 연산으로 그림자 제거 및 사각형 검출 강화
@@ -80,57 +97,118 @@ class Detector:
     def warp_perspective(self, frame, corners, width, height):
         if corners is None: return None
         
-        dst = np.array([[0, 0], [width-1, 0], [width-1, height-1], [0, height-1]], dtype=np.float32)
+        # 같은 모서리/크기면 변환 행렬 재사용 (매 프레임 보정은 calibration.Calibration 사용)
         src = corners.reshape(4, 2).astype(np.float32)
-        M = cv2.getPerspectiveTransform(src, dst)
-        return cv2.warpPerspective(frame, M, (width, height))
+        key = (src.tobytes(), width, height)
+        if self._warp_key != key:
+            dst = np.array([[0, 0], [width-1, 0], [width-1, height-1], [0, height-1]], dtype=np.float32)
+            self._warp_matrix = cv2.getPerspectiveTransform(src, dst)
+            self._warp_key = key
+        return cv2.warpPerspective(frame, self._warp_matrix, (width, height))
 
     def detect_walls_in_map(self, warped_frame):
         """
         [새 기능] 맵 내부의 흰색 벽을 감지합니다.
         검은색 바닥(어두움) vs 흰색 벽(밝음)
         """
-        gray = cv2.cvtColor(warped_frame, cv2.COLOR_BGR2GRAY)
-        
-        # 밝은 부분(흰색 벽)만 추출
+        mask = self.wall_color_mask(warped_frame)
+        return self._clean_walls(mask) # GridMap에서 이 마스크를 사용해 장애물 등록
+
+    def wall_color_mask(self, frame):
+        """밝은 부분(흰색 벽)만 추출 (픽셀 단위 판정, 잡음 제거 전)"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         _, mask = cv2.threshold(gray, self.WALL_THRESH, 255, cv2.THRESH_BINARY)
-        
+        return mask
+
+    def _clean_walls(self, mask):
         # 노이즈 제거
         kernel = np.ones((3, 3), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-        
-        return mask # GridMap에서 이 마스크를 사용해 장애물 등록
+        return cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
 
-    def detect_fire(self, frame):
+    def fire_color_mask(self, frame):
         """
-        [수정됨] 실제 불꽃(밝음) + 꺼진 양초(빨간색) 모두 감지
+        [기존 방식] 픽셀 색상만으로 불 후보 판정 (0 or 255 마스크)
+        실제 불꽃(밝음) + 꺼진 양초(빨간색) 모두 감지
         """
         # === 1. 불꽃 감지 (기존 로직: 밝고 붉은 빛) ===
         b, g, r = cv2.split(frame)
-        _, mask_bright = cv2.threshold(r, 230, 255, cv2.THRESH_BINARY)
+        _, mask_bright = cv2.threshold(r, self.FIRE_BRIGHT_THRESH, 255, cv2.THRESH_BINARY)
         r_int = r.astype(np.int16)
         b_int = b.astype(np.int16)
-        mask_light_color = np.where((r_int - b_int) > 30, 255, 0).astype(np.uint8)
+        mask_light_color = np.where((r_int - b_int) > self.FIRE_RB_DIFF, 255, 0).astype(np.uint8)
         mask_flame = cv2.bitwise_and(mask_bright, mask_light_color)
 
         # === 2. 빨간색 양초 본체 감지 (HSV 색상) ===
         hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
         
-        # 빨간색 범위 정의 (꺼진 양초 색상)
-        # Range 1 (0 ~ 10)
-        lower_red1 = np.array([0, 100, 100])
-        upper_red1 = np.array([10, 255, 255])
-        # Range 2 (170 ~ 180)
-        lower_red2 = np.array([170, 100, 100])
-        upper_red2 = np.array([180, 255, 255])
-        
-        mask_red1 = cv2.inRange(hsv, lower_red1, upper_red1)
-        mask_red2 = cv2.inRange(hsv, lower_red2, upper_red2)
-        mask_candle_body = cv2.bitwise_or(mask_red1, mask_red2)
+        # 빨간색 범위 (꺼진 양초 색상): Range 1 (0 ~ 10) / Range 2 (170 ~ 180)
+        mask_candle_body = np.zeros(frame.shape[:2], dtype=np.uint8)
+        for lower, upper in self.FIRE_RED_RANGES:
+            mask_red = cv2.inRange(hsv, np.array(lower), np.array(upper))
+            mask_candle_body = cv2.bitwise_or(mask_candle_body, mask_red)
 
         # === 3. 두 결과 합치기 (불꽃 OR 양초본체) ===
-        mask = cv2.bitwise_or(mask_flame, mask_candle_body)
-        
+        return cv2.bitwise_or(mask_flame, mask_candle_body)
+
+    def _get_fire_lut(self):
+        """
+        fire_color_mask 규칙을 BGR 전체 색(2^24)에 미리 적용한 룩업 테이블 (16MB)
+        임계값이 바뀐 경우에만 다시 만듭니다.
+        인덱스: B | G << 8 | R << 16 (BGR0 픽셀을 little-endian uint32로 읽은 값)
+        """
+        key = (self.FIRE_BRIGHT_THRESH, self.FIRE_RB_DIFF, tuple(self.FIRE_RED_RANGES))
+        if self._fire_lut is not None and self._fire_lut_key == key:
+            return self._fire_lut
+
+        lut = np.empty(1 << 24, dtype=np.uint8)
+        # R 값 하나당 256x256(G x B) 이미지 한 장씩 판정
+        gg, bb = np.meshgrid(np.arange(256, dtype=np.uint8), np.arange(256, dtype=np.uint8),
+                             indexing="ij")
+        chunk = np.empty((256, 256, 3), dtype=np.uint8)
+        chunk[..., 0] = bb
+        chunk[..., 1] = gg
+        for r in range(256):
+            chunk[..., 2] = r
+            lut[r << 16:(r + 1) << 16] = self.fire_color_mask(chunk).ravel()
+
+        self._fire_lut = lut
+        self._fire_lut_key = key
+        return lut
+
+    def _fire_color_mask_lut(self, frame, reuse=True):
+        """
+        LUT로 한 번에 불 후보 판정
+        reuse=True면 해상도별 버퍼를 재사용 (결과는 다음 호출 때 덮어씀)
+        """
+        lut = self._get_fire_lut()
+        h, w = frame.shape[:2]
+        buffers = self._lut_buffers.get((h, w)) if reuse else None
+        if buffers is None:
+            buffers = (np.zeros((h, w, 4), dtype=np.uint8), np.empty((h, w), dtype=np.uint8))
+            if reuse:
+                self._lut_buffers[(h, w)] = buffers
+        bgr0, mask = buffers
+
+        # BGR -> BGR0 복사 (4번째 바이트는 0 유지) 후 픽셀당 한 번의 테이블 조회
+        cv2.mixChannels([frame], [bgr0], [0, 0, 1, 1, 2, 2])
+        index = bgr0.view("<u4")[..., 0]
+        np.take(lut, index, out=mask)
+        return mask
+
+    def _classify_fire(self, frame, reuse=True):
+        if self.use_fire_lut:
+            return self._fire_color_mask_lut(frame, reuse)
+        return self.fire_color_mask(frame)
+
+    def detect_fire(self, frame):
+        """
+        [수정됨] 실제 불꽃(밝음) + 꺼진 양초(빨간색) 모두 감지
+        색상 판정은 미리 만든 LUT 한 번 조회로 처리 (use_fire_lut=False면 기존 방식)
+        """
+        return self._fire_boxes(self._classify_fire(frame))
+
+    def _fire_boxes(self, mask):
+        """색상 마스크 -> 잡음 제거 + 불 영역 박스"""
         # 잡음 제거 및 영역 확장
         kernel = np.ones((3, 3), np.uint8)
         mask = cv2.erode(mask, kernel, iterations=1) 
@@ -150,18 +228,22 @@ class Detector:
 
         return fire_boxes, mask
 
+    def _exit_color_mask(self, frame):
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        # 녹색 범위 (환경에 따라 튜닝 필요)
+        lower_green = np.array([40, 50, 50])
+        upper_green = np.array([80, 255, 255])
+        return cv2.inRange(hsv, lower_green, upper_green)
+
     def detect_exit(self, frame):
         """
         탈출구 인식. 바닥이 검은색이므로 탈출구는 '녹색'이나 다른 색이어야 인식 가능합니다.
         (기존의 녹색 종이 기준으로 작성)
         """
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        # 녹색 범위 (환경에 따라 튜닝 필요)
-        lower_green = np.array([40, 50, 50])
-        upper_green = np.array([80, 255, 255])
-        
-        mask = cv2.inRange(hsv, lower_green, upper_green)
-        
+        mask = self._exit_color_mask(frame)
+        return self._exit_boxes(mask)
+
+    def _exit_boxes(self, mask):
         contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         exit_boxes = []
         for c in contours:
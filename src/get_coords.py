@@ -1,9 +1,51 @@
+import os
 import cv2
 import numpy as np
+from calibration import Calibration
 from camera import Camera
+from detector import Detector
+from site_bundle import DETECTOR_THRESHOLDS, SITE_BUNDLE_PATH, write_site_bundle
 
 # main.py와 동일한 크기 사용
 MAP_W, MAP_H = 640, 480
+GRID_SIZE = 20   # main.py GRID_SIZE
+
+# 대시보드(virtual_core.py / app.py) 가상 맵용 정적 그리드도 함께 저장
+MAP_IMAGE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "background.png")
+MAP_WALL_THRESH = 60     # virtual_core.py 맵 장애물 기준
+MAP_GRID_SIZE = 10       # virtual_core.py grid_size
+DASHBOARD_WIDTH = 1100   # app.py TARGET_WIDTH
+
+def save_bundle(param, detector, calibration, frame):
+    """
+    찍은 좌표 + 임계값 + 보정 + 벽 그리드를 사이트 번들로 저장
+    이름은 0을 채운 번호 (LED_02 < LED_10 순서가 찍은 순서와 같도록),
+    파란 탈출구는 이름에 "Blue" (virtual_core 그리기 색상 기준)
+    """
+    digits = max(2, len(str(max(len(param['dots']), len(param['exits']), 1))))
+    nodes = {f"LED_{i + 1:0{digits}d}": p for i, p in enumerate(param['dots'])}
+    exits = {}
+    for i, (x, y, blue) in enumerate(param['exits']):
+        exits[f"Exit_{i + 1:0{digits}d} ({'Blue' if blue else 'Green'})"] = (x, y)
+    thresholds = {name: getattr(detector, name) for name in DETECTOR_THRESHOLDS}
+
+    masks = {"walls": detector.detect_walls_in_map(frame)}
+    grids = [("walls", MAP_W, MAP_H, GRID_SIZE)]
+    images = {}
+    map_img = cv2.imread(MAP_IMAGE_PATH)
+    if map_img is not None:
+        gray = cv2.cvtColor(map_img, cv2.COLOR_BGR2GRAY)
+        _, masks["map"] = cv2.threshold(gray, MAP_WALL_THRESH, 255, cv2.THRESH_BINARY)
+        h, w = gray.shape
+        dash_h = int(h * (DASHBOARD_WIDTH / w))
+        grids.append(("map", w, h, MAP_GRID_SIZE))
+        grids.append(("map", DASHBOARD_WIDTH, dash_h, MAP_GRID_SIZE))
+        # 대시보드가 PNG 디코딩/리사이즈 없이 바로 쓰도록 이미지도 저장
+        images["map"] = [map_img, cv2.resize(map_img, (DASHBOARD_WIDTH, dash_h))]
+
+    write_site_bundle(SITE_BUNDLE_PATH, MAP_W, MAP_H, nodes, exits, thresholds,
+                      calibration, masks, grids, images)
+    print(f">>> 사이트 번들 저장: {SITE_BUNDLE_PATH} (도트 {len(nodes)}개, 탈출구 {len(exits)}개)")
 
 def mouse_callback(event, x, y, flags, param):
     img = param['img']
@@ -11,16 +53,20 @@ def mouse_callback(event, x, y, flags, param):
     if event == cv2.EVENT_LBUTTONDOWN:
         # 왼쪽 클릭: 도트(출발점) 좌표
         print(f"({x}, {y}),") # 복사하기 편하게 포맷 맞춤
+        param['dots'].append((x, y))
         cv2.circle(img, (x, y), 5, (0, 255, 255), -1)
         cv2.putText(img, "DOT", (x+5, y-5),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0,255,255), 1)
 
     elif event == cv2.EVENT_RBUTTONDOWN:
-        # 오른쪽 클릭: 탈출구(목적지) 좌표
-        print(f"EXIT: ({x}, {y})")
-        cv2.circle(img, (x, y), 7, (0, 255, 0), -1)
+        # 오른쪽 클릭: 탈출구(목적지) 좌표 (Shift+오른쪽 클릭: 파란 탈출구)
+        blue = bool(flags & cv2.EVENT_FLAG_SHIFTKEY)
+        color = (255, 0, 0) if blue else (0, 255, 0)
+        print(f"EXIT{' (Blue)' if blue else ''}: ({x}, {y})")
+        param['exits'].append((x, y, blue))
+        cv2.circle(img, (x, y), 7, color, -1)
         cv2.putText(img, "EXIT", (x+5, y-5),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0,255,0), 1)
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.4, color, 1)
 
     param['img'] = img
 
@@ -30,37 +76,47 @@ def main():
     
     try:
         print(f"Connecting to {STREAM_URL}...")
-        cam = Camera(STREAM_URL)
+        if isinstance(STREAM_URL, str):
+            cam = Camera(STREAM_URL, mjpeg_size=(MAP_W, MAP_H))
+        else:
+            cam = Camera(STREAM_URL)
     except Exception as e:
         print(f"Error connecting to camera: {e}")
         return
 
+    # 좌표는 main.py와 같은 보정된 맵 평면 기준
+    calibration = Calibration.load() or Calibration(MAP_W, MAP_H)
+    cam.set_decode_region(calibration.board_fraction())
+    detector = Detector()
+
     print("=== 좌표 추출 도구 (Fixed Camera) ===")
-    print("1. 화면에서 도트(왼클릭) / 탈출구(우클릭) 위치를 찍으세요.")
+    print("1. 화면에서 도트(왼클릭) / 탈출구(우클릭, 파란 탈출구는 Shift+우클릭) 위치를 찍으세요.")
     print("2. 콘솔에 출력된 좌표 괄호 덩어리 `(x, y),` 를 복사하세요.")
     print("3. main.py의 FIXED_DOT_POSITIONS 리스트에 붙여넣으세요.")
     print("4. 's' 키: 화면 멈춤 (정확히 찍기 위해 사용)")
     print("5. 'r' 키: 화면 리셋 (잘못 찍었을 때)")
-    print("6. 'q' 키: 종료")
+    print("6. 'k' 키: 보드 모서리 찾아 보정 후 저장 (main.py도 같은 보정 사용)")
+    print("7. 'w' 키: 찍은 좌표/보정/벽 그리드를 사이트 번들로 저장 (main.py, 대시보드가 읽음)")
+    print("8. 'q' 키: 종료")
 
     is_paused = False
     
     # 클릭한 흔적을 그릴 투명 레이어
     overlay = np.zeros((MAP_H, MAP_W, 3), dtype=np.uint8)
-    param = {'img': overlay} # 마우스 콜백이 여기에 그림
+    param = {'img': overlay, 'dots': [], 'exits': []} # 마우스 콜백이 여기에 그림
 
     cv2.namedWindow('Get Coordinates')
     cv2.setMouseCallback('Get Coordinates', mouse_callback, param)
 
     while True:
         if not is_paused:
-            ret, frame = cam.get_frame()
+            ret, raw_frame = cam.get_frame()
             if not ret:
                 print("[ERROR] 프레임 읽기 실패")
                 break
             
-            # 메인 코드와 동일한 크기로 리사이즈
-            frame = cv2.resize(frame, (MAP_W, MAP_H))
+            # 메인 코드와 동일하게 보정 + 리사이즈
+            frame = calibration.apply(raw_frame)
             
             # 현재 프레임 + 오버레이(점 찍은 것) 합치기
             # 오버레이가 검은색(0)이 아닌 부분만 프레임에 덮어씀
@@ -80,9 +136,23 @@ def main():
         elif key == ord('s'):
             is_paused = not is_paused
             print(f"화면 일시정지: {'ON' if is_paused else 'OFF'}")
+        elif key == ord('k'):
+            if calibration.calibrate(raw_frame, detector):
+                calibration.save()
+                cam.set_decode_region(calibration.board_fraction())
+                overlay.fill(0)  # 좌표 기준이 바뀌었으므로 찍은 점 초기화
+                param['dots'].clear()
+                param['exits'].clear()
+                print(">>> 보드 보정 완료 (저장됨). 좌표를 다시 찍으세요.")
+            else:
+                print("[WARN] 보드 모서리를 찾지 못했습니다.")
+        elif key == ord('w'):
+            save_bundle(param, detector, calibration, frame)
         elif key == ord('r'):
             # 리셋 기능
             overlay.fill(0)
+            param['dots'].clear()
+            param['exits'].clear()
             param['img'] = overlay
             print("화면 초기화됨")
 
@@ -0,0 +1,262 @@
+import heapq
+import numpy as np
+from collections import deque
+
+class HierarchicalPlanner:
+    """
+    HPA* 방식의 계층 경로 탐색기 (GridMap 위에서 동작)
+    - 그리드를 cluster_size x cluster_size 클러스터로 나누고
+      클러스터 경계의 통로(entrance)만 추상 노드로 사용합니다.
+    - 클러스터 내부의 노드-노드 거리는 미리 계산해 두고,
+      화재 등으로 셀이 바뀐 클러스터(와 그 이웃)만 다시 계산합니다.
+    - 경로는 최적에 가깝지만(near-optimal) 항상 최단은 아닙니다.
+    """
+    def __init__(self, rows, cols, cluster_size=10):
+        self.rows = rows
+        self.cols = cols
+        self.C = cluster_size
+        self.crows = (rows + cluster_size - 1) // cluster_size
+        self.ccols = (cols + cluster_size - 1) // cluster_size
+
+        self._grid = None       # 마지막으로 반영한 그리드 스냅샷
+        self._blocked = None    # flat list (1: 막힘)
+        self._exits = None
+
+        # 경계별 통로: (cid, "E" | "S") -> [(안쪽 셀, 바깥쪽 셀), ...]
+        self.entrances = {}
+        # 클러스터별 내부 간선: cid -> {노드: {노드: 거리}}
+        self.intra = {}
+        self._graph = {}
+        # 노드별 클러스터 내부 BFS 부모 (경로 복원용 캐시)
+        self._parents = {}
+
+        # 추상 그래프 위의 탈출구까지 거리 / 다음 노드
+        self._dist = {}
+        self._next = {}
+        self.last_refreshed_clusters = 0
+
+    # === 좌표 도우미 ===
+    def _cluster_of(self, i):
+        return (i // self.cols // self.C) * self.ccols + (i % self.cols) // self.C
+
+    def _cluster_bounds(self, cid):
+        cy, cx = divmod(cid, self.ccols)
+        x0, y0 = cx * self.C, cy * self.C
+        return x0, y0, min(x0 + self.C, self.cols), min(y0 + self.C, self.rows)
+
+    # === 갱신 ===
+    def update(self, grid, exits):
+        """그리드/탈출구 변경을 반영 (바뀐 클러스터만 다시 계산)"""
+        if self._grid is None:
+            dirty = set(range(self.crows * self.ccols))
+        else:
+            dirty = self._dirty_clusters(grid)
+
+        if dirty:
+            self._grid = grid.copy()
+            self._blocked = self._grid.ravel().tolist()
+            self._refresh_clusters(dirty)
+
+        exits = tuple(exits)
+        if dirty or exits != self._exits:
+            self._exits = exits
+            self._solve_abstract()
+
+    def _dirty_clusters(self, grid):
+        diff = grid != self._grid
+        if not diff.any():
+            return set()
+        # 클러스터 크기에 맞게 패딩 후 블록 단위로 any
+        pad = np.zeros((self.crows * self.C, self.ccols * self.C), dtype=bool)
+        pad[:self.rows, :self.cols] = diff
+        blocks = pad.reshape(self.crows, self.C, self.ccols, self.C).any(axis=(1, 3))
+        return set(np.flatnonzero(blocks).tolist())
+
+    def _refresh_clusters(self, dirty):
+        # 1) 바뀐 클러스터의 네 경계 통로를 다시 스캔
+        borders = set()
+        touched = set(dirty)
+        for cid in dirty:
+            cy, cx = divmod(cid, self.ccols)
+            borders.add((cid, "E"))
+            borders.add((cid, "S"))
+            if cx > 0:
+                borders.add((cid - 1, "E"))
+                touched.add(cid - 1)
+            if cy > 0:
+                borders.add((cid - self.ccols, "S"))
+                touched.add(cid - self.ccols)
+            if cx < self.ccols - 1:
+                touched.add(cid + 1)
+            if cy < self.crows - 1:
+                touched.add(cid + self.ccols)
+        for key in borders:
+            self.entrances[key] = self._scan_border(*key)
+
+        # 2) 노드 집합이 바뀌었을 수 있는 클러스터의 내부 간선 재계산
+        for cid in touched:
+            for a in self.intra.get(cid, {}):
+                self._parents.pop(a, None)
+            self.intra[cid] = self._build_intra(cid)
+        self.last_refreshed_clusters = len(touched)
+
+        # 3) 추상 그래프 재조립 (노드/간선 수만큼의 비용)
+        graph = {}
+        for edges in self.intra.values():
+            for a, nbrs in edges.items():
+                graph.setdefault(a, {}).update(nbrs)
+        for pairs in self.entrances.values():
+            for a, b in pairs:
+                graph.setdefault(a, {})[b] = 1
+                graph.setdefault(b, {})[a] = 1
+        self._graph = graph
+
+    def _scan_border(self, cid, side):
+        """두 클러스터 사이 경계에서 양쪽 모두 뚫린 구간을 찾아 통로로 등록"""
+        x0, y0, x1, y1 = self._cluster_bounds(cid)
+        cols = self.cols
+        blocked = self._blocked
+        if side == "E":
+            if x1 >= cols:
+                return []
+            cells = [(y * cols + x1 - 1, y * cols + x1) for y in range(y0, y1)]
+        else:
+            if y1 >= self.rows:
+                return []
+            cells = [((y1 - 1) * cols + x, y1 * cols + x) for x in range(x0, x1)]
+
+        pairs = []
+        run = []
+        for a, b in cells + [(None, None)]:
+            if a is not None and not blocked[a] and not blocked[b]:
+                run.append((a, b))
+                continue
+            if run:
+                # 긴 통로는 양 끝 두 곳, 짧은 통로는 가운데 한 곳
+                if len(run) >= 6:
+                    pairs.extend([run[0], run[-1]])
+                else:
+                    pairs.append(run[len(run) // 2])
+                run = []
+        return pairs
+
+    def _cluster_nodes(self, cid):
+        cy, cx = divmod(cid, self.ccols)
+        nodes = set()
+        for a, _ in self.entrances.get((cid, "E"), []):
+            nodes.add(a)
+        for a, _ in self.entrances.get((cid, "S"), []):
+            nodes.add(a)
+        if cx > 0:
+            for _, b in self.entrances.get((cid - 1, "E"), []):
+                nodes.add(b)
+        if cy > 0:
+            for _, b in self.entrances.get((cid - self.ccols, "S"), []):
+                nodes.add(b)
+        return nodes
+
+    def _build_intra(self, cid):
+        nodes = self._cluster_nodes(cid)
+        edges = {}
+        for a in nodes:
+            dist, parent = self._local_bfs(a)
+            self._parents[a] = parent
+            edges[a] = {b: dist[b] for b in nodes if b != a and b in dist}
+        return edges
+
+    def _local_bfs(self, src):
+        """src가 속한 클러스터 안에서만 BFS (거리, 부모) 반환"""
+        cols = self.cols
+        x0, y0, x1, y1 = self._cluster_bounds(self._cluster_of(src))
+        blocked = self._blocked
+        dist = {src: 0}
+        parent = {src: -1}
+        queue = deque([src])
+        while queue:
+            i = queue.popleft()
+            y, x = divmod(i, cols)
+            d = dist[i] + 1
+            for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+                if x0 <= nx < x1 and y0 <= ny < y1:
+                    j = ny * cols + nx
+                    if j not in dist and not blocked[j]:
+                        dist[j] = d
+                        parent[j] = i
+                        queue.append(j)
+        return dist, parent
+
+    # === 탐색 ===
+    def _solve_abstract(self):
+        """모든 탈출구에서 추상 그래프 위로 역방향 Dijkstra (프레임당 1회)"""
+        dist = {}
+        nxt = {}
+        open_list = []
+        cols = self.cols
+        for gx, gy in self._exits:
+            e = gy * cols + gx
+            if self._blocked[e]:
+                continue
+            dist[e] = 0
+            nxt[e] = -1
+            heapq.heappush(open_list, (0, e))
+            # 탈출구가 있는 클러스터의 노드들과 연결
+            local, _ = self._local_bfs(e)
+            for n in self._cluster_nodes(self._cluster_of(e)):
+                if n in local and (n not in dist or local[n] < dist[n]):
+                    dist[n] = local[n]
+                    nxt[n] = e
+                    heapq.heappush(open_list, (local[n], n))
+
+        while open_list:
+            d, a = heapq.heappop(open_list)
+            if d != dist[a]:
+                continue
+            for b, w in self._graph.get(a, {}).items():
+                nd = d + w
+                if b not in dist or nd < dist[b]:
+                    dist[b] = nd
+                    nxt[b] = a
+                    heapq.heappush(open_list, (nd, b))
+        self._dist = dist
+        self._next = nxt
+
+    def find_path(self, start):
+        """start(gx, gy)에서 가장 가까운 탈출구까지 [(gx, gy), ...] 경로"""
+        cols = self.cols
+        s = start[1] * cols + start[0]
+        if self._blocked is None or self._blocked[s]:
+            return []
+
+        # 시작 클러스터 안에서 노드/탈출구까지의 거리
+        local, parent = self._local_bfs(s)
+        best, best_d = None, None
+        for n, d in local.items():
+            if n in self._dist and (best_d is None or d + self._dist[n] < best_d):
+                best, best_d = n, d + self._dist[n]
+        if best is None:
+            return []
+
+        # 추상 경로: best -> ... -> 탈출구, 각 구간을 셀 단위로 복원
+        cells = self._trace(parent, best)
+        a = best
+        while self._next.get(a, -1) >= 0:
+            b = self._next[a]
+            y, x = divmod(a, cols)
+            if abs(b - a) == 1 and b // cols == y or abs(b - a) == cols:
+                cells.append(b)  # 클러스터 경계를 넘는 한 칸
+            else:
+                seg_parent = self._parents.get(a)
+                if seg_parent is None:
+                    _, seg_parent = self._local_bfs(a)  # 탈출구 구간 등
+                cells.extend(self._trace(seg_parent, b)[1:])
+            a = b
+        return [(i % cols, i // cols) for i in cells]
+
+    def _trace(self, parent, end):
+        path = []
+        i = end
+        while i >= 0:
+            path.append(i)
+            i = parent[i]
+        path.reverse()
+        return path
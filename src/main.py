@@ -2,17 +2,35 @@ import cv2
 import numpy as np
 
 # 분리된 모듈들 import
+from calibration import Calibration
 from camera import Camera
+from change import ChangeDrivenDetector
 from detector import Detector
 from map import GridMap
 from navigator import Navigator
+from pipeline import Pipeline
+from publisher import DirectionPublisher
+from async_server import AsyncEvacuationServer
+from broadcast import DirectionBroadcaster
 from server import EvacuationServer
+from site_bundle import SiteBundle
+from tracker import FireTracker
+from walls import StaticWallLearner
 
 # === 설정 ===
 MAP_WIDTH = 640
 MAP_HEIGHT = 480
 GRID_SIZE = 20
+# 웹 서버: "flask"(기존) 또는 "asyncio"(LED 노드/대시보드 연결이 많을 때, long-poll/SSE 대기가 가벼움)
+SERVER_BACKEND = "flask"
+# LED 노드에 방향표를 UDP로도 방송 (기본은 끔: 수신 노드를 설치한 경우에만 설정)
+# 멀티캐스트는 broadcast.MULTICAST_GROUP("239.255.42.99", udp_receiver.ino와 같은 값),
+# 브로드캐스트는 "255.255.255.255" 등
+BROADCAST_ADDRESS = None
+# 노드 방향이 바뀌려면 새 방향이 이 시간(초) 동안 유지되어야 함 (화재 발생/해제 시에는 즉시)
+DIRECTION_DWELL = 0.5
 
+# 사이트 번들(get_coords.py에서 저장)이 없을 때 사용하는 기본 좌표
 # 1개의 도트만 테스트한다고 가정 (혹은 여러 개)
 FIXED_DOT_POSITIONS = [
    (69, 397),
@@ -33,100 +51,239 @@ def main():
         STREAM_URL = "http://10.8.0.3:8080/?action=stream"
         # STREAM_URL = 1  # 테스트용 로컬 카메라
         print(f"Connecting to {STREAM_URL}...")
-        cam = Camera(STREAM_URL)
+        if isinstance(STREAM_URL, str):
+            # MJPEG 전용 리더: 작업 해상도로 축소 디코딩 + 항상 최신 프레임
+            cam = Camera(STREAM_URL, mjpeg_size=(MAP_WIDTH, MAP_HEIGHT))
+        else:
+            cam = Camera(STREAM_URL, threaded=True)  # 처리 지연 시 옛 프레임 대신 최신 프레임 사용
     except Exception as e:
         print(f"Camera Error: {e}")
         return
 
     detector = Detector()
-    grid_map = GridMap(MAP_WIDTH, MAP_HEIGHT, GRID_SIZE)
+
+    # 사이트 번들: 도트/탈출구 좌표, 임계값, 보정, 미리 만든 벽 그리드 (memmap으로 바로 열림)
+    bundle = SiteBundle.load()
+    if bundle is not None:
+        dot_positions = list(bundle.scaled_points(bundle.nodes, MAP_WIDTH, MAP_HEIGHT).values())
+        exit_positions = list(bundle.scaled_points(bundle.exits, MAP_WIDTH, MAP_HEIGHT).values())
+        bundle.apply_thresholds(detector)
+        print(f"[INFO] 사이트 번들 불러옴: 도트 {len(dot_positions)}개, 탈출구 {len(exit_positions)}개")
+    else:
+        dot_positions = FIXED_DOT_POSITIONS
+        exit_positions = FIXED_EXIT_POSITIONS
+
+    # 저장된 보드 보정이 있으면 매 프레임 remap 한 번으로 원근 보정 + 리사이즈
+    # 번들이 있으면 번들의 보정만 사용 (번들 좌표는 그 보정 평면에서 찍은 것이므로
+    # 나중에 'k'로 저장한 calibration.npz를 쓰면 모든 노드가 어긋남), 번들이 없을 때만 calibration.npz
+    if bundle is not None:
+        calibration = bundle.calibration() or Calibration(MAP_WIDTH, MAP_HEIGHT)
+        if Calibration.load() is not None:
+            print("[INFO] 사이트 번들의 보정을 사용합니다 (calibration.npz는 무시)")
+    else:
+        calibration = Calibration.load() or Calibration(MAP_WIDTH, MAP_HEIGHT)
+    print(f"[INFO] 보드 보정: {'불러옴' if calibration.calibrated else '없음 (리사이즈만)'}")
+    # 보정이 있으면 MJPEG은 보드 영역이 640x480 이상 남는 배율로만 디코딩 (리샘플링은 remap 한 번)
+    cam.set_decode_region(calibration.board_fraction())
+    if calibration.calibrated and bundle is None:
+        print("[WARN] FIXED_DOT/EXIT_POSITIONS가 지금 보정된 평면에서 찍은 좌표가 아니면 위치가 어긋납니다. "
+              "get_coords.py에서 보정 후 좌표를 찍어 사이트 번들('w')로 저장하세요.")
+    # 고정 카메라: 바뀐 타일만 다시 판정하고 나머지는 지난 결과 재사용
+    # (한산한 프레임은 거의 일이 없음, 임계값 근처의 느린 색 변화는 타일 행 순환 재판정으로 최대 30프레임 안에 반영)
+    scene = ChangeDrivenDetector(detector)
+    # 불 위치만 조금씩 바뀌는 프레임이 대부분이므로 증분 재계획 사용
+    grid_map = GridMap(MAP_WIDTH, MAP_HEIGHT, GRID_SIZE, planner="incremental")
     navigator = Navigator()      # 방향 계산기
-    server = EvacuationServer()  # 웹 서버
+    # 웹 서버 (두 백엔드 모두 같은 /status, /direction/<id>, /events API)
+    server = AsyncEvacuationServer() if SERVER_BACKEND == "asyncio" else EvacuationServer()
     
+    # UDP 방송: 바뀔 때 패킷 1개 + 1초마다 재전송 (노드 수와 무관)
+    broadcaster = DirectionBroadcaster(BROADCAST_ADDRESS) if BROADCAST_ADDRESS else None
+
     # 2. 서버 시작 (백그라운드)
     server.start()
+    if broadcaster is not None:
+        broadcaster.start()
 
-    # [핵심 변수] 벽 고정용
-    wall_locked = False
-    locked_wall_mask = None
+    # 방향표 발행: 확정된 변경이 있을 때만 서버/방송을 갱신하고 이벤트로 기록
+    publisher = DirectionPublisher(min_dwell=DIRECTION_DWELL)
+    publisher.attach(server)
+    if broadcaster is not None:
+        publisher.attach(broadcaster)
 
-    print("=== System Started ===")
-    print("1. 'c' 키: 벽 고정/해제 (Lock)")
-    print("2. 'q' 키: 종료")
-    
-    while True:
-        ret, frame = cam.get_frame()
-        if not ret: break
-        
-        # 화면 준비
-        frame = cv2.resize(frame, (MAP_WIDTH, MAP_HEIGHT))
+    def log_events(events):
+        for ev in events:
+            if ev["type"] == "fire":
+                print(f"[EVENT #{ev['seq']}] 화재 {'감지' if ev['fire_detected'] else '해제'}")
+            else:
+                print(f"[EVENT #{ev['seq']}] 노드 {ev['node']}: {ev['old']} -> {ev['new']}")
+    publisher.subscribe(log_events)
+
+    # [핵심 변수] 정적 벽 자동 학습 (N 프레임 투표 후 확정, 이후 가끔만 재확인)
+    # 키 입력은 메인 스레드, 벽 감지/그리드 갱신은 파이프라인 스레드에서 처리하므로
+    # 재학습 요청은 state로 넘기고 detect 단계에서 반영합니다.
+    wall_learner = StaticWallLearner(frames=30)
+    # 불 박스 떨림/깜빡임 억제: 그리드에 닿는 불 영역이 바뀔 때만 다시 경로 계산
+    fire_tracker = FireTracker(grid_size=GRID_SIZE, margin=20)
+    state = {"relearn": False, "calibrate": False}
+
+    # === 파이프라인 단계 ===
+    def capture():
+        ret, frame, ts, _ = cam.get_frame_info()
+        if not ret:
+            return None
+        return {"frame": frame, "captured_at": ts}
+
+    def detect(ctx):
+        frame = ctx["frame"]
+
+        # 보드 보정 요청 (모서리 검출은 요청 때만, 성공하면 저장 후 벽 다시 학습)
+        if state["calibrate"]:
+            state["calibrate"] = False
+            if calibration.calibrate(frame, detector):
+                calibration.save()
+                cam.set_decode_region(calibration.board_fraction())
+                state["relearn"] = True
+                print(">>> 보드 보정 완료 (저장됨)")
+                print("[WARN] 도트/탈출구 좌표는 이전 평면 기준이라 새 보정과 어긋날 수 있습니다. "
+                      "get_coords.py로 다시 찍어 사이트 번들을 저장하세요.")
+            else:
+                print("[WARN] 보드 모서리를 찾지 못했습니다. 기존 보정 유지")
+
+        # 화면 준비 (보정 + 640x480 리사이즈를 remap 한 번으로)
+        frame = calibration.apply(frame)
         analysis_map = frame.copy()
 
-        # [A] 맵 & 벽 업데이트 (시각화 복구됨)
-        grid_map.reset()
+        # 재학습 요청 반영 / 장면이 크게 바뀌면 확정된 벽 재확인
+        if state["relearn"]:
+            state["relearn"] = False
+            wall_learner.relearn()
+        scene.update(frame)
+        st = scene.stats()
+        if st["changed_tiles"] * 4 >= st["total_tiles"]:
+            wall_learner.request_verify()
+
+        # [A] 맵 & 벽 업데이트 (학습 중이거나 검사 차례일 때만 벽 감지)
+        detected_wall_mask = None
+        if wall_learner.needs_detection():
+            detected_wall_mask = scene.detect_walls_in_map(frame)
+            wall_learner.feed(detected_wall_mask)
+
+        # 그리드 정적 레이어는 plan 단계에서 버전이 바뀌었을 때만 갱신
+        # (단계 사이 큐에서 프레임이 버려져도 변경이 빠지지 않도록 버전으로 전달)
+        ctx["wall_version"] = (wall_learner.version, wall_learner.mask)
+
         current_wall_mask = None
-        
-        if wall_locked and locked_wall_mask is not None:
-            # [고정 모드] 저장해둔 벽 마스크 사용
-            current_wall_mask = locked_wall_mask
-            
-            # [복구됨] 고정된 벽을 빨간색으로 표시
-            analysis_map[locked_wall_mask > 0] = [0, 0, 255]
-            
-            cv2.putText(analysis_map, "[WALL LOCKED]", (10, 30), 
+        learned_mask = wall_learner.mask
+        seen, needed = wall_learner.progress
+
+        if learned_mask is not None:
+            # [학습 완료] 정적 벽 레이어 사용 -> 빨간색으로 표시
+            analysis_map[learned_mask > 0] = [0, 0, 255]
+            label = "[WALLS LEARNED]"
+            if wall_learner.learning:
+                label += f" relearning {seen}/{needed}"
+            cv2.putText(analysis_map, label, (10, 30), 
                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
         else:
-            # [탐색 모드] 실시간 벽 감지
-            current_wall_mask = detector.detect_walls_in_map(analysis_map)
-            
-            # [복구됨] 감지된 벽을 초록색으로 표시
+            # [학습 중] 확정 전에는 실시간 벽 감지 결과를 장애물로 사용 -> 초록색으로 표시
+            current_wall_mask = detected_wall_mask
             if current_wall_mask is not None:
                 analysis_map[current_wall_mask > 0] = [0, 255, 0]
 
-            cv2.putText(analysis_map, "Searching Walls... Press 'c'", (10, 30), 
+            cv2.putText(analysis_map, f"Learning Walls... {seen}/{needed}", (10, 30), 
                         cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-            
-        # 그리드맵에 장애물 업데이트
-        if current_wall_mask is not None:
-            grid_map.update_obstacles_from_mask(current_wall_mask)
 
-        # [B] 불 감지
-        fire_boxes, _ = detector.detect_fire(analysis_map)
+        # [B] 불 감지 (벽을 칠하기 전 원본 프레임에서: 빨간 벽 표시가 불 후보로 잡히지 않도록)
+        raw_fire_boxes, _ = scene.detect_fire(frame)
+        fire_tracker.update(raw_fire_boxes)
+        ctx["fire_version"] = fire_tracker.version
+
+        ctx["analysis_map"] = analysis_map
+        ctx["wall_mask"] = current_wall_mask
+        ctx["fire_boxes"] = fire_tracker.boxes  # 확정된 불만 (경로용 박스)
+        return ctx
+
+    # 마지막 경로 계산 결과: 도트 번호 -> (경로, 방향)
+    last_plan = {"routes": None, "fire_version": None, "wall_version": 0}
+
+    # 번들에 저장된 벽이 있으면 학습 없이 바로 사용 (그리드도 미리 래스터화된 것 사용)
+    if bundle is not None and bundle.mask("walls") is not None:
+        wall_learner.preload(bundle.mask("walls"))
+        static_grid = bundle.static_grid("walls", MAP_WIDTH, MAP_HEIGHT, GRID_SIZE)
+        if static_grid is not None:
+            grid_map.set_static_grid(static_grid)
+            last_plan["wall_version"] = wall_learner.version
+
+    def plan(ctx):
+        analysis_map = ctx["analysis_map"]
+        current_wall_mask = ctx["wall_mask"]
+        fire_boxes = ctx["fire_boxes"]
+
+        # 불 footprint / 벽이 그대로면 지난 경로와 방향을 그대로 사용
+        wall_version, learned_mask = ctx["wall_version"]
+        replan = (ctx["fire_version"] != last_plan["fire_version"]
+                  or wall_version != last_plan["wall_version"]
+                  or current_wall_mask is not None or last_plan["routes"] is None)
+
+        if replan:
+            # 학습된 벽은 정적 레이어에 남아 있으므로 reset()은 불/탈출구만 비움
+            if wall_version != last_plan["wall_version"]:
+                grid_map.set_static_mask(learned_mask)
+                last_plan["wall_version"] = wall_version
+            last_plan["fire_version"] = ctx["fire_version"]
+            grid_map.reset()
+                
+            # 그리드맵에 장애물 업데이트 (학습 전에만, 학습 후에는 정적 레이어 사용)
+            if current_wall_mask is not None:
+                grid_map.update_obstacles_from_mask(current_wall_mask)
+
+            for (fx, fy, fw, fh) in fire_boxes:
+                grid_map.set_obstacle_rect(fx-20, fy-20, fw+40, fh+40)
+
+            # [C] 탈출구 등록
+            for ex, ey in exit_positions:
+                grid_map.add_exit(ex, ey, 20, 20)
+
+            # [D] 도트 경로 및 방향 계산 (Navigator 위임)
+            routes = {}
+            for i, (dx, dy) in enumerate(dot_positions):
+                if not (0 <= dx < MAP_WIDTH and 0 <= dy < MAP_HEIGHT): continue
+
+                path = grid_map.get_shortest_path(dx, dy)
+                direction = "STOP"
+                if len(path) > 1:
+                    # [수정 1] 화살표와 텍스트의 기준점을 통일
+                    # path[1]은 너무 가까워서 방향이 불안정할 수 있으므로
+                    # 5칸 앞(idx) 혹은 경로의 끝을 기준으로 방향을 계산합니다.
+                    idx = min(5, len(path)-1)
+                    # Navigator에게 '현재위치'와 '목표지점(5칸앞)'을 줘서 큰 흐름의 방향을 얻음
+                    direction = navigator.get_direction((dx, dy), path[idx])
+                routes[i] = (path, direction)
+            last_plan["routes"] = routes
+
+        # === 화면 표시 (매 프레임) ===
         is_fire = (len(fire_boxes) > 0)
         
         for (fx, fy, fw, fh) in fire_boxes:
-            grid_map.set_obstacle_rect(fx-20, fy-20, fw+40, fh+40)
             cv2.rectangle(analysis_map, (fx, fy), (fx+fw, fy+fh), (0, 0, 255), 2)
             cv2.putText(analysis_map, "FIRE", (fx, fy-5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0,0,255), 2)
 
-        # [C] 탈출구 등록
-        for ex, ey in FIXED_EXIT_POSITIONS:
-            grid_map.add_exit(ex, ey, 20, 20)
+        for ex, ey in exit_positions:
             cv2.circle(analysis_map, (ex, ey), 8, (255, 255, 255), -1)
             cv2.putText(analysis_map, "EXIT", (ex-15, ey-15), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0,0,0), 1)
 
-        # [D] 도트 경로 및 방향 계산 (Navigator 위임)
         current_directions = {}
         
-        for i, (dx, dy) in enumerate(FIXED_DOT_POSITIONS):
-            if not (0 <= dx < MAP_WIDTH and 0 <= dy < MAP_HEIGHT): continue
+        for i, (path, direction) in last_plan["routes"].items():
+            dx, dy = dot_positions[i]
 
             # 1. 도트 좌표 표시 (요청사항 반영)
             cv2.putText(analysis_map, f"({dx},{dy})", (dx+10, dy), 
                         cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1)
 
-            path = grid_map.get_shortest_path(dx, dy)
-            direction = "STOP"
-
             if len(path) > 1:
-                # [수정 1] 화살표와 텍스트의 기준점을 통일
-                # path[1]은 너무 가까워서 방향이 불안정할 수 있으므로
-                # 5칸 앞(idx) 혹은 경로의 끝을 기준으로 방향을 계산합니다.
-                idx = min(5, len(path)-1)
-                target_pos = path[idx] # 화살표가 가리키는 지점
-                
-                # Navigator에게 '현재위치'와 '목표지점(5칸앞)'을 줘서 큰 흐름의 방향을 얻음
-                direction = navigator.get_direction((dx, dy), target_pos)
+                target_pos = path[min(5, len(path)-1)] # 화살표가 가리키는 지점
                 
                 # 경로 그리기
                 cv2.polylines(analysis_map, [np.array(path)], False, (255, 0, 0), 2)
@@ -143,28 +300,61 @@ def main():
             current_directions[i] = direction
             cv2.circle(analysis_map, (dx, dy), 5, (0, 255, 255), -1)
 
-        # [E] 서버에 데이터 업데이트
-        server.update_data(is_fire, current_directions)
+        ctx["is_fire"] = is_fire
+        ctx["directions"] = current_directions
+        return ctx
 
-        # 화면 출력
-        cv2.imshow("Smart Evacuation System", analysis_map)
-        
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
-        elif key == ord('c'):
-            # 벽 고정/해제 토글 로직
-            if not wall_locked:
-                wall_locked = True
-                locked_wall_mask = current_wall_mask.copy() if current_wall_mask is not None else None
-                print(">>> 벽 고정 완료! (LOCKED)")
-            else:
-                wall_locked = False
-                locked_wall_mask = None
-                print(">>> 벽 고정 해제. (UNLOCKED)")
+    def publish(ctx):
+        # [E] 확정된 변경만 서버/방송에 반영 (매 프레임 전체 표를 덮어쓰지 않음)
+        publisher.update(ctx["is_fire"], ctx["directions"])
+        return ctx
+
+    # 단계 사이 큐는 1칸: 느린 단계 앞에서는 항상 가장 최근 프레임만 대기
+    pipeline = Pipeline(queue_size=1)
+    pipeline.set_source(capture)
+    pipeline.add_stage("detect", detect)
+    pipeline.add_stage("plan", plan)
+    pipeline.add_stage("publish", publish)
+    pipeline.start()
 
-    cam.release()
-    cv2.destroyAllWindows()
+    print("=== System Started ===")
+    print("1. 'c' 키: 벽 다시 학습 (Relearn)")
+    print("2. 'k' 키: 보드 모서리 다시 찾아 보정 (Calibrate)")
+    print("3. 's' 키: 단계별 처리 시간 출력")
+    print("4. 'q' 키: 종료")
+
+    # 단계에서 예외가 나면 get()이 다시 던짐 -> 정리 후 그대로 종료 (멈춘 화면으로 대기하지 않음)
+    try:
+        while True:
+            ctx = pipeline.get(timeout=0.05)
+            if ctx is None:
+                if pipeline.finished: break
+            else:
+                # 화면 출력
+                cv2.imshow("Smart Evacuation System", ctx["analysis_map"])
+        
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
+                break
+            elif key == ord('s'):
+                for name, st in pipeline.stats().items():
+                    print(f"[{name:>10}] avg {st['avg_ms']:.1f}ms / max {st['max_ms']:.1f}ms, dropped {st['dropped']}")
+                st = scene.stats()
+                print(f"[   changes] {st['changed_tiles']}/{st['total_tiles']} tiles, reclassified {st['reclassified']}")
+                st = publisher.stats()
+                print(f"[    events] {st['events']} events / {st['frames']} frames, suppressed {st['suppressed']}, pending {st['pending']}, errors {st['errors']}")
+            elif key == ord('k'):
+                state["calibrate"] = True
+            elif key == ord('c'):
+                # 벽 강제 재학습 (실제 반영은 detect 단계에서, 새 벽이 확정될 때까지 기존 벽 유지)
+                state["relearn"] = True
+                print(">>> 벽 다시 학습 시작 (RELEARN)")
+    finally:
+        pipeline.stop()
+        if broadcaster is not None:
+            broadcaster.close()
+        cam.release()
+        cv2.destroyAllWindows()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,24 +1,217 @@
 import numpy as np
 import heapq
 import cv2
+from array import array
+from collections import deque
+try:
+    from hpa import HierarchicalPlanner
+except ImportError:
+    from src.hpa import HierarchicalPlanner
+
+
+class FlatAStar:
+    """
+    1차원으로 펼친 그리드 위에서 동작하는 A* 엔진
+    - 그리드 테두리를 장애물로 한 칸 감싸서 범위 검사를 없앰
+    - 이웃 오프셋(좌, 우, 상, 하)은 미리 계산
+    - g / parent 배열(int32)은 한 번만 할당하고, 세대 번호(generation)로 초기화 대체
+    - 열린 목록은 (f, 셀) 튜플 대신 f * n + 셀 형태의 정수 하나로 저장
+    """
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.stride = cols + 2
+        self.n = (rows + 2) * self.stride
+        self.offsets = (-1, 1, -self.stride, self.stride)
+
+        # 테두리 포함 장애물 버퍼 (1: 막힘)
+        self._padded = np.ones((rows + 2, self.stride), dtype=np.uint8)
+        self._cells = memoryview(self._padded.reshape(-1))
+
+        self.g = array('i', [0]) * self.n
+        self.parent = array('i', [-1]) * self.n
+        self.seen = array('I', [0]) * self.n    # g가 유효한 세대
+        self.closed = array('I', [0]) * self.n  # 확정된 세대
+        self.generation = 0
+
+    def _next_generation(self):
+        self.generation += 1
+        if self.generation >= 0xFFFFFFFF:
+            # 세대 번호가 넘치면 그때만 전체 초기화
+            for buf in (self.seen, self.closed):
+                buf[:] = array('I', [0]) * self.n
+            self.generation = 1
+        return self.generation
+
+    def search(self, grid, start, goals):
+        """
+        start에서 goals 중 가장 가까운 곳까지의 경로를 [(gx, gy), ...] 로 반환
+        (휴리스틱: 모든 목표에 대한 맨해튼 거리의 최솟값)
+        """
+        stride = self.stride
+        self._padded[1:-1, 1:-1] = grid
+        cells = self._cells
+
+        goal_xy = []
+        goal_set = set()
+        for gx, gy in goals:
+            i = (gy + 1) * stride + gx + 1
+            if not cells[i]:
+                goal_xy.append((gx + 1, gy + 1))
+                goal_set.add(i)
+        s = (start[1] + 1) * stride + start[0] + 1
+        if not goal_set or cells[s]:
+            return []
+
+        def h(i):
+            x, y = i % stride, i // stride
+            return min(abs(x - gx) + abs(y - gy) for gx, gy in goal_xy)
+
+        gen = self._next_generation()
+        g, parent, seen, closed = self.g, self.parent, self.seen, self.closed
+        n = self.n
+        offsets = self.offsets
+
+        g[s] = 0
+        parent[s] = -1
+        seen[s] = gen
+        open_list = [h(s) * n + s]
+
+        while open_list:
+            i = heapq.heappop(open_list) % n
+            if closed[i] == gen:
+                continue
+            if i in goal_set:
+                return self._reconstruct(i)
+            closed[i] = gen
+            ng = g[i] + 1
+            for off in offsets:
+                j = i + off
+                if cells[j] or closed[j] == gen:
+                    continue
+                if seen[j] != gen or ng < g[j]:
+                    seen[j] = gen
+                    g[j] = ng
+                    parent[j] = i
+                    heapq.heappush(open_list, (ng + h(j)) * n + j)
+        return []
+
+    def _reconstruct(self, i):
+        stride = self.stride
+        path = []
+        while i >= 0:
+            path.append((i % stride - 1, i // stride - 1))
+            i = self.parent[i]
+        path.reverse()
+        return path
+
 
 class GridMap:
-    def __init__(self, width, height, grid_size=20):
+    def __init__(self, width, height, grid_size=20, planner="field", cluster_size=10):
+        """
+        :param planner: 경로 탐색 방식
+            "field" - 모든 탈출구에서 한 번에 퍼지는 거리장(BFS)을 만들고 노드별로 조회 (기본값)
+            "incremental" - 거리장을 프레임 사이에 유지하고, 바뀐 셀의 영향 범위만 복구
+            "flat" - 노드마다 FlatAStar 엔진으로 가장 가까운 탈출구까지 한 번 탐색
+            "hpa" - 클러스터 단위 계층 탐색(HPA*), 큰 맵/작은 grid_size용
+            "astar" - 기존 방식: 노드마다, 탈출구마다 A* 수행
+        :param cluster_size: [hpa] 클러스터 한 변의 셀 수
+        """
         self.width = width
         self.height = height
         self.grid_size = grid_size
         self.cols = width // grid_size
         self.rows = height // grid_size
+        self.planner = planner
         
         # 0: 이동 가능, 1: 장애물(벽/불)
-        self.grid = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        # grid = 정적 레이어(고정 벽, 한 번만 래스터화) OR 동적 레이어(불 등, 매 프레임)
+        self._static = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        self._dynamic = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        self._grid = np.zeros((self.rows, self.cols), dtype=np.uint8)
+        self._static_version = 0
+        self._rects = []          # 이번 프레임에 등록된 불 사각형 (그리드 좌표)
+        self._masks = []          # 이번 프레임에 등록된 동적 마스크 (그리드 크기)
+        self._mask_ids = []       # 마스크 등록 일련번호 (마스크가 있는 프레임은 항상 다시 합성)
+        self._mask_serial = 0
+        self._layers_key = None   # 마지막으로 합성한 (정적 버전, 사각형 목록, 마스크 번호)
+        self._grid_version = 0    # 합성 결과가 바뀔 때마다 증가
         self.exits = []
+        # 초기 거리가 0이 아닌 추가 출발점 {(gx, gy): 거리}
+        # (BuildingGraph가 계단/통로 셀에 다른 구역 경유 거리를 넣음, reset()으로 지워지지 않음)
+        self.seeds = {}
+
+        # 거리장 (flat index 기준, -1 = 도달 불가)
+        # _next[i]: 거리장을 만들/복구할 때 i 셀을 지지한 이웃 (-1 = 없음, [incremental] 복구용)
+        #           만든 순서/이전 프레임에 따라 달라지므로 경로 출력에는 _step()을 사용
+        self._dist = None
+        self._next = None
+        self._field_version = -1
+
+        # [incremental] 거리장을 만들 때 사용한 그리드/탈출구 스냅샷
+        self._field_grid = None
+        self._field_sources = None
+        self.last_update_cells = 0  # 직전 갱신에서 다시 계산한 셀 수 (디버깅용)
+
+        # [flat] 버퍼를 재사용하는 A* 엔진 (처음 쓸 때 생성)
+        self._flat_astar = None
+
+        # [hpa] 계층 탐색기 (불이 닿은 클러스터만 갱신)
+        self.cluster_size = cluster_size
+        self._hpa = None
+        self._hpa_key = None
+
+    @property
+    def grid(self):
+        """정적 + 동적 레이어 합성 결과 (바뀐 경우에만 다시 합성)"""
+        if self._layers_key != (self._static_version, self._rects, self._mask_ids):
+            self._compose_layers()
+        return self._grid
+
+    def _compose_layers(self):
+        self._dynamic.fill(0)
+        for gx1, gy1, gx2, gy2 in self._rects:
+            self._dynamic[gy1:gy2+1, gx1:gx2+1] = 1
+        for small_mask in self._masks:
+            self._dynamic[small_mask > 0] = 1
+        np.bitwise_or(self._static, self._dynamic, out=self._grid)
+
+        self._layers_key = (self._static_version, list(self._rects), list(self._mask_ids))
+        self._grid_version += 1
 
     def reset(self):
-        """매 프레임 맵 상태 초기화"""
-        self.grid.fill(0)
+        """매 프레임 맵 상태 초기화 (정적 레이어는 유지)"""
+        self._rects = []
+        self._masks = []
+        self._mask_ids = []
         self.exits.clear()
 
+    def set_static_mask(self, mask):
+        """
+        고정 벽 마스크를 정적 레이어로 한 번만 래스터화 (None이면 정적 레이어 비움)
+        reset()으로 지워지지 않으므로 매 프레임 다시 넣을 필요 없음
+        """
+        if mask is None:
+            self.set_static_grid(None)
+        else:
+            self.set_static_grid(self._rasterize(mask))
+
+    def set_static_grid(self, grid):
+        """이미 그리드 크기로 만들어 둔 정적 레이어 지정 (0/1, None이면 비움)"""
+        if grid is None:
+            self._static.fill(0)
+        else:
+            np.copyto(self._static, (np.asarray(grid) > 0).astype(np.uint8))
+        self._static_version += 1
+
+    def _rasterize(self, mask):
+        # 마스크를 그리드 크기로 축소 (Nearest Neighbor or Max Pooling 개념)
+        # 단순히 resize하면 중간에 있는 얇은 벽이 사라질 수 있으므로 주의.
+        # 여기서는 안전하게 픽셀 체크 방식으로 구현 (성능 최적화 가능)
+        
+        # 리사이즈로 대략적인 그리드 맵 생성 (cv2.INTER_AREA or MAX)
+        return cv2.resize(mask, (self.cols, self.rows), interpolation=cv2.INTER_NEAREST)
+
     def _to_grid(self, x, y):
         gx = int(x // self.grid_size)
         gy = int(y // self.grid_size)
@@ -33,37 +226,252 @@ class GridMap:
 
     def update_obstacles_from_mask(self, mask):
         """
-        Detector에서 만든 벽/불 마스크(0 or 255)를 받아 그리드에 장애물로 등록
+        Detector에서 만든 벽/불 마스크(0 or 255)를 받아 이번 프레임 동적 레이어에 장애물로 등록
         미래지향적: 픽셀 단위 마스크를 그리드 단위로 효율적으로 변환
+        (고정된 벽은 set_static_mask로 한 번만 넣는 것이 빠름)
         """
-        # 마스크를 그리드 크기로 축소 (Nearest Neighbor or Max Pooling 개념)
-        # 단순히 resize하면 중간에 있는 얇은 벽이 사라질 수 있으므로 주의.
-        # 여기서는 안전하게 픽셀 체크 방식으로 구현 (성능 최적화 가능)
-        
-        # 리사이즈로 대략적인 그리드 맵 생성 (cv2.INTER_AREA or MAX)
-        small_mask = cv2.resize(mask, (self.cols, self.rows), interpolation=cv2.INTER_NEAREST)
-        
         # 마스크가 있는 곳(>0)은 장애물(1)로 설정
-        self.grid[small_mask > 0] = 1
+        self._masks.append(self._rasterize(mask))
+        self._mask_serial += 1
+        self._mask_ids.append(self._mask_serial)
 
     def set_obstacle_rect(self, x, y, w, h):
         """사각형 영역 장애물 설정 (불 등)"""
         gx1, gy1 = self._to_grid(x, y)
         gx2, gy2 = self._to_grid(x + w, y + h)
-        self.grid[gy1:gy2+1, gx1:gx2+1] = 1
+        self._rects.append((gx1, gy1, gx2, gy2))
 
     def add_exit(self, x, y, w, h):
         cx, cy = x + w/2, y + h/2
         self.exits.append(self._to_grid(cx, cy))
 
+    def set_seeds(self, seeds):
+        """추가 출발점 {(gx, gy): 거리} 지정 (거리장 계산에 탈출구처럼 반영)"""
+        if seeds != self.seeds:
+            self.seeds = dict(seeds)
+
+    def _sources(self):
+        """거리장 출발점 {flat index: 초기 거리} (탈출구는 0)"""
+        cols = self.cols
+        sources = {}
+        for (gx, gy), d in self.seeds.items():
+            i = gy * cols + gx
+            if i not in sources or d < sources[i]:
+                sources[i] = d
+        for gx, gy in self.exits:
+            sources[gy * cols + gx] = 0
+        return sources
+
+    def build_distance_field(self):
+        """
+        모든 탈출구를 시작점으로 하는 역방향 BFS(wavefront)를 한 번만 수행합니다.
+        이후 각 노드의 다음 칸/남은 거리는 배열 조회만으로 구할 수 있으므로
+        노드 수가 늘어나도 탐색 비용은 늘지 않습니다.
+        """
+        cols = self.cols
+        n = self.rows * cols
+        blocked = self.grid.ravel().tolist()
+        dist = [-1] * n
+        nxt = [-1] * n
+
+        sources = self._sources()
+        if any(sources.values()):
+            # 초기 거리가 제각각인 출발점이 있으면 Dijkstra로 전파
+            open_list = []
+            for i, d in sources.items():
+                if not blocked[i]:
+                    dist[i] = d
+                    open_list.append((d, i))
+            heapq.heapify(open_list)
+            self._lower(open_list, blocked, dist, nxt)
+            queue = ()
+        else:
+            queue = deque()
+            # 장애물 속 탈출구는 건너뜀 (중복은 dict로 이미 제거됨)
+            queue.extend(i for i in sources if not blocked[i])
+            for i in queue:
+                dist[i] = 0
+
+        while queue:
+            i = queue.popleft()
+            d = dist[i] + 1
+            x = i % cols
+            # 4방향 이웃 (좌, 우, 상, 하)
+            if x > 0:
+                j = i - 1
+                if dist[j] < 0 and not blocked[j]:
+                    dist[j] = d; nxt[j] = i; queue.append(j)
+            if x < cols - 1:
+                j = i + 1
+                if dist[j] < 0 and not blocked[j]:
+                    dist[j] = d; nxt[j] = i; queue.append(j)
+            j = i - cols
+            if j >= 0 and dist[j] < 0 and not blocked[j]:
+                dist[j] = d; nxt[j] = i; queue.append(j)
+            j = i + cols
+            if j < n and dist[j] < 0 and not blocked[j]:
+                dist[j] = d; nxt[j] = i; queue.append(j)
+
+        self._dist = dist
+        self._next = nxt
+        self._field_version = self._grid_version
+        self._field_grid = self.grid.copy()
+        self._field_sources = sources
+        self.last_update_cells = n
+
+    def _ensure_field(self):
+        self.grid  # 레이어 합성 (바뀐 경우에만)
+        sources = self._sources()
+        if self._dist is not None and self._field_sources == sources:
+            # 장애물도 출발점도 그대로면 아무것도 하지 않음
+            if self._field_version == self._grid_version:
+                return
+            if self.planner == "incremental":
+                self._repair_distance_field()
+                return
+        self.build_distance_field()
+
+    def _neighbors(self, i):
+        cols = self.cols
+        x = i % cols
+        if x > 0: yield i - 1
+        if x < cols - 1: yield i + 1
+        if i >= cols: yield i - cols
+        if i + cols < self.rows * cols: yield i + cols
+
+    def _step(self, i):
+        """
+        i 셀에서 탈출구 쪽 다음 칸 (-1 = 없음)
+        _dist만으로 결정: 거리가 가장 작은 이웃, 같으면 _neighbors 순서(좌, 우, 상, 하)에서 먼저인 칸
+        -> "field"/"incremental" 어느 쪽이든, 이전 프레임과 상관없이 같은 거리장이면 같은 경로
+        """
+        dist = self._dist
+        d = dist[i]
+        if d <= 0 or self._field_sources.get(i) == d:
+            return -1  # 탈출구 / 다른 구역 경유 거리가 그대로인 출발점
+        best = -1
+        for j in self._neighbors(i):
+            if 0 <= dist[j] < d and (best < 0 or dist[j] < dist[best]):
+                best = j
+        return best
+
+    def _repair_distance_field(self):
+        """
+        [incremental] 이전 프레임과 달라진 셀만 보고 거리장을 부분 복구합니다.
+        (탈출구/출발점 집합이 같을 때만 사용, 단위 비용 그리드용 LPA* 방식)
+        1) 새로 막힌 셀을 경로로 쓰던 셀 중 대체 경로가 없는 셀만 무효화
+        2) 무효화된 셀 / 새로 뚫린 셀을 경계에서 다시 채우며 거리 감소를 전파
+        """
+        changed = np.flatnonzero(self.grid.ravel() != self._field_grid.ravel())
+        self._field_version = self._grid_version
+        if changed.size == 0:
+            self.last_update_cells = 0
+            return
+
+        blocked = self.grid.ravel().tolist()
+        dist = self._dist
+        nxt = self._next
+        sources = self._field_sources
+        np.copyto(self._field_grid, self.grid)
+
+        # 1) 무효화: 막힌 셀에서 시작해, 같은 거리의 다른 지지 셀이 없는 하위 셀만
+        #    (이전 거리 오름차순으로 처리해야 지지 여부 판단이 정확함)
+        invalid = []
+        raise_list = [(dist[i], int(i)) for i in changed if blocked[i] and dist[i] >= 0]
+        heapq.heapify(raise_list)
+        while raise_list:
+            d, i = heapq.heappop(raise_list)
+            if dist[i] != d:
+                continue  # 이미 무효화됨
+            dist[i] = -1
+            nxt[i] = -1
+            invalid.append(i)
+            for j in self._neighbors(i):
+                if nxt[j] != i:
+                    continue
+                # 같은 거리(d)의 다른 이웃이 있으면 포인터만 바꿔서 유지
+                for k in self._neighbors(j):
+                    if dist[k] == d and not blocked[k]:
+                        nxt[j] = k
+                        break
+                else:
+                    heapq.heappush(raise_list, (d + 1, j))
+
+        # 2) 경계 셀에서 다시 채우기 (초기값이 제각각이므로 힙 사용)
+        open_list = []
+        seeds = invalid + [int(i) for i in changed if not blocked[i]]
+        for i in seeds:
+            if blocked[i]:
+                continue
+            if i in sources:
+                dist[i] = sources[i]
+                nxt[i] = -1
+            for j in self._neighbors(i):
+                if dist[j] >= 0 and not blocked[j] and (dist[i] < 0 or dist[j] + 1 < dist[i]):
+                    dist[i] = dist[j] + 1
+                    nxt[i] = j
+            if dist[i] >= 0:
+                heapq.heappush(open_list, (dist[i], i))
+
+        updated = len(invalid) + self._lower(open_list, blocked, dist, nxt)
+        self.last_update_cells = updated
+
+    def _lower(self, open_list, blocked, dist, nxt):
+        """힙에 든 셀에서 거리 감소를 전파 (Dijkstra), 갱신한 셀 수 반환"""
+        updated = 0
+        while open_list:
+            d, i = heapq.heappop(open_list)
+            if d != dist[i]:
+                continue
+            d += 1
+            for j in self._neighbors(i):
+                if not blocked[j] and (dist[j] < 0 or d < dist[j]):
+                    dist[j] = d
+                    nxt[j] = i
+                    heapq.heappush(open_list, (d, j))
+                    updated += 1
+        return updated
+
+    def get_distance(self, x, y):
+        """픽셀 좌표에서 가장 가까운 탈출구까지 남은 칸 수 (-1 = 도달 불가)"""
+        self._ensure_field()
+        gx, gy = self._to_grid(x, y)
+        return self._dist[gy * self.cols + gx]
+
+    def get_next_hop(self, x, y):
+        """픽셀 좌표에서 탈출구 방향으로 다음 칸의 픽셀 중심 좌표 (없으면 None)"""
+        self._ensure_field()
+        gx, gy = self._to_grid(x, y)
+        j = self._step(gy * self.cols + gx)
+        if j < 0:
+            return None
+        return self._to_pixel(j % self.cols, j // self.cols)
+
     def get_shortest_path(self, start_x, start_y):
-        if not self.exits: return []
+        if not self.exits and not self.seeds: return []
         
         start_node = self._to_grid(start_x, start_y)
         # 시작점이 벽/불 속이면 탈출 불가
         if self.grid[start_node[1], start_node[0]] == 1:
             return []
 
+        if self.planner in ("field", "incremental"):
+            return self._path_from_field(start_node)
+        if self.planner == "flat":
+            if self._flat_astar is None:
+                self._flat_astar = FlatAStar(self.rows, self.cols)
+            path = self._flat_astar.search(self.grid, start_node, self.exits)
+            return [self._to_pixel(gx, gy) for gx, gy in path]
+        if self.planner == "hpa":
+            if self._hpa is None:
+                self._hpa = HierarchicalPlanner(self.rows, self.cols, self.cluster_size)
+            key = (self._grid_version, tuple(self.exits))
+            if key != self._hpa_key:
+                self._hpa.update(self.grid, self.exits)
+                self._hpa_key = key
+            path = self._hpa.find_path(start_node)
+            return [self._to_pixel(gx, gy) for gx, gy in path]
+
         shortest_path = []
         min_len = float('inf')
 
@@ -75,10 +483,25 @@ class GridMap:
         
         return shortest_path
 
+    def _path_from_field(self, start):
+        """거리장을 따라 _step()으로 한 칸씩 내려가며 경로 복원 (탐색 없음)"""
+        self._ensure_field()
+        cols = self.cols
+        i = start[1] * cols + start[0]
+        if self._dist[i] < 0:
+            return []
+
+        path = []
+        while i >= 0:
+            path.append(self._to_pixel(i % cols, i // cols))
+            i = self._step(i)
+        return path
+
     def _astar(self, start, end):
         # (기존 A* 로직 유지)
         # 만약 끝점이 장애물이면 근처 가능한 곳으로 타협하는 로직 추가 가능
-        if self.grid[end[1], end[0]] == 1: return [] 
+        grid = self.grid
+        if grid[end[1], end[0]] == 1: return [] 
 
         open_set = []
         heapq.heappush(open_set, (0, start))
@@ -94,7 +517,7 @@ class GridMap:
             for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]: # 4방향
                 nx, ny = current[0]+dx, current[1]+dy
                 if 0 <= nx < self.cols and 0 <= ny < self.rows:
-                    if self.grid[ny, nx] == 0: # 장애물 아님
+                    if grid[ny, nx] == 0: # 장애물 아님
                         tentative_g = g_score[current] + 1
                         if nx == end[0] and ny == end[1]: pass # 도착지
                         
@@ -115,9 +538,10 @@ class GridMap:
         
     def draw_grid(self, img):
         # 디버깅: 그리드 그리기 (장애물은 빨간색 채우기)
+        grid = self.grid
         for r in range(self.rows):
             for c in range(self.cols):
-                if self.grid[r, c] == 1:
+                if grid[r, c] == 1:
                     cx, cy = self._to_pixel(c, r)
                     # 장애물(벽) 표시
                     cv2.rectangle(img, 
@@ -1,5 +1,10 @@
 import math
 
+# 방향 문자열 <-> 1바이트 코드 (아틀라스/바이너리 전송용, 순서 변경 금지)
+DIRECTIONS = ("STOP", "UP", "UP-RIGHT", "RIGHT", "DOWN-RIGHT",
+              "DOWN", "DOWN-LEFT", "LEFT", "UP-LEFT", "BLOCKED")
+DIRECTION_CODES = {name: code for code, name in enumerate(DIRECTIONS)}
+
 class Navigator:
     def __init__(self):
         pass
@@ -0,0 +1,211 @@
+import threading
+import time
+import traceback
+from collections import deque
+
+class DropOldestQueue:
+    """
+    크기가 정해진 큐. 가득 차면 가장 오래된 항목을 버리고 새 항목을 넣습니다.
+    (느린 단계 앞에 옛 프레임이 쌓이지 않도록 하는 backpressure)
+    """
+    def __init__(self, maxsize=2):
+        self.maxsize = maxsize
+        self._items = deque()
+        self._cond = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+
+    def put(self, item):
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """항목 하나 반환 (시간 초과 또는 닫힌 빈 큐면 None)"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self.closed, timeout=timeout)
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class Stage:
+    """파이프라인 한 단계: func(ctx) -> ctx (None이면 이 프레임은 버림)"""
+    def __init__(self, name, func, workers=1):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.in_q = None
+        self.out_q = None
+        self._alive = workers
+        self._lock = threading.Lock()
+
+        # 단계별 처리 시간 통계 (초)
+        self.count = 0
+        self.total_time = 0.0
+        self.last_time = 0.0
+        self.max_time = 0.0
+
+    def record(self, elapsed):
+        with self._lock:
+            self.count += 1
+            self.total_time += elapsed
+            self.last_time = elapsed
+            self.max_time = max(self.max_time, elapsed)
+
+    def stats(self):
+        with self._lock:
+            avg = self.total_time / self.count if self.count else 0.0
+            return {"count": self.count, "avg_ms": avg * 1000,
+                    "last_ms": self.last_time * 1000, "max_ms": self.max_time * 1000,
+                    "queued": len(self.in_q) if self.in_q is not None else 0,
+                    "dropped": self.in_q.dropped if self.in_q is not None else 0}
+
+
+class Pipeline:
+    """
+    capture -> detect -> plan -> publish 처럼 단계를 스레드로 나눠 동시에 돌리는 실행기
+    - 단계 사이는 DropOldestQueue (가득 차면 오래된 프레임을 버림)
+    - OpenCV 단계는 GIL을 놓으므로 스레드만으로도 겹쳐서 실행됨
+    - 처리량은 단계 시간의 합이 아니라 가장 느린 단계에 맞춰짐
+    마지막 단계의 결과는 get()으로 받습니다 (화면 출력 등 메인 스레드 작업용).
+    어느 단계에서든 예외가 나면 파이프라인 전체를 멈추고 get()이 그 예외를 다시 던집니다.
+    """
+    def __init__(self, queue_size=2):
+        self.queue_size = queue_size
+        self.source = None
+        self.stages = []
+        self.output = DropOldestQueue(queue_size)
+        self._threads = []
+        self._running = False
+        self._seq = 0
+        self._last_out_seq = 0
+        self.error = None    # (단계 이름, 예외) - 처음 실패한 단계
+
+        # 소스에서 출력까지 걸린 시간
+        self.e2e = Stage("end_to_end", None)
+
+    def set_source(self, func, name="capture"):
+        """func() -> ctx(dict) 또는 None(스트림 종료)"""
+        self.source = Stage(name, func)
+
+    def add_stage(self, name, func, workers=1):
+        self.stages.append(Stage(name, func, workers))
+
+    def start(self):
+        queues = [DropOldestQueue(self.queue_size) for _ in self.stages] + [self.output]
+        self.source.out_q = queues[0]
+        for i, stage in enumerate(self.stages):
+            stage.in_q = queues[i]
+            stage.out_q = queues[i + 1]
+
+        self._running = True
+        self._spawn(self._run_source, self.source)
+        for stage in self.stages:
+            for _ in range(stage.workers):
+                self._spawn(self._run_stage, stage)
+
+    def _spawn(self, target, stage):
+        t = threading.Thread(target=target, args=(stage,), name=f"pipeline-{stage.name}")
+        t.daemon = True
+        t.start()
+        self._threads.append(t)
+
+    def _fail(self, stage, exc):
+        """단계 예외: 기록 후 모든 큐를 닫아 다른 단계와 get()이 멈추지 않게 함"""
+        print(f"[ERROR] 파이프라인 단계 '{stage.name}' 실패")
+        traceback.print_exc()
+        if self.error is None:
+            self.error = (stage.name, exc)
+        self._running = False
+        for s in self.stages:
+            s.in_q.close()
+        self.output.close()
+
+    def _run_source(self, stage):
+        while self._running:
+            t0 = time.perf_counter()
+            try:
+                ctx = stage.func()
+            except Exception as e:
+                self._fail(stage, e)
+                break
+            if ctx is None:
+                break
+            stage.record(time.perf_counter() - t0)
+            self._seq += 1
+            ctx["seq"] = self._seq
+            ctx["t0"] = t0
+            stage.out_q.put(ctx)
+        stage.out_q.close()
+
+    def _run_stage(self, stage):
+        while True:
+            ctx = stage.in_q.get()
+            if ctx is None:
+                if stage.in_q.closed or not self._running:
+                    break
+                continue
+            t0 = time.perf_counter()
+            try:
+                result = stage.func(ctx)
+            except Exception as e:
+                self._fail(stage, e)
+                break
+            stage.record(time.perf_counter() - t0)
+            if result is not None:
+                stage.out_q.put(result)
+
+        # 같은 단계의 마지막 워커가 끝날 때 다음 큐를 닫음
+        with stage._lock:
+            stage._alive -= 1
+            last = stage._alive == 0
+        if last:
+            stage.out_q.close()
+
+    def get(self, timeout=None):
+        """
+        마지막 단계 결과 (워커가 여럿이면 순서가 뒤바뀐 옛 프레임은 버림)
+        단계에서 예외가 나서 멈췄으면 RuntimeError (원래 예외는 __cause__)
+        """
+        while True:
+            ctx = self.output.get(timeout)
+            if ctx is None:
+                if self.error is not None:
+                    name, exc = self.error
+                    raise RuntimeError(f"pipeline stage '{name}' failed: {exc!r}") from exc
+                return None
+            if ctx["seq"] > self._last_out_seq:
+                self._last_out_seq = ctx["seq"]
+                self.e2e.record(time.perf_counter() - ctx["t0"])
+                return ctx
+
+    @property
+    def finished(self):
+        """소스가 끝났거나 단계가 실패했고, 모든 결과를 꺼냈는지"""
+        return self.output.closed and len(self.output) == 0
+
+    def stats(self):
+        result = {self.source.name: self.source.stats()}
+        for stage in self.stages:
+            result[stage.name] = stage.stats()
+        result[self.e2e.name] = self.e2e.stats()
+        return result
+
+    def stop(self):
+        self._running = False
+        for stage in self.stages:
+            stage.in_q.close()
+        for t in self._threads:
+            t.join(timeout=1.0)
@@ -0,0 +1,119 @@
+import threading
+import time
+import traceback
+from collections import deque
+
+class DirectionPublisher:
+    """
+    계획 단계와 서버/방송 사이의 방향표 발행기
+    - 매 프레임 방향표를 받아 노드별로 직전 확정값과 비교
+    - 새 방향이 min_dwell초 동안 유지되어야 확정 (UP <-> UP-RIGHT 같은 흔들림 억제)
+      화재 여부가 바뀌는 프레임과 처음 나타난 노드는 기다리지 않고 바로 확정
+    - 확정된 변경만 seq 번호가 붙은 이벤트로 만들어
+      구독자(subscribe)와 이벤트 로그(log)에 전달,
+      update_data(fire, directions) 형태의 대상(attach: 서버, UDP 방송)에는 확정된 전체 표를 전달
+    이벤트: {"seq", "time", "type": "fire", "fire_detected"}
+            {"seq", "time", "type": "direction", "node", "old", "new"}  (사라진 노드는 new=None)
+    대상/구독자에서 난 예외는 경고만 출력하고 나머지 대상과 계획 루프는 계속 진행합니다.
+    """
+    def __init__(self, min_dwell=0.5, log_size=1024):
+        self.min_dwell = min_dwell
+
+        self.fire_detected = False
+        self.directions = {}     # 확정된 방향표
+        self.seq = 0             # 마지막 이벤트 번호
+        self.log = deque(maxlen=log_size)
+
+        self._pending = {}       # 노드 -> (후보 방향, 처음 본 시각)
+        self._sinks = []
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+        self.frames = 0
+        self.suppressed = 0      # 확정 전에 되돌아간 후보 수
+        self.errors = 0          # 대상/구독자 예외 수
+
+    def attach(self, sink):
+        """update_data(fire_detected, directions)를 가진 대상 (바뀐 경우에만 호출)"""
+        self._sinks.append(sink)
+        self._deliver(sink.update_data, self.fire_detected, dict(self.directions))
+
+    def subscribe(self, callback):
+        """callback(events): 한 프레임에서 확정된 이벤트 목록"""
+        self._subscribers.append(callback)
+
+    def update(self, fire_detected, directions, now=None):
+        """
+        이번 프레임의 계획 결과 반영
+        :return: 이번에 확정된 이벤트 목록 (없으면 빈 리스트)
+        """
+        now = time.monotonic() if now is None else now
+        fire_detected = bool(fire_detected)
+        self.frames += 1
+
+        changes = []
+        fire_changed = fire_detected != self.fire_detected
+        for node in set(directions) | set(self.directions) | set(self._pending):
+            new = directions.get(node)
+            old = self.directions.get(node)
+            if new == old:
+                if node in self._pending:
+                    del self._pending[node]
+                    self.suppressed += 1
+                continue
+            pending = self._pending.get(node)
+            if pending is None or pending[0] != new:
+                if pending is not None:
+                    self.suppressed += 1
+                pending = self._pending[node] = (new, now)
+            if fire_changed or old is None or now - pending[1] >= self.min_dwell:
+                del self._pending[node]
+                changes.append((node, old, new))
+
+        if not fire_changed and not changes:
+            return []
+
+        events = []
+        with self._lock:
+            if fire_changed:
+                self.fire_detected = fire_detected
+                events.append(self._event(now, {"type": "fire", "fire_detected": fire_detected}))
+            for node, old, new in sorted(changes, key=lambda c: c[0]):
+                if new is None:
+                    del self.directions[node]
+                else:
+                    self.directions[node] = new
+                events.append(self._event(now, {"type": "direction", "node": node,
+                                                "old": old, "new": new}))
+            self.log.extend(events)
+            table = dict(self.directions)
+
+        for sink in self._sinks:
+            self._deliver(sink.update_data, fire_detected, table)
+        for callback in self._subscribers:
+            self._deliver(callback, events)
+        return events
+
+    def _deliver(self, func, *args):
+        """대상 하나의 실패가 다른 대상이나 파이프라인을 멈추지 않도록"""
+        try:
+            func(*args)
+        except Exception:
+            self.errors += 1
+            print(f"[WARN] 방향표 전달 실패: {func!r}")
+            traceback.print_exc()
+
+    def _event(self, now, event):
+        self.seq += 1
+        event["seq"] = self.seq
+        event["time"] = now
+        return event
+
+    def events_since(self, seq):
+        """seq 이후 이벤트 (로그에서 밀려난 것이 있으면 남아 있는 것부터)"""
+        with self._lock:
+            return [event for event in self.log if event["seq"] > seq]
+
+    def stats(self):
+        return {"frames": self.frames, "events": self.seq, "suppressed": self.suppressed,
+                "pending": len(self._pending), "errors": self.errors}
@@ -1,9 +1,22 @@
 import threading
 import logging
-from flask import Flask, jsonify
+from flask import Flask, Response, request
 from flask_cors import CORS
 
+try:
+    from snapshot import LONG_POLL_MAX, LONG_POLL_TIMEOUT, SSE_HEARTBEAT, SnapshotStore
+except ImportError:
+    from src.snapshot import LONG_POLL_MAX, LONG_POLL_TIMEOUT, SSE_HEARTBEAT, SnapshotStore
+
 class EvacuationServer:
+    """
+    /status, /direction/<id>: ETag/304 지원
+      ?since=<버전> 을 붙이면 그 버전 이후 바뀔 때까지 대기(long-poll),
+      timeout(초) 안에 안 바뀌면 304 (노드는 그 노드의 방향 버전 기준)
+      since가 현재 버전과 다르거나(서버 재시작 전 값) If-None-Match가 현재 ETag와 다르면 바로 응답
+    /events: Server-Sent Events (바뀔 때만 전송, 그 외에는 하트비트 주석)
+      ?node=<id> 를 붙이면 그 노드의 방향이 바뀔 때만 전송
+    """
     def __init__(self, port=5000):
         self.port = port
         self.app = Flask(__name__)
@@ -13,11 +26,8 @@ class EvacuationServer:
         log = logging.getLogger('werkzeug')
         log.setLevel(logging.ERROR)
         
-        # 공유 데이터 저장소
-        self.status_data = {
-            "fire_detected": False,
-            "directions": {}
-        }
+        # 공유 데이터 저장소: update_data마다 새 스냅샷(응답 바이트 포함)으로 통째로 교체
+        self.store = SnapshotStore()
         
         # 라우트 설정
         self._setup_routes()
@@ -29,21 +39,96 @@ class EvacuationServer:
     def _setup_routes(self):
         @self.app.route('/status')
         def get_status():
-            return jsonify(self.status_data)
+            since = request.args.get("since", type=int)
+            if since is None or self._client_stale(self.store.current.status_etag):
+                snap = self.store.current
+            else:
+                snap = self.store.wait_newer(since, self._poll_timeout())
+                if snap.version == since:
+                    return self._not_modified(snap.status_etag)
+            return self._respond(snap.status_body, snap.status_etag)
 
         @self.app.route('/direction/<int:dot_id>')
         def get_direction(dot_id):
-            direction = self.status_data["directions"].get(dot_id, "STOP")
-            return jsonify({"id": dot_id, "direction": direction})
+            since = request.args.get("since", type=int)
+            if since is None or self._client_stale(self.store.current.node(dot_id)[1]):
+                snap = self.store.current
+            else:
+                snap = self.store.wait_node(dot_id, since, self._poll_timeout())
+                if snap.node_version(dot_id) == since:
+                    return self._not_modified(snap.node(dot_id)[1])
+            body, etag = snap.node(dot_id)
+            return self._respond(body, etag)
+
+        @self.app.route('/events')
+        def get_events():
+            node = request.args.get("node", type=int)
+            last_id = self.store.parse_event_id(request.headers.get("Last-Event-ID"))
+            headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            return Response(self._event_stream(node, last_id), mimetype="text/event-stream",
+                            headers=headers)
+
+    def _client_stale(self, etag):
+        """If-None-Match를 보냈는데 현재 ETag가 아니면 (재시작 전 ETag 등) long-poll 없이 바로 응답"""
+        return bool(request.if_none_match) and not request.if_none_match.contains(etag.strip('"'))
+
+    def _poll_timeout(self):
+        timeout = request.args.get("timeout", LONG_POLL_TIMEOUT, type=float)
+        return min(max(timeout, 0.0), LONG_POLL_MAX)
+
+    def _event_stream(self, node, last_id):
+        """
+        SSE 스트림: 접속 즉시 현재 상태 1건(Last-Event-ID와 같으면 생략) 후
+        바뀔 때만 이벤트, SSE_HEARTBEAT초 동안 변화가 없으면 하트비트
+        (last_id: 이 프로세스의 버전, 재시작 전 id는 parse_event_id에서 None이 되어 현재 상태부터)
+        """
+        if node is None:
+            version_of = lambda snap: snap.version
+            event_of = lambda snap: snap.status_event
+        else:
+            version_of = lambda snap: snap.node_version(node)
+            event_of = lambda snap: snap.node_event(node)
+
+        yield b"retry: 1000\n\n"
+        sent = last_id
+        while True:
+            if sent is None:
+                snap = self.store.current
+            else:
+                snap = self.store.wait_for(lambda s: version_of(s) != sent, SSE_HEARTBEAT)
+            if sent is not None and version_of(snap) == sent:
+                yield b": heartbeat\n\n"
+                continue
+            sent = version_of(snap)
+            yield event_of(snap)
+
+    def _respond(self, body, etag):
+        """미리 만든 바이트 응답 (If-None-Match가 같으면 304)"""
+        if request.if_none_match.contains(etag.strip('"')):
+            return self._not_modified(etag)
+        return Response(body, mimetype="application/json",
+                        headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    def _not_modified(self, etag):
+        return Response(status=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+    @property
+    def status_data(self):
+        """현재 상태 사본 {"fire_detected", "directions"}"""
+        return self.store.current.as_dict()
 
     def _run_server(self):
         print(f">>> Web Server started on port {self.port}")
-        self.app.run(host='0.0.0.0', port=self.port, debug=False, use_reloader=False)
+        # long-poll / SSE 연결이 요청 스레드를 붙잡고 있으므로 threaded 필수
+        self.app.run(host='0.0.0.0', port=self.port, debug=False, use_reloader=False,
+                     threaded=True)
 
     def start(self):
         self.thread.start()
 
     def update_data(self, fire_detected, directions):
-        """메인 스레드에서 최신 정보를 이 함수로 밀어넣습니다."""
-        self.status_data["fire_detected"] = fire_detected
-        self.status_data["directions"] = directions
\ No newline at end of file
+        """
+        메인 스레드에서 최신 정보를 이 함수로 밀어넣습니다.
+        내용이 바뀐 경우에만 버전이 올라가고 새 스냅샷으로 교체됩니다.
+        """
+        return self.store.publish(fire_detected, directions)
\ No newline at end of file
@@ -0,0 +1,183 @@
+"""
+현장 설정 번들 (site bundle)
+- LED 노드 / 탈출구 좌표, 감지 임계값, 보드 보정(호모그래피),
+  정적 벽 마스크와 해상도별로 미리 래스터화한 점유 그리드,
+  대시보드 맵 이미지(해상도별 BGR 원본)를 파일 하나에 저장
+- 파일 = 헤더 + JSON 메타 + 64바이트 정렬된 배열 원본 바이트
+- 읽을 때는 배열을 np.memmap으로 열기만 하므로 시작이 거의 즉시 끝남
+get_coords.py가 만들고 main.py / virtual_core.py(대시보드)가 같은 파일을 읽습니다.
+"""
+import json
+import os
+import struct
+
+import numpy as np
+
+# 기본 저장 위치 (src/site.bundle)
+SITE_BUNDLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "site.bundle")
+
+MAGIC = b"EVSITE01"
+# 헤더: 매직(8) + 메타 JSON 길이(4)
+HEADER = struct.Struct("<8sI")
+ALIGN = 64
+
+# Detector에 반영할 수 있는 임계값 이름
+DETECTOR_THRESHOLDS = ("WALL_THRESH", "MIN_WALL_AREA", "MIN_FIRE_AREA",
+                       "FIRE_BRIGHT_THRESH", "FIRE_RB_DIFF", "FIRE_RED_RANGES")
+
+def grid_key(name, width, height, grid_size):
+    return f"grid:{name}:{width}x{height}:{grid_size}"
+
+def rasterize(mask, width, height, grid_size):
+    """GridMap(width, height, grid_size).set_static_mask(mask)와 같은 정적 그리드"""
+    import cv2
+    try:
+        from map import GridMap
+    except ImportError:
+        from src.map import GridMap
+    if mask.shape[1] != width or mask.shape[0] != height:
+        mask = cv2.resize(mask, (width, height))
+    return GridMap(width, height, grid_size)._rasterize(mask)
+
+def write_site_bundle(path, width, height, nodes, exits, thresholds=None, calibration=None,
+                      masks=None, grids=(), images=None):
+    """
+    :param width, height: 좌표 기준 평면 크기 (get_coords.py 화면, 640x480)
+    :param nodes: {LED 이름: (x, y)} / exits: {탈출구 이름: (x, y)}
+    :param thresholds: {임계값 이름: 값} (DETECTOR_THRESHOLDS 등)
+    :param calibration: calibration.Calibration (보정된 경우에만 저장)
+    :param masks: {마스크 이름: (h, w) uint8 벽 마스크}
+    :param grids: [(마스크 이름, width, height, grid_size), ...] 미리 래스터화할 해상도
+    :param images: {이미지 이름: [BGR 이미지, ...]} 해상도별로 디코딩해 둔 이미지
+    """
+    arrays = {}
+    for name, imgs in (images or {}).items():
+        for img in imgs:
+            arrays[f"image:{name}:{img.shape[1]}x{img.shape[0]}"] = np.ascontiguousarray(img)
+    for name, mask in (masks or {}).items():
+        arrays[f"mask:{name}"] = np.ascontiguousarray(mask, dtype=np.uint8)
+    for name, w, h, gs in grids:
+        arrays[grid_key(name, w, h, gs)] = rasterize(masks[name], w, h, gs)
+    if calibration is not None and calibration.calibrated:
+        arrays["homography"] = np.asarray(calibration.homography, dtype=np.float64)
+        arrays["corners"] = np.asarray(calibration.corners, dtype=np.float32)
+
+    # 배열 배치 (오프셋은 메타 뒤 데이터 영역 기준)
+    layout = {}
+    offset = 0
+    for name, arr in arrays.items():
+        offset = (offset + ALIGN - 1) // ALIGN * ALIGN
+        layout[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape), "offset": offset}
+        offset += arr.nbytes
+
+    meta = {
+        "width": width,
+        "height": height,
+        "nodes": [[name, int(x), int(y)] for name, (x, y) in nodes.items()],
+        "exits": [[name, int(x), int(y)] for name, (x, y) in exits.items()],
+        "thresholds": thresholds or {},
+        "calibration": None,
+        "arrays": layout,
+    }
+    if "homography" in arrays:
+        meta["calibration"] = {"source_size": list(calibration.source_size),
+                               "output_size": [calibration.width, calibration.height]}
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode("utf-8")
+
+    # 데이터 영역 시작도 정렬
+    data_start = (HEADER.size + len(meta_bytes) + ALIGN - 1) // ALIGN * ALIGN
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(meta_bytes)))
+        f.write(meta_bytes)
+        for name, arr in arrays.items():
+            f.seek(data_start + layout[name]["offset"])
+            f.write(arr.tobytes())
+        f.truncate(data_start + offset)
+    os.replace(tmp_path, path)  # 읽는 쪽이 반쯤 쓴 파일을 보지 않도록
+    return path
+
+
+class SiteBundle:
+    def __init__(self, path=SITE_BUNDLE_PATH):
+        with open(path, "rb") as f:
+            magic, meta_len = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"Not a site bundle file: {path}")
+            self.meta = json.loads(f.read(meta_len).decode("utf-8"))
+        self.path = path
+        self._data_start = (HEADER.size + meta_len + ALIGN - 1) // ALIGN * ALIGN
+        self._arrays = {}
+
+        self.width = self.meta["width"]
+        self.height = self.meta["height"]
+        self.nodes = {name: (x, y) for name, x, y in self.meta["nodes"]}
+        self.exits = {name: (x, y) for name, x, y in self.meta["exits"]}
+        self.thresholds = self.meta["thresholds"]
+
+    @classmethod
+    def load(cls, path=SITE_BUNDLE_PATH):
+        """번들 불러오기 (파일이 없으면 None)"""
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def array(self, name):
+        """저장된 배열 (읽기 전용 memmap, 없으면 None)"""
+        if name in self._arrays:
+            return self._arrays[name]
+        info = self.meta["arrays"].get(name)
+        if info is None:
+            return None
+        arr = np.memmap(self.path, dtype=np.dtype(info["dtype"]), mode="r",
+                        offset=self._data_start + info["offset"], shape=tuple(info["shape"]))
+        self._arrays[name] = arr
+        return arr
+
+    def mask(self, name):
+        return self.array(f"mask:{name}")
+
+    def image(self, name, width=None):
+        """저장된 이미지 중 폭이 width인 것 (None이면 가장 큰 원본), 없으면 None"""
+        prefix = f"image:{name}:"
+        sizes = [tuple(int(v) for v in key[len(prefix):].split("x"))
+                 for key in self.meta["arrays"] if key.startswith(prefix)]
+        if width is not None:
+            sizes = [s for s in sizes if s[0] == width]
+        if not sizes:
+            return None
+        w, h = max(sizes)
+        return self.array(f"{prefix}{w}x{h}")
+
+    def static_grid(self, name, width, height, grid_size):
+        """미리 래스터화한 정적 그리드 (그 해상도가 없으면 None)"""
+        return self.array(grid_key(name, width, height, grid_size))
+
+    def scaled_points(self, points, width, height):
+        """기준 평면 좌표를 (width, height) 화면 좌표로 변환"""
+        sx = width / float(self.width)
+        sy = height / float(self.height)
+        return {name: (int(x * sx), int(y * sy)) for name, (x, y) in points.items()}
+
+    def calibration(self):
+        """저장된 보드 보정 (없으면 None)"""
+        info = self.meta.get("calibration")
+        if info is None:
+            return None
+        try:
+            from calibration import Calibration
+        except ImportError:
+            from src.calibration import Calibration
+        calib = Calibration(*info["output_size"])
+        calib.set_corners(np.array(self.array("corners")), info["source_size"])
+        return calib
+
+    def apply_thresholds(self, detector):
+        """저장된 감지 임계값을 Detector에 반영"""
+        for name in DETECTOR_THRESHOLDS:
+            if name not in self.thresholds:
+                continue
+            value = self.thresholds[name]
+            if name == "FIRE_RED_RANGES":
+                value = tuple((tuple(lo), tuple(hi)) for lo, hi in value)
+            setattr(detector, name, value)
@@ -0,0 +1,116 @@
+import json
+import os
+import threading
+
+# long-poll 기본/최대 대기 시간(초)과 SSE 하트비트 간격(초) (Flask / asyncio 서버 공통)
+LONG_POLL_TIMEOUT = 25.0
+LONG_POLL_MAX = 60.0
+SSE_HEARTBEAT = 15.0
+
+def _encode(obj):
+    # Flask jsonify와 같은 형태 (키 정렬, 공백 없음, 끝 줄바꿈)
+    return (json.dumps(obj, sort_keys=True, separators=(",", ":")) + "\n").encode("utf-8")
+
+def _sse_event(epoch, version, name, body):
+    """Server-Sent Events 한 건 (id는 "<epoch>-<버전>", JSON 본문은 한 줄)"""
+    return b"id: %s-%d\nevent: %s\ndata: %s\n\n" % (epoch.encode(), version, name.encode(),
+                                                      body.rstrip(b"\n"))
+
+class StatusSnapshot:
+    """
+    한 시점의 상태 (만든 뒤에는 바꾸지 않음)
+    /status와 노드별 /direction 응답 바이트, ETag, SSE 이벤트를 미리 만들어 둡니다.
+    노드 버전(ETag)은 그 노드의 방향이 마지막으로 바뀐 버전이므로,
+    다른 노드만 바뀌면 304가 유지되고 노드별 long-poll도 깨어나지 않습니다.
+    ETag에는 저장소의 epoch(프로세스마다 새로 뽑는 값)가 들어가므로
+    서버가 재시작해 버전이 0부터 다시 세어져도 이전 ETag로 304를 받지 않습니다.
+    """
+    def __init__(self, version, fire_detected, directions, previous=None, epoch=""):
+        self.version = version
+        self.epoch = epoch
+        self.fire_detected = bool(fire_detected)
+        self.directions = dict(directions)
+
+        self.status_body = _encode({"version": version, "fire_detected": self.fire_detected,
+                                    "directions": self.directions})
+        self.status_etag = f'"s{epoch}-{version}"'
+        self.status_event = _sse_event(epoch, version, "status", self.status_body)
+
+        self.node_versions = {}
+        self.node_bodies = {}
+        for dot_id, direction in self.directions.items():
+            if previous is not None and previous.directions.get(dot_id) == direction:
+                node_version = previous.node_versions[dot_id]
+                self.node_bodies[dot_id] = previous.node_bodies[dot_id]
+            else:
+                node_version = version
+                self.node_bodies[dot_id] = _encode({"id": dot_id, "direction": direction,
+                                                    "version": node_version})
+            self.node_versions[dot_id] = node_version
+
+    def node_version(self, dot_id):
+        """노드 방향이 마지막으로 바뀐 버전 (모르는 노드는 0)"""
+        return self.node_versions.get(dot_id, 0)
+
+    def node(self, dot_id):
+        """(응답 바이트, ETag) - 모르는 노드는 STOP, ETag 끝의 "-<버전>"은 노드 버전"""
+        body = self.node_bodies.get(dot_id)
+        if body is None:
+            body = _encode({"id": dot_id, "direction": "STOP", "version": 0})
+        return body, f'"n{dot_id}-{self.epoch}-{self.node_version(dot_id)}"'
+
+    def node_event(self, dot_id):
+        return _sse_event(self.epoch, self.node_version(dot_id), "direction", self.node(dot_id)[0])
+
+    def as_dict(self):
+        return {"fire_detected": self.fire_detected, "directions": dict(self.directions)}
+
+
+class SnapshotStore:
+    """
+    최신 StatusSnapshot 보관소 (쓰는 쪽 1개, 읽는 쪽 여러 개)
+    publish()는 새 스냅샷을 만든 뒤 참조만 바꿔 끼우므로 읽는 쪽은 락 없이
+    항상 완성된 스냅샷 하나를 봅니다. 내용이 같으면 버전을 올리지 않습니다.
+    long-poll / SSE는 wait_for()로 다음 변경까지 기다립니다.
+    버전은 프로세스마다 0부터 다시 세므로, 클라이언트가 보낸 버전은
+    "현재와 다르면 바로 응답"으로 비교합니다 (재시작 전의 더 큰 값도 기다리지 않음).
+    """
+    def __init__(self):
+        self._cond = threading.Condition()
+        self.epoch = os.urandom(4).hex()
+        self.current = StatusSnapshot(0, False, {}, epoch=self.epoch)
+
+    def publish(self, fire_detected, directions):
+        """
+        :return: 새 스냅샷 (내용이 그대로면 None)
+        """
+        with self._cond:
+            old = self.current
+            if old.fire_detected == bool(fire_detected) and old.directions == directions:
+                return None
+            snap = StatusSnapshot(old.version + 1, fire_detected, directions, previous=old,
+                                  epoch=self.epoch)
+            self.current = snap
+            self._cond.notify_all()
+        return snap
+
+    def wait_for(self, predicate, timeout):
+        """predicate(스냅샷)가 참이 되거나 timeout(초)까지 대기 후 최신 스냅샷 반환"""
+        with self._cond:
+            self._cond.wait_for(lambda: predicate(self.current), timeout=timeout)
+            return self.current
+
+    def wait_newer(self, since, timeout):
+        """버전이 since와 달라질 때까지 대기 (since가 현재보다 크면 재시작 전 값이므로 바로 반환)"""
+        return self.wait_for(lambda snap: snap.version != since, timeout)
+
+    def wait_node(self, dot_id, since, timeout):
+        """노드 버전이 since와 달라질 때까지 대기 (wait_newer와 같은 규칙)"""
+        return self.wait_for(lambda snap: snap.node_version(dot_id) != since, timeout)
+
+    def parse_event_id(self, event_id):
+        """SSE Last-Event-ID "<epoch>-<버전>" -> 버전 (다른 프로세스의 id거나 형식이 틀리면 None)"""
+        epoch, _, version = (event_id or "").rpartition("-")
+        if epoch != self.epoch or not version.isdigit():
+            return None
+        return int(version)
@@ -0,0 +1,128 @@
+class FireTrack:
+    def __init__(self, track_id, box):
+        self.id = track_id
+        self.box = box          # 이번 프레임에 연결된 박스
+        self.committed = box    # 경로 계산에 쓰는 박스 (충분히 움직였을 때만 갱신)
+        self.hits = 1           # 연속으로 잡힌 프레임 수 (놓치면 0부터 다시)
+        self.misses = 0
+        self.confirmed = False
+
+
+def _iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    iw = min(ax + aw, bx + bw) - max(ax, bx)
+    ih = min(ay + ah, by + bh) - max(ay, by)
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = iw * ih
+    return inter / float(aw * ah + bw * bh - inter)
+
+def _center_dist(a, b):
+    dx = (a[0] + a[2] / 2.0) - (b[0] + b[2] / 2.0)
+    dy = (a[1] + a[3] / 2.0) - (b[1] + b[3] / 2.0)
+    return (dx * dx + dy * dy) ** 0.5
+
+
+class FireTracker:
+    """
+    프레임마다 새로 나오는 불 박스를 이전 프레임의 불과 이어 주는 추적기
+    - IoU가 가장 큰 쌍부터 연결, IoU가 0이면 중심 거리(max_dist 이내)로 연결
+    - confirm_frames번 연속 잡혀야 불로 인정, expire_frames번 연속 놓쳐야 꺼진 것으로 처리
+    - 박스가 move_thresh 픽셀 넘게 움직였을 때만 경로용 박스를 갱신 (몇 픽셀 떨림 무시)
+    - 경로용 박스가 덮는 그리드 셀 집합(footprint)이 바뀔 때만 changed=True
+    """
+    def __init__(self, grid_size=20, margin=20, confirm_frames=2, expire_frames=5,
+                 iou_thresh=0.1, max_dist=40, move_thresh=6):
+        self.grid_size = grid_size
+        self.margin = margin            # 장애물로 등록할 때 박스를 넓히는 여유 (main.py와 동일)
+        self.confirm_frames = confirm_frames
+        self.expire_frames = expire_frames
+        self.iou_thresh = iou_thresh
+        self.max_dist = max_dist
+        self.move_thresh = move_thresh
+
+        self.tracks = []
+        self._next_id = 1
+        self.footprint = frozenset()
+        self.version = 0                # footprint가 바뀔 때마다 1씩 증가
+
+    def update(self, boxes):
+        """
+        이번 프레임의 불 박스 반영
+        :return: 불 그리드 footprint가 바뀌었으면 True
+        """
+        unmatched = self._associate(boxes)
+
+        for track in self.tracks:
+            if track.misses == 0:
+                track.hits += 1
+                if track.hits >= self.confirm_frames:
+                    track.confirmed = True
+                if self._moved(track.committed, track.box):
+                    track.committed = track.box
+        for box in unmatched:
+            track = FireTrack(self._next_id, box)
+            self._next_id += 1
+            track.confirmed = self.confirm_frames <= 1
+            self.tracks.append(track)
+
+        self.tracks = [t for t in self.tracks if t.misses < self.expire_frames]
+
+        footprint = self._footprint()
+        if footprint == self.footprint:
+            return False
+        self.footprint = footprint
+        self.version += 1
+        return True
+
+    def _associate(self, boxes):
+        """기존 트랙과 박스를 연결하고, 연결 안 된 박스 목록을 반환"""
+        pairs = []
+        for ti, track in enumerate(self.tracks):
+            for bi, box in enumerate(boxes):
+                iou = _iou(track.box, box)
+                if iou >= self.iou_thresh:
+                    pairs.append((-iou, 0.0, ti, bi))
+                else:
+                    d = _center_dist(track.box, box)
+                    if d <= self.max_dist:
+                        pairs.append((0.0, d, ti, bi))
+        pairs.sort()
+
+        used_tracks = set()
+        used_boxes = set()
+        for _, _, ti, bi in pairs:
+            if ti in used_tracks or bi in used_boxes:
+                continue
+            used_tracks.add(ti)
+            used_boxes.add(bi)
+            self.tracks[ti].box = boxes[bi]
+
+        for ti, track in enumerate(self.tracks):
+            if ti in used_tracks:
+                track.misses = 0
+            else:
+                track.misses += 1
+                track.hits = 0  # 연속 횟수만 셈 (잡혔다 놓쳤다 하는 오검출은 확정되지 않음)
+        return [box for bi, box in enumerate(boxes) if bi not in used_boxes]
+
+    def _moved(self, old, new):
+        return any(abs(a - b) > self.move_thresh for a, b in zip(old, new))
+
+    def _footprint(self):
+        cells = set()
+        g = self.grid_size
+        m = self.margin
+        for x, y, w, h in self.boxes:
+            gx0, gy0 = max(0, (x - m) // g), max(0, (y - m) // g)
+            gx1, gy1 = (x + w + m) // g, (y + h + m) // g
+            for gy in range(gy0, gy1 + 1):
+                for gx in range(gx0, gx1 + 1):
+                    cells.add((gx, gy))
+        return frozenset(cells)
+
+    @property
+    def boxes(self):
+        """경로 계산에 쓸 확정된 불 박스 [(x, y, w, h), ...]"""
+        return [t.committed for t in self.tracks if t.confirmed]
@@ -0,0 +1,113 @@
+import numpy as np
+
+class StaticWallLearner:
+    """
+    벽 마스크를 여러 프레임 동안 투표로 누적해 정적 벽 레이어를 자동으로 만듭니다.
+    - 학습 중: 매 프레임 벽 감지 결과를 누적, frames장 모이면 vote_ratio 이상 잡힌 픽셀을 벽으로 확정
+    - 학습 후: verify_interval 프레임마다(또는 장면 변화 시) 한 번만 감지해서 비교
+    - 확정된 벽과 mismatch_ratio 이상 다른 검사가 mismatch_checks번 연속이면 다시 학습
+      (다시 학습하는 동안에는 이전 벽 레이어를 그대로 사용)
+    확정된 벽은 GridMap.set_static_mask로 넘기면 그리드 래스터까지 캐시됩니다.
+    """
+    def __init__(self, frames=30, vote_ratio=0.6, verify_interval=150,
+                 mismatch_ratio=0.05, mismatch_checks=3):
+        self.frames = frames
+        self.vote_ratio = vote_ratio
+        self.verify_interval = verify_interval
+        self.mismatch_ratio = mismatch_ratio
+        self.mismatch_checks = mismatch_checks
+
+        self.mask = None       # 확정된 벽 마스크 (0 or 255)
+        self.version = 0       # 확정될 때마다 1씩 증가
+        self._votes = None     # 픽셀별 벽 판정 횟수
+        self._seen = 0         # 이번 학습에 누적한 프레임 수
+        self._learning = True
+        self._since_verify = 0
+        self._verify_requested = False
+        self._strikes = 0
+        self.last_mismatch = 0.0
+
+    @property
+    def learning(self):
+        return self._learning
+
+    @property
+    def progress(self):
+        """(누적 프레임 수, 필요한 프레임 수)"""
+        return self._seen, self.frames
+
+    def preload(self, mask):
+        """저장해 둔 벽 마스크(사이트 번들 등)를 학습 결과로 바로 사용 (이후 검사 일정은 동일)"""
+        self.mask = np.where(np.asarray(mask) > 0, 255, 0).astype(np.uint8)
+        self.version += 1
+        self._learning = False
+        self._votes = None
+        self._seen = 0
+        self._since_verify = 0
+        self._strikes = 0
+
+    def relearn(self):
+        """처음부터 다시 학습 (확정된 벽은 새 결과가 나올 때까지 유지)"""
+        self._learning = True
+        self._votes = None
+        self._seen = 0
+        self._strikes = 0
+
+    def request_verify(self):
+        """다음 프레임에서 확정된 벽을 다시 확인 (장면이 크게 바뀐 경우 등)"""
+        self._verify_requested = True
+
+    def needs_detection(self):
+        """이번 프레임에 벽 감지가 필요한지 (학습 중이거나 검사 차례)"""
+        if self._learning:
+            return True
+        self._since_verify += 1
+        return self._verify_requested or self._since_verify >= self.verify_interval
+
+    def feed(self, wall_mask):
+        """
+        이번 프레임의 벽 감지 결과 반영
+        :return: 확정된 벽 마스크가 새로 바뀌었으면 True
+        """
+        if self._learning:
+            return self._vote(wall_mask)
+        return self._verify(wall_mask)
+
+    def _vote(self, wall_mask):
+        if self._votes is None or self._votes.shape != wall_mask.shape:
+            self._votes = np.zeros(wall_mask.shape, dtype=np.uint16)
+            self._seen = 0
+        self._votes += wall_mask > 0
+        self._seen += 1
+        if self._seen < self.frames:
+            return False
+
+        needed = max(1, int(np.ceil(self.vote_ratio * self._seen)))
+        self.mask = np.where(self._votes >= needed, 255, 0).astype(np.uint8)
+        self.version += 1
+        self._votes = None
+        self._seen = 0
+        self._learning = False
+        self._since_verify = 0
+        self._verify_requested = False
+        self._strikes = 0
+        return True
+
+    def _verify(self, wall_mask):
+        self._since_verify = 0
+        self._verify_requested = False
+
+        # 확정된 벽 면적 대비 달라진 픽셀 비율
+        diff = np.count_nonzero((wall_mask > 0) != (self.mask > 0))
+        self.last_mismatch = diff / max(1, np.count_nonzero(self.mask))
+        if self.last_mismatch <= self.mismatch_ratio:
+            self._strikes = 0
+            return False
+
+        # 일시적인 가림(사람 손 등)일 수 있으므로 연속으로 다를 때만 다시 학습
+        self._strikes += 1
+        if self._strikes >= self.mismatch_checks:
+            self.relearn()
+        else:
+            self._verify_requested = True  # 다음 프레임에 바로 재확인
+        return False
@@ -0,0 +1,27 @@
+import socket
+import unittest
+
+from src.async_server import AsyncEvacuationServer
+
+class AsyncServerStartTest(unittest.TestCase):
+    def test_bind_failure_raises_from_start(self):
+        busy = socket.socket()
+        busy.bind(("127.0.0.1", 0))
+        busy.listen()
+        try:
+            server = AsyncEvacuationServer(port=busy.getsockname()[1], host="127.0.0.1")
+            with self.assertRaises(OSError):
+                server.start()
+            self.assertFalse(server.thread.is_alive())
+        finally:
+            busy.close()
+
+    def test_stop_right_after_start(self):
+        server = AsyncEvacuationServer(port=0, host="127.0.0.1")
+        server.start()
+        server.stop()
+        self.assertFalse(server.thread.is_alive())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import socket
+import struct
+import unittest
+
+from src.broadcast import (HEADER, MAX_NODES, MAX_PAYLOAD, UNKNOWN_CODE, DirectionBroadcaster,
+                           DirectionReceiver, decode_packet, encode_packet, seq_newer)
+from src.navigator import DIRECTIONS, DIRECTION_CODES
+
+class PacketCodecTest(unittest.TestCase):
+    """UDP 방향 패킷 <4sBIBH + 노드별 코드 1바이트"""
+
+    def test_layout(self):
+        packet = encode_packet(7, True, {0: "UP", 2: "LEFT"})
+        self.assertEqual(HEADER.size, 12)
+        self.assertEqual(packet[:12], struct.pack("<4sBIBH", b"EVDR", 1, 7, 1, 3))
+        self.assertEqual(packet[12:], bytes([DIRECTION_CODES["UP"], UNKNOWN_CODE,
+                                             DIRECTION_CODES["LEFT"]]))
+
+    def test_round_trip(self):
+        directions = {i: DIRECTIONS[i % len(DIRECTIONS)] for i in range(0, 40, 3)}
+        packet = decode_packet(encode_packet(123456, False, directions))
+        self.assertEqual(packet, {"seq": 123456, "fire_detected": False,
+                                  "directions": directions})
+        self.assertEqual(decode_packet(encode_packet(0, True, {})),
+                         {"seq": 0, "fire_detected": True, "directions": {}})
+
+    def test_unknown_direction_is_stop(self):
+        packet = encode_packet(1, False, {0: "SIDEWAYS"})
+        self.assertEqual(packet[12], UNKNOWN_CODE)
+        self.assertEqual(decode_packet(packet)["directions"], {})
+        # 수신 쪽에서 모르는 코드(UNKNOWN_CODE 제외)는 STOP
+        self.assertEqual(decode_packet(packet[:12] + bytes([200]))["directions"], {0: "STOP"})
+
+    def test_seq_wraps(self):
+        self.assertEqual(decode_packet(encode_packet(1 << 32, False, {}))["seq"], 0)
+        self.assertTrue(seq_newer(0, 0xFFFFFFFF))
+        self.assertTrue(seq_newer(5, 4))
+        self.assertFalse(seq_newer(4, 5))
+        self.assertFalse(seq_newer(4, 4))
+        self.assertTrue(seq_newer(0, None))
+
+    def test_node_id_limits(self):
+        packet = encode_packet(1, False, {MAX_NODES - 1: "UP"})
+        self.assertEqual(len(packet), MAX_PAYLOAD)
+        for bad in (-1, MAX_NODES, 2.0, "3", None):
+            with self.assertRaises(ValueError):
+                encode_packet(1, False, {bad: "UP"})
+
+    def test_rejects_malformed(self):
+        packet = encode_packet(1, True, {0: "UP", 1: "DOWN"})
+        self.assertIsNone(decode_packet(packet[:11]))
+        self.assertIsNone(decode_packet(packet[:-1]))          # 노드 수보다 짧음
+        self.assertIsNone(decode_packet(b"XXXX" + packet[4:]))
+        self.assertIsNone(decode_packet(packet[:4] + b"\x02" + packet[5:]))
+
+
+class BroadcastLoopbackTest(unittest.TestCase):
+    """로컬 루프백으로 보내고 기준 수신기로 받기"""
+
+    def setUp(self):
+        probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+        probe.close()
+        self.receiver = DirectionReceiver("127.0.0.1", port)
+        self.broadcaster = DirectionBroadcaster("127.0.0.1", port, refresh_interval=0.05)
+
+    def tearDown(self):
+        self.broadcaster.close()
+        self.receiver.close()
+
+    def test_changes_only(self):
+        self.assertEqual(self.broadcaster.update_data(True, {0: "UP"}), 1)
+        self.assertIsNone(self.broadcaster.update_data(True, {0: "UP"}))
+        self.assertEqual(self.receiver.receive(timeout=1)["directions"], {0: "UP"})
+
+        # 재전송(같은 seq)은 새 내용으로 받지 않음
+        self.broadcaster.start()
+        self.assertIsNone(self.receiver.receive(timeout=0.2))
+
+        self.assertEqual(self.broadcaster.update_data(False, {0: "LEFT"}), 2)
+        packet = self.receiver.receive(timeout=1)
+        self.assertEqual((packet["seq"], packet["fire_detected"]), (2, False))
+
+    def test_invalid_table_keeps_previous_packet(self):
+        self.broadcaster.update_data(True, {0: "UP"})
+        self.assertIsNone(self.broadcaster.update_data(True, {MAX_NODES: "UP"}))
+        self.assertEqual(self.broadcaster.seq, 1)
+        self.assertEqual(decode_packet(self.broadcaster._packet)["directions"], {0: "UP"})
+
+
+if __name__ == "__main__":
+    unittest.main()
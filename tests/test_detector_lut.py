@@ -0,0 +1,58 @@
+import unittest
+
+import numpy as np
+
+from src.detector import Detector
+
+class FireLutTest(unittest.TestCase):
+    """LUT 경로(_fire_color_mask_lut)가 기존 fire_color_mask와 같은 마스크를 내는지"""
+
+    def setUp(self):
+        self.detector = Detector()
+        self.rng = np.random.default_rng(0)
+
+    def random_frame(self, h=480, w=640):
+        return self.rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+
+    def assert_same_mask(self, frame, reuse=True):
+        expected = self.detector.fire_color_mask(frame)
+        actual = self.detector._fire_color_mask_lut(frame, reuse=reuse)
+        self.assertEqual(actual.shape, expected.shape)
+        self.assertEqual(actual.dtype, expected.dtype)
+        self.assertEqual(np.count_nonzero(actual != expected), 0)
+
+    def test_random_frames(self):
+        for _ in range(3):
+            self.assert_same_mask(self.random_frame())
+        self.assert_same_mask(self.random_frame(), reuse=False)
+
+    def test_odd_sizes_and_views(self):
+        self.assert_same_mask(self.random_frame(37, 53))
+        # 연속이 아닌 뷰 (ROI 자르기)
+        self.assert_same_mask(self.random_frame()[10:200, 31:333])
+
+    def test_all_colors(self):
+        # BGR 2^24색 전부 (4096 x 4096 이미지 한 장)
+        codes = np.arange(1 << 24, dtype=np.uint32).reshape(4096, 4096)
+        frame = np.empty((4096, 4096, 3), dtype=np.uint8)
+        frame[..., 0] = codes & 0xFF
+        frame[..., 1] = (codes >> 8) & 0xFF
+        frame[..., 2] = codes >> 16
+        self.assert_same_mask(frame)
+
+    def test_threshold_change_rebuilds_lut(self):
+        frame = self.random_frame()
+        self.assert_same_mask(frame)
+
+        self.detector.FIRE_RB_DIFF = 80
+        self.assert_same_mask(frame)
+
+        self.detector.FIRE_BRIGHT_THRESH = 200
+        self.assert_same_mask(frame)
+
+        self.detector.FIRE_RED_RANGES = (((0, 60, 60), (15, 255, 255)),)
+        self.assert_same_mask(frame)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from src.camera import MJPEGStreamReader
+
+def encode(value, size=(64, 48)):
+    frame = np.full((size[1], size[0], 3), value, dtype=np.uint8)
+    return cv2.imencode(".jpg", frame)[1].tobytes()
+
+def with_thumbnail(jpeg):
+    """APP1 세그먼트 안에 썸네일 JPEG(SOI~EOI)을 끼운 JPEG"""
+    thumb = encode(0, (8, 8))
+    segment = b"Exif\x00\x00" + thumb
+    app1 = b"\xff\xe1" + (len(segment) + 2).to_bytes(2, "big") + segment
+    return jpeg[:2] + app1 + jpeg[2:]
+
+def part(jpeg, length=True):
+    headers = b"--frame\r\nContent-Type: image/jpeg\r\n"
+    if length:
+        headers += b"Content-Length: %d\r\n" % len(jpeg)
+    return headers + b"\r\n" + jpeg + b"\r\n"
+
+def split(stream, chunk=1000):
+    buf = bytearray()
+    frames = []
+    for i in range(0, len(stream), chunk):
+        buf += stream[i:i + chunk]
+        frames.extend(MJPEGStreamReader._split_frames(buf))
+    return frames
+
+class MJPEGSplitTest(unittest.TestCase):
+    def setUp(self):
+        self.jpegs = [encode(v) for v in (30, 120, 220)]
+
+    def test_content_length(self):
+        # 썸네일이 든 JPEG도 Content-Length가 있으면 통째로
+        jpegs = [with_thumbnail(j) for j in self.jpegs]
+        stream = b"".join(part(j) for j in jpegs)
+        for chunk in (1, 7, 1000, len(stream)):
+            self.assertEqual(split(stream, chunk), jpegs)
+        self.assertIsNotNone(cv2.imdecode(np.frombuffer(jpegs[0], np.uint8), cv2.IMREAD_COLOR))
+
+    def test_marker_fallback(self):
+        # Content-Length가 없는 파트 / 헤더 없이 이어 붙인 JPEG
+        stream = b"".join(part(j, length=False) for j in self.jpegs)
+        self.assertEqual(split(stream, 13), self.jpegs)
+        self.assertEqual(split(b"".join(self.jpegs), 13), self.jpegs)
+
+    def test_bad_length_falls_back_to_markers(self):
+        jpeg = self.jpegs[0]
+        bad = b"--frame\r\nContent-Length: 3\r\n\r\n" + jpeg + b"\r\n"
+        self.assertEqual(split(bad + part(self.jpegs[1]), 11), self.jpegs[:2])
+
+
+if __name__ == "__main__":
+    unittest.main()
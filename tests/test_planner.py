@@ -0,0 +1,141 @@
+import unittest
+from collections import deque
+
+import numpy as np
+
+from src.map import FlatAStar, GridMap
+
+GRID = 20
+COLS, ROWS = 24, 18
+EXITS = [(0, 0), (23, 17), (23, 0)]
+
+def make_map(planner, cluster_size=6):
+    gmap = GridMap(COLS * GRID, ROWS * GRID, grid_size=GRID, planner=planner,
+                   cluster_size=cluster_size)
+    wall = np.zeros((ROWS, COLS), dtype=np.uint8)
+    wall[9, 3:20] = 1   # 가운데 벽 (양 끝으로만 지나감)
+    gmap.set_static_grid(wall)
+    return gmap
+
+def load_frame(gmap, fire):
+    """fire: 그리드 크기 0/1 배열 (이번 프레임 불)"""
+    gmap.reset()
+    for gx, gy in EXITS:
+        gmap.add_exit(gx * GRID, gy * GRID, GRID - 1, GRID - 1)
+    if fire.any():
+        gmap.update_obstacles_from_mask(fire * 255)
+
+def random_fire(rng, density):
+    fire = (rng.random((ROWS, COLS)) < density).astype(np.uint8)
+    for gx, gy in EXITS:
+        fire[gy, gx] = 0
+    return fire
+
+def bfs_length(grid, start, goals):
+    """기준값: start에서 가장 가까운 goal까지 칸 수 (경로 점 개수, 없으면 0)"""
+    rows, cols = grid.shape
+    goals = {g for g in goals if not grid[g[1], g[0]]}
+    if grid[start[1], start[0]] or not goals:
+        return 0
+    seen = {start: 1}
+    queue = deque([start])
+    while queue:
+        x, y = queue.popleft()
+        if (x, y) in goals:
+            return seen[(x, y)]
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            if 0 <= nx < cols and 0 <= ny < rows and not grid[ny, nx] and (nx, ny) not in seen:
+                seen[(nx, ny)] = seen[(x, y)] + 1
+                queue.append((nx, ny))
+    return 0
+
+def free_cells(gmap):
+    return [gmap._to_pixel(x, y) for y in range(ROWS) for x in range(COLS)
+            if not gmap.grid[y, x]]
+
+
+class PlannerEquivalenceTest(unittest.TestCase):
+    """거리장 모드와 다른 탐색 방식이 같은 (최단) 경로를 내는지"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def assert_valid_path(self, gmap, path):
+        cells = [gmap._to_grid(x, y) for x, y in path]
+        for (x1, y1), (x2, y2) in zip(cells, cells[1:]):
+            self.assertEqual(abs(x1 - x2) + abs(y1 - y2), 1)
+        for x, y in cells:
+            self.assertEqual(gmap.grid[y, x], 0)
+        self.assertIn(cells[-1], EXITS)
+
+    def test_incremental_matches_rebuild(self):
+        # 같은 불 배치면 이전 프레임과 상관없이 경로(첫 칸 포함)가 같아야 함
+        incremental = make_map("incremental")
+        field = make_map("field")
+        fire = random_fire(self.rng, 0.1)
+        for frame in range(150):
+            # 몇 칸씩 막고 뚫기 (가끔 크게 바뀜)
+            flips = self.rng.random((ROWS, COLS)) < (0.3 if frame % 25 == 0 else 0.02)
+            fire = fire ^ flips.astype(np.uint8)
+            for gx, gy in EXITS:
+                fire[gy, gx] = 0
+            load_frame(incremental, fire)
+            load_frame(field, fire)
+            field.build_distance_field()
+            for x, y in free_cells(field):
+                self.assertEqual(incremental.get_distance(x, y), field.get_distance(x, y))
+                self.assertEqual(incremental.get_shortest_path(x, y),
+                                 field.get_shortest_path(x, y), (frame, x, y))
+        self.assertLess(incremental.last_update_cells, ROWS * COLS)
+
+    def test_search_planners_match_field(self):
+        maps = {name: make_map(name) for name in ("field", "flat", "astar", "hpa")}
+        for _ in range(20):
+            fire = random_fire(self.rng, 0.15)
+            for gmap in maps.values():
+                load_frame(gmap, fire)
+            field = maps["field"]
+            for x, y in free_cells(field)[::3]:
+                expected = field.get_shortest_path(x, y)
+                for name, gmap in maps.items():
+                    path = gmap.get_shortest_path(x, y)
+                    self.assertEqual(bool(path), bool(expected), (name, x, y))
+                    if not expected:
+                        continue
+                    self.assert_valid_path(gmap, path)
+                    if name == "hpa":
+                        # HPA*는 최단에 가깝지만 항상 최단은 아님
+                        self.assertGreaterEqual(len(path), len(expected))
+                    else:
+                        self.assertEqual(len(path), len(expected), (name, x, y))
+
+    def test_flat_astar_reuses_buffers(self):
+        # 같은 엔진으로 여러 그리드/시작점을 연달아 탐색해도 BFS와 같은 길이
+        engine = FlatAStar(ROWS, COLS)
+        for _ in range(30):
+            grid = random_fire(self.rng, 0.25)
+            for _ in range(10):
+                start = (int(self.rng.integers(COLS)), int(self.rng.integers(ROWS)))
+                self.assertEqual(len(engine.search(grid, start, EXITS)),
+                                 bfs_length(grid, start, EXITS), start)
+
+    def test_flat_astar_generation_wrap(self):
+        engine = FlatAStar(ROWS, COLS)
+        grid = random_fire(self.rng, 0.2)
+        expected = bfs_length(grid, (12, 12), EXITS)
+        engine.generation = 0xFFFFFFFF - 2
+        for _ in range(4):
+            self.assertEqual(len(engine.search(grid, (12, 12), EXITS)), expected)
+        self.assertLess(engine.generation, 10)
+
+    def test_fire_in_start_cell(self):
+        gmap = make_map("field")
+        fire = np.zeros((ROWS, COLS), dtype=np.uint8)
+        fire[5, 5] = 1
+        load_frame(gmap, fire)
+        self.assertEqual(gmap.get_shortest_path(*gmap._to_pixel(5, 5)), [])
+        self.assertIsNone(gmap.get_next_hop(*gmap._to_pixel(0, 0)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import io
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from src.publisher import DirectionPublisher
+
+class Sink:
+    def __init__(self):
+        self.calls = []
+
+    def update_data(self, fire_detected, directions):
+        self.calls.append((fire_detected, dict(directions)))
+
+
+class DirectionPublisherTest(unittest.TestCase):
+    """노드별 유지 시간(dwell) 확정과 이벤트 번호"""
+
+    def setUp(self):
+        self.pub = DirectionPublisher(min_dwell=0.5)
+        self.sink = Sink()
+        self.pub.attach(self.sink)
+        self.events = []
+        self.pub.subscribe(self.events.extend)
+
+    def test_new_nodes_and_fire_change_commit_at_once(self):
+        events = self.pub.update(True, {0: "UP", 1: "LEFT"}, now=0.0)
+        self.assertEqual([e["type"] for e in events], ["fire", "direction", "direction"])
+        self.assertEqual([e["seq"] for e in events], [1, 2, 3])
+        self.assertEqual(self.pub.directions, {0: "UP", 1: "LEFT"})
+        self.assertEqual(self.sink.calls[-1], (True, {0: "UP", 1: "LEFT"}))
+
+        # 화재 해제 프레임의 방향 변경도 기다리지 않음
+        events = self.pub.update(False, {0: "DOWN", 1: "LEFT"}, now=0.1)
+        self.assertEqual([e["type"] for e in events], ["fire", "direction"])
+        self.assertEqual(events[1]["old"], "UP")
+
+    def test_dwell(self):
+        self.pub.update(True, {0: "UP"}, now=0.0)
+        self.assertEqual(self.pub.update(True, {0: "RIGHT"}, now=1.0), [])
+        self.assertEqual(self.pub.update(True, {0: "RIGHT"}, now=1.4), [])
+        events = self.pub.update(True, {0: "RIGHT"}, now=1.5)
+        self.assertEqual([(e["node"], e["old"], e["new"]) for e in events], [(0, "UP", "RIGHT")])
+        self.assertEqual(self.sink.calls[-1], (True, {0: "RIGHT"}))
+
+    def test_flicker_is_suppressed(self):
+        self.pub.update(True, {0: "UP"}, now=0.0)
+        calls = len(self.sink.calls)
+        for i in range(10):
+            # UP <-> UP-RIGHT 흔들림은 확정되지 않음
+            self.pub.update(True, {0: "UP-RIGHT" if i % 2 == 0 else "UP"}, now=1.0 + i * 0.1)
+        self.assertEqual(self.pub.directions, {0: "UP"})
+        self.assertEqual(len(self.sink.calls), calls)
+        self.assertGreater(self.pub.stats()["suppressed"], 0)
+
+    def test_removed_node(self):
+        self.pub.update(True, {0: "UP", 1: "LEFT"}, now=0.0)
+        self.pub.update(True, {0: "UP"}, now=1.0)
+        events = self.pub.update(True, {0: "UP"}, now=1.5)
+        self.assertEqual([(e["node"], e["new"]) for e in events], [(1, None)])
+        self.assertEqual(self.pub.directions, {0: "UP"})
+
+    def test_events_since_and_subscribers(self):
+        self.pub.update(True, {0: "UP"}, now=0.0)
+        self.pub.update(False, {0: "DOWN"}, now=1.0)
+        self.assertEqual([e["seq"] for e in self.pub.events_since(2)], [3, 4])
+        self.assertEqual([e["seq"] for e in self.events], [1, 2, 3, 4])
+
+    def test_failing_sink_is_isolated(self):
+        class Broken:
+            def update_data(self, fire_detected, directions):
+                raise RuntimeError("boom")
+
+        with redirect_stdout(io.StringIO()), redirect_stderr(io.StringIO()):  # 경고/traceback 출력
+            self.pub.attach(Broken())
+            self.pub.update(True, {0: "UP"}, now=0.0)
+        self.assertEqual(self.sink.calls[-1], (True, {0: "UP"}))
+        self.assertEqual(len(self.events), 2)
+        self.assertEqual(self.pub.stats()["errors"], 2)   # attach 때 1번 + update 때 1번
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import threading
+import time
+import unittest
+
+from src.snapshot import SnapshotStore
+from src.server import EvacuationServer
+
+class SnapshotStoreTest(unittest.TestCase):
+    """버전/ETag 규칙과 long-poll 대기 (서버 재시작 포함)"""
+
+    def setUp(self):
+        self.store = SnapshotStore()
+
+    def test_version_and_node_etags(self):
+        first = self.store.publish(True, {0: "UP", 1: "LEFT"})
+        self.assertEqual(first.version, 1)
+        # 내용이 같으면 버전을 올리지 않음
+        self.assertIsNone(self.store.publish(True, {0: "UP", 1: "LEFT"}))
+
+        second = self.store.publish(True, {0: "UP", 1: "RIGHT"})
+        self.assertEqual(second.version, 2)
+        self.assertEqual(second.node_version(0), 1)
+        self.assertEqual(second.node(0), first.node(0))   # 안 바뀐 노드는 ETag도 그대로
+        self.assertNotEqual(second.node(1)[1], first.node(1)[1])
+        self.assertNotEqual(second.status_etag, first.status_etag)
+
+    def test_etags_differ_after_restart(self):
+        self.store.publish(True, {0: "UP"})
+        restarted = SnapshotStore()
+        restarted.publish(True, {0: "LEFT"})
+        self.assertNotEqual(self.store.current.status_etag, restarted.current.status_etag)
+        self.assertNotEqual(self.store.current.node(0)[1], restarted.current.node(0)[1])
+
+    def test_wait_newer(self):
+        self.store.publish(False, {0: "UP"})
+        t0 = time.monotonic()
+        self.assertEqual(self.store.wait_newer(1, 0.05).version, 1)   # 그대로면 timeout까지
+        self.assertGreaterEqual(time.monotonic() - t0, 0.04)
+
+        timer = threading.Timer(0.05, self.store.publish, (True, {0: "UP"}))
+        timer.start()
+        self.assertEqual(self.store.wait_newer(1, 5).version, 2)
+        timer.join()
+
+        # 재시작 전에 받은 더 큰 버전은 기다리지 않음
+        t0 = time.monotonic()
+        self.assertEqual(self.store.wait_newer(40, 5).version, 2)
+        self.assertEqual(self.store.wait_node(0, 40, 5).node_version(0), 1)
+        self.assertLess(time.monotonic() - t0, 1)
+
+    def test_event_ids(self):
+        snap = self.store.publish(True, {3: "DOWN"})
+        event_id = f"{self.store.epoch}-{snap.version}"
+        self.assertTrue(snap.status_event.startswith(f"id: {event_id}\n".encode()))
+        self.assertEqual(self.store.parse_event_id(event_id), snap.version)
+        self.assertIsNone(self.store.parse_event_id(f"{SnapshotStore().epoch}-1"))
+        self.assertIsNone(self.store.parse_event_id("7"))
+        self.assertIsNone(self.store.parse_event_id(None))
+
+
+class ServerLongPollTest(unittest.TestCase):
+    """Flask 서버의 ETag/304와 long-poll 응답"""
+
+    def setUp(self):
+        self.server = EvacuationServer()
+        self.client = self.server.app.test_client()
+        self.server.store.publish(True, {0: "UP", 1: "LEFT"})
+
+    def test_etag_304(self):
+        resp = self.client.get("/direction/0")
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json(), {"id": 0, "direction": "UP", "version": 1})
+        etag = resp.headers["ETag"]
+        resp = self.client.get("/direction/0", headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 304)
+
+        # 다른 노드만 바뀌면 304 유지, 이 노드가 바뀌면 200
+        self.server.store.publish(True, {0: "UP", 1: "RIGHT"})
+        resp = self.client.get("/direction/0", headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 304)
+        self.server.store.publish(True, {0: "DOWN", 1: "RIGHT"})
+        resp = self.client.get("/direction/0", headers={"If-None-Match": etag})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()["direction"], "DOWN")
+
+    def test_long_poll_timeout(self):
+        resp = self.client.get("/status?since=1&timeout=0.05")
+        self.assertEqual(resp.status_code, 304)
+        resp = self.client.get("/direction/0?since=1&timeout=0.05")
+        self.assertEqual(resp.status_code, 304)
+
+    def test_stale_client_after_restart(self):
+        # 재시작 전 버전/ETag를 들고 온 클라이언트는 기다리지 않고 현재 상태를 받음
+        old = SnapshotStore()
+        old.publish(True, {0: "DOWN"})
+        t0 = time.monotonic()
+        resp = self.client.get("/direction/0?since=9&timeout=5")
+        self.assertEqual(resp.status_code, 200)
+        resp = self.client.get("/direction/0?since=1&timeout=5",
+                               headers={"If-None-Match": old.current.node(0)[1]})
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.get_json()["direction"], "UP")
+        self.assertLess(time.monotonic() - t0, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
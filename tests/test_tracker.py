@@ -0,0 +1,50 @@
+import unittest
+
+from src.tracker import FireTracker
+
+FIRE = (100, 100, 20, 20)
+
+class FireTrackerTest(unittest.TestCase):
+    """확정/소멸 히스테리시스와 footprint 버전"""
+
+    def test_confirm_needs_consecutive_hits(self):
+        tracker = FireTracker(confirm_frames=3)
+        for boxes in ([FIRE], [], [FIRE], [], [FIRE], [], [FIRE]):
+            tracker.update(boxes)
+        self.assertEqual(tracker.boxes, [])
+        self.assertEqual(tracker.version, 0)
+
+        for _ in range(3):
+            tracker.update([FIRE])
+        self.assertEqual(tracker.boxes, [FIRE])
+        self.assertEqual(tracker.version, 1)
+
+    def test_expire_after_misses(self):
+        tracker = FireTracker(confirm_frames=2, expire_frames=3)
+        tracker.update([FIRE])
+        tracker.update([FIRE])
+        # 확정된 불은 잠깐 놓쳐도 유지
+        tracker.update([])
+        tracker.update([])
+        self.assertEqual(tracker.boxes, [FIRE])
+        tracker.update([])
+        self.assertEqual(tracker.boxes, [])
+        self.assertEqual(tracker.version, 2)
+
+    def test_jitter_keeps_footprint(self):
+        tracker = FireTracker(confirm_frames=2, move_thresh=6)
+        tracker.update([FIRE])
+        tracker.update([FIRE])
+        version = tracker.version
+        for dx in (2, -3, 4, 0):
+            self.assertFalse(tracker.update([(100 + dx, 100 + dx, 20, 20)]))
+        self.assertEqual(tracker.version, version)
+        self.assertEqual(tracker.boxes, [FIRE])
+
+        # 그리드 셀이 바뀌도록 충분히 움직이면 갱신
+        self.assertTrue(tracker.update([(140, 100, 20, 20)]))
+        self.assertEqual(tracker.boxes, [(140, 100, 20, 20)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,17 +1,124 @@
 import cv2
 import numpy as np
+import sys
+import threading
+from collections import OrderedDict
 # 파일들이 같은 경로에 있다고 가정 (src 폴더 구조라면 from src.map import ... 로 수정 필요)
 try:
     from map import GridMap
     from navigator import Navigator
+    from site_bundle import SiteBundle
 except ImportError:
     from src.map import GridMap
     from src.navigator import Navigator
+    from src.site_bundle import SiteBundle
+
+DEFAULT_FIRE_RADIUS = 60 # 반지름이 없는 화재 데이터의 기본 반지름
+
+def normalize_fires(fire_data):
+    """
+    화재 목록을 비교 가능한 키로 정규화
+    [(x, y), (x, y, r), ...] -> ((x, y, r), ...) 정수 + 정렬 (입력 순서와 무관)
+    """
+    fires = []
+    for item in fire_data:
+        if len(item) == 3:
+            fx, fy, fr = item
+        else:
+            fx, fy = item
+            fr = DEFAULT_FIRE_RADIUS
+        fires.append((int(fx), int(fy), int(fr)))
+    return tuple(sorted(fires))
+
+class EvacuationPlan:
+    """
+    compute() 결과: 화재 목록, LED별 경로/방향 (픽셀 작업 없음)
+    이미지는 render()를 처음 호출할 때 한 번만 그립니다.
+    """
+    def __init__(self, system, fires, paths, directions):
+        self.system = system
+        self.fires = fires            # normalize_fires() 결과
+        self.paths = paths            # {LED 이름: [(x, y), ...]}
+        self.directions = directions  # {LED 이름: 방향}
+        self.image = None
+
+    def render(self):
+        return self.system.render(self)
+
+    def nbytes(self):
+        """캐시 용량 계산용 대략적인 크기"""
+        size = sys.getsizeof(self.directions) + sum(
+            sys.getsizeof(k) + sys.getsizeof(v) for k, v in self.directions.items())
+        size += sum(64 * len(path) for path in self.paths.values())
+        if self.image is not None:
+            size += self.image.nbytes
+        return size
+
+class ProcessCache:
+    """
+    EvacuationPlan LRU 캐시 (정규화된 화재 목록 -> 방향표 + 경로 + 그려진 이미지)
+    항목 수와 바이트 수 두 기준으로 제한하고, 적중/실패 횟수를 기록합니다.
+    """
+    def __init__(self, max_entries=32, max_bytes=128 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data = OrderedDict()  # key -> (plan, 바이트 수)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, plan):
+        """새 항목 추가, 또는 이미지가 그려져 크기가 바뀐 항목 재계산"""
+        nbytes = plan.nbytes()
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            if nbytes > self.max_bytes:
+                return
+            self._data[key] = (plan, nbytes)
+            self.bytes += nbytes
+            while len(self._data) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self.bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def stats(self):
+        return {"entries": len(self._data), "bytes": self.bytes,
+                "hits": self.hits, "misses": self.misses}
 
 class VirtualEvacuationSystem:
-    def __init__(self, map_image_path):
-        # 1. 맵 이미지 로드
-        self.original_map = cv2.imread(map_image_path)
+    def __init__(self, map_image_path, target_width=None, cache_entries=32,
+                 cache_bytes=128 * 1024 * 1024, bundle=None):
+        """
+        :param bundle: 사이트 번들 경로 또는 SiteBundle (get_coords.py에서 저장)
+                       있으면 LED/탈출구 좌표와 미리 래스터화된 맵 그리드를 사용
+        """
+        if isinstance(bundle, str):
+            bundle = SiteBundle(bundle)
+        self.bundle = bundle
+
+        # 1. 맵 이미지 로드 (번들에 같은 폭으로 디코딩해 둔 이미지가 있으면 PNG 디코딩 생략)
+        prebuilt = bundle.image("map", target_width) if bundle is not None else None
+        if prebuilt is not None:
+            self.original_map = prebuilt
+        else:
+            self.original_map = cv2.imread(map_image_path)
         if self.original_map is None:
             # 파일이 없을 경우를 대비해 빈 이미지 생성 (오류 방지)
             self.original_map = np.zeros((480, 640, 3), dtype=np.uint8)
@@ -24,7 +131,9 @@ class VirtualEvacuationSystem:
         _, self.static_obstacle_mask = cv2.threshold(gray, 60, 255, cv2.THRESH_BINARY)
         
         # 3. 모듈 초기화
-        self.grid_map = GridMap(self.w, self.h, self.grid_size)
+        self.grid_map = GridMap(self.w, self.h, self.grid_size, planner="incremental")
+        # 정적 맵은 바뀌지 않으므로 장애물 레이어는 한 번만 래스터화
+        self._apply_static_layer()
         self.navigator = Navigator()
 
         # [좌표 보정 로직 추가]
@@ -52,29 +161,155 @@ class VirtualEvacuationSystem:
             "LED_4 (좌측)": (int(29 * sx), int(195 * sy))
         }
 
+        # 사이트 번들 좌표가 있으면 그것을 사용 (main.py와 같은 좌표)
+        if bundle is not None:
+            self.exits = bundle.scaled_points(bundle.exits, self.w, self.h)
+            self.led_nodes = bundle.scaled_points(bundle.nodes, self.w, self.h)
+
+        # 경로 아틀라스 (load_atlas로 연결, 없으면 항상 실시간 계산)
+        self.atlas = None
+        # 같은 화재 시나리오 반복 호출용 결과 캐시 (cache_entries=0이면 사용 안 함)
+        self.cache = ProcessCache(cache_entries, cache_bytes) if cache_entries else None
+
+        if target_width and self.w != target_width:
+            self._rescale(target_width)
+
+    def _rescale(self, target_width):
+        """대시보드 표시 폭에 맞춰 맵/마스크/그리드/좌표를 같은 비율로 재조정"""
+        scale = target_width / self.w
+        new_h = int(self.h * scale)
+
+        self.original_map = cv2.resize(self.original_map, (target_width, new_h))
+        self.static_obstacle_mask = cv2.resize(self.static_obstacle_mask, (target_width, new_h))
+        self.w, self.h = target_width, new_h
+
+        # 그리드맵 재생성
+        self.grid_map = GridMap(self.w, self.h, self.grid_size, planner=self.grid_map.planner)
+        self._apply_static_layer()
+
+        # 내부 좌표(LED, 출구) 스케일링
+        self.led_nodes = {k: (int(x * scale), int(y * scale)) for k, (x, y) in self.led_nodes.items()}
+        self.exits = {k: (int(x * scale), int(y * scale)) for k, (x, y) in self.exits.items()}
+        if self.cache is not None:
+            self.cache.clear()
+
+    def _apply_static_layer(self):
+        """번들에 이 해상도의 맵 그리드가 있으면 그대로 쓰고, 없으면 마스크를 래스터화"""
+        grid = None
+        if self.bundle is not None:
+            grid = self.bundle.static_grid("map", self.w, self.h, self.grid_size)
+        if grid is not None:
+            self.grid_map.set_static_grid(grid)
+        else:
+            self.grid_map.set_static_mask(self.static_obstacle_mask)
+
+    def fire_zones(self):
+        """화재 시뮬레이션 프리셋 구역 좌표 (해상도 비율에 맞춤)"""
+        w, h = self.w, self.h
+        return {
+            "A구역 (좌측 통로)": (int(w * 0.22), int(h * 0.66)),
+            "B구역 (중앙 홀)":   (int(w * 0.50), int(h * 0.66)),
+            "C구역 (우측 통로)": (int(w * 0.77), int(h * 0.66)),
+            "D구역 (상단 통로)": (int(w * 0.50), int(h * 0.25))
+        }
+
+    def load_atlas(self, atlas_path):
+        """미리 계산한 경로 아틀라스 연결 (atlas.py 참고)"""
+        from atlas import RouteAtlas
+        try:
+            atlas = RouteAtlas(atlas_path)
+        except ValueError as e:
+            print(f"[WARN] 아틀라스를 사용하지 않습니다: {e}")
+            return None
+        if not atlas.matches(self):
+            print(f"[WARN] 아틀라스가 현재 맵과 맞지 않아 사용하지 않습니다: {atlas_path}")
+            return None
+        self.atlas = atlas
+        return atlas
+
+    def get_directions(self, fire_data):
+        """
+        LED별 방향만 필요할 때 사용 (이미지를 그리지 않음)
+        아틀라스에 있는 시나리오면 바로 반환하고, 없으면 compute()로 계산
+        (표와 이미지가 모두 필요하면 process() 한 번으로 같은 계획에서 받을 것)
+        """
+        if self.atlas is not None:
+            directions = self.atlas.lookup(fire_data)
+            if directions is not None:
+                return directions
+        return dict(self.compute(fire_data).directions)
+
     def process(self, fire_data):
         """
         fire_data: [(x, y), ...] 또는 [(x, y, radius), ...] 혼용 가능
+        (이미지, 방향표) 반환. 같은 화재 조합(순서 무관)은 캐시에서 바로 반환 (이미지는 읽기 전용)
         """
-        display_img = self.original_map.copy()
-        
-        # 1. 그리드 리셋
+        plan = self.compute(fire_data)
+        return plan.render(), dict(plan.directions)
+
+    def compute(self, fire_data):
+        """
+        경로/방향만 계산해 EvacuationPlan으로 반환 (픽셀 작업 없음)
+        아틀라스에 있는 시나리오면 저장된 방향표/경로로 바로 만듦 (표와 이미지가 같은 계획에서 나옴)
+        """
+        key = normalize_fires(fire_data)
+        if self.cache is not None:
+            plan = self.cache.get(key)
+            if plan is not None:
+                return plan
+
+        if self.atlas is not None:
+            entry = self.atlas.lookup_plan(key)
+            if entry is not None:
+                plan = EvacuationPlan(self, key, entry[1], entry[0])
+                if self.cache is not None:
+                    self.cache.put(key, plan)
+                return plan
+
+        # 1. 그리드 리셋 (정적 장애물 레이어는 유지됨)
         self.grid_map.reset()
-        self.grid_map.update_obstacles_from_mask(self.static_obstacle_mask)
-        
-        # 2. 화재 등록 및 시각화
-        for item in fire_data:
-            # 데이터 형식이 (x, y)인지 (x, y, r)인지 확인
-            if len(item) == 3:
-                fx, fy, fr = item
-            else:
-                fx, fy = item
-                fr = 60 # 기본 반지름
-            
-            # 그리드맵에 장애물 등록
+
+        # 2. 화재 등록
+        for fx, fy, fr in key:
             self.grid_map.set_obstacle_rect(int(fx - fr), int(fy - fr), int(fr*2), int(fr*2))
-            
-            # 시각화 (동심원 효과)
+
+        # 3. 비상구 등록
+        for ex, ey in self.exits.values():
+            self.grid_map.add_exit(ex, ey, 20, 20)
+
+        # 4. 경로 계산
+        paths = {}
+        results = {}
+        # 키 정렬을 통해 LED 번호 순서대로 처리 (LED_1 -> LED_2...)
+        for name in sorted(self.led_nodes.keys()):
+            nx, ny = self.led_nodes[name]
+            path = self.grid_map.get_shortest_path(nx, ny)
+
+            if len(path) > 1:
+                # 방향 계산 (5칸 앞)
+                target_idx = min(5, len(path)-1)
+                target_pos = path[target_idx]
+                direction = self.navigator.get_direction((nx, ny), target_pos)
+            else:
+                direction = "BLOCKED" # 길이 막힘
+
+            paths[name] = path
+            results[name] = direction
+
+        plan = EvacuationPlan(self, key, paths, results)
+        if self.cache is not None:
+            self.cache.put(key, plan)
+        return plan
+
+    def render(self, plan):
+        """EvacuationPlan을 맵 위에 그림 (plan마다 한 번만, 이후 읽기 전용 이미지 재사용)"""
+        if plan.image is not None:
+            return plan.image
+
+        display_img = self.original_map.copy()
+
+        # 화재 시각화 (동심원 효과)
+        for fx, fy, fr in plan.fires:
             cv2.circle(display_img, (int(fx), int(fy)), int(fr), (0, 0, 200), -1)       
             cv2.circle(display_img, (int(fx), int(fy)), int(fr*0.7), (0, 100, 255), -1) 
             cv2.circle(display_img, (int(fx), int(fy)), int(fr*0.4), (0, 255, 255), -1) 
@@ -82,45 +317,31 @@ class VirtualEvacuationSystem:
             cv2.putText(display_img, "FIRE", (int(fx)-20, int(fy)), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
 
-        # 3. 비상구 등록
+        # 비상구
         for name, (ex, ey) in self.exits.items():
-            self.grid_map.add_exit(ex, ey, 20, 20)
-            
             color = (255, 0, 0) if "Blue" in name else (0, 255, 0)
             cv2.circle(display_img, (int(ex), int(ey)), 15, color, -1)
             cv2.putText(display_img, "EXIT", (int(ex)-20, int(ey)-20), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
 
-        # 4. 경로 계산
-        results = {}
-        # 키 정렬을 통해 LED 번호 순서대로 처리 (LED_1 -> LED_2...)
-        for name in sorted(self.led_nodes.keys()):
+        # LED 위치(노란색) + 경로 + 화살표
+        for name, path in plan.paths.items():
             nx, ny = self.led_nodes[name]
-            path = self.grid_map.get_shortest_path(nx, ny)
-            direction = "STOP"
-            
-            # LED 위치 표시 (노란색)
             cv2.circle(display_img, (int(nx), int(ny)), 10, (0, 255, 255), -1)
             
             if len(path) > 1:
-                # 경로 그리기
                 pts = np.array(path, np.int32)
                 cv2.polylines(display_img, [pts], False, (0, 255, 0), 2)
-                
-                # 방향 계산 (5칸 앞)
-                target_idx = min(5, len(path)-1)
-                target_pos = path[target_idx]
-                direction = self.navigator.get_direction((nx, ny), target_pos)
-                
-                # 화살표 그리기
-                self._draw_arrow(display_img, (nx, ny), direction)
+                self._draw_arrow(display_img, (nx, ny), plan.directions[name])
             else:
-                direction = "BLOCKED" # 길이 막힘
                 cv2.putText(display_img, "X", (int(nx), int(ny)), cv2.FONT_HERSHEY_SIMPLEX, 1, (0,0,255), 2)
 
-            results[name] = direction
-
-        return display_img, results
+        # 캐시에 든 이미지를 호출자가 덮어쓰지 못하도록 읽기 전용으로
+        display_img.flags.writeable = False
+        plan.image = display_img
+        if self.cache is not None and plan.system is self:
+            self.cache.put(plan.fires, plan)  # 이미지 크기만큼 용량 재계산
+        return display_img
 
     def _draw_arrow(self, img, pos, direction):
         x, y = int(pos[0]), int(pos[1])